@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Count
 from users.models import User
 from likes.models import *
 from django.core.exceptions import ObjectDoesNotExist
@@ -8,9 +9,26 @@ from core.models import CompressedImageField
 # Create your models here.
 
 
+class CommentQuerySet(models.QuerySet):
+    def with_counts(self):
+        """
+        대댓글 수를 annotate (num_recomments)
+        - recomment_count()가 row마다 COUNT query를 실행하지 않도록 한다
+        - like 수는 num_likes 컬럼에 저장 (likes.services)
+        """
+        if self.model.recomment_relation is None:
+            return self
+        return self.annotate(num_recomments=Count(self.model.recomment_relation))
+
+
 class Comment(models.Model):
     """Comment Model Definition"""
 
+    # with_counts()에서 집계할 대댓글 related_name
+    recomment_relation = None
+
+    objects = CommentQuerySet.as_manager()
+
     text = models.TextField()
     create_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -20,16 +38,31 @@ class Comment(models.Model):
     is_read = models.BooleanField(default=False)
     is_reported = models.BooleanField(default=False)
 
+    # like 수 - like 추가 / 취소 시 F()로 갱신 (likes.services)
+    num_likes = models.PositiveIntegerField(default=0)
+
     class Meta:
         abstract = True
 
     def __str__(self):
         return self.text
 
+    def like_count(self):
+        return self.num_likes
+
+    def recomment_count(self):
+        if hasattr(self, "num_recomments"):
+            return self.num_recomments
+        if self.recomment_relation is None:
+            return 0
+        return getattr(self, self.recomment_relation).count()
+
 
 class Product_Comment(Comment):
     """Product_Comment Model Definition"""
 
+    recomment_relation = "product_recomments"
+
     evaluate = (
         (5, "good"),
         (3, "normal"),
@@ -51,6 +84,11 @@ class Product_Comment(Comment):
     update_at = models.DateTimeField(auto_now=True)
     create_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["product", "create_at"], name="product_comment_create_idx"),
+        ]
+
     def get_rating_avg(self):
         self.avg = round((self.freshness + self.flavor + self.cost_performance) / 3)
         return self.avg
@@ -61,17 +99,10 @@ class Product_Comment(Comment):
         print(self.avg)
         super(Product_Comment, self).save(*args, **kwargs)
 
-    def recomment_count(self):
-        try:
-            return Product_Recomment.objects.filter(comment=self).count()
-
-        except ObjectDoesNotExist:
-            return 0
-
 
 class Product_Comment_Image(models.Model):
 
-    image = CompressedImageField(upload_to="comments/%Y/%m/%d/")
+    image = CompressedImageField(upload_to="comments/%Y/%m/%d/", thumbnails=True)
     product_comment = models.ForeignKey(
         Product_Comment, related_name="product_comment_images", on_delete=models.CASCADE
     )
@@ -90,13 +121,6 @@ class Product_Recomment(Comment):
         User, related_name="product_recomment", on_delete=models.CASCADE
     )
 
-    def like_count(self):
-        try:
-            return ProductRecommentLike.objects.filter(recomment=self).count()
-
-        except ObjectDoesNotExist:
-            return 0
-
 
 # class Qna_Comment(Comment):
 #     """Qna_Comment Model Definition"""
@@ -107,6 +131,8 @@ class Product_Recomment(Comment):
 class Editor_Review_Comment(Comment):
     """Editor_Review_Comment Model Definition"""
 
+    recomment_relation = "editor_review_recomments"
+
     editor_review = models.ForeignKey(
         "editor_reviews.Editor_Review",
         related_name="editor_review_comments",
@@ -116,19 +142,10 @@ class Editor_Review_Comment(Comment):
         User, related_name="editor_review_comment", on_delete=models.CASCADE
     )
 
-    def like_count(self):
-        try:
-            return EditorReviewCommentLike.objects.filter(comment=self).count()
-
-        except ObjectDoesNotExist:
-            return 0
-
-    def recomment_count(self):
-        try:
-            return Editor_Review_Recomment.objects.filter(comment=self).count()
-
-        except ObjectDoesNotExist:
-            return 0
+    class Meta:
+        indexes = [
+            models.Index(fields=["editor_review", "is_read"], name="editor_comment_read_idx"),
+        ]
 
 
 class Editor_Review_Recomment(Comment):
@@ -143,17 +160,12 @@ class Editor_Review_Recomment(Comment):
         User, related_name="editor_review_recomment", on_delete=models.CASCADE
     )
 
-    def like_count(self):
-        try:
-            return EditorReviewRecommentLike.objects.filter(recomment=self).count()
-
-        except ObjectDoesNotExist:
-            return 0
-
 
 class Farmer_Story_Comment(Comment):
     """Farmer_Story_Comment Model Defiition"""
 
+    recomment_relation = "farmer_story_recomments"
+
     story = models.ForeignKey(
         "farmers.Farmer_Story",
         related_name="farmer_story_comments",
@@ -163,20 +175,6 @@ class Farmer_Story_Comment(Comment):
         User, related_name="farmer_story_comment", on_delete=models.CASCADE
     )
 
-    def like_count(self):
-        try:
-            return FarmerStoryCommentLike.objects.filter(comment=self).count()
-
-        except ObjectDoesNotExist:
-            return 0
-
-    def recomment_count(self):
-        try:
-            return Farmer_Story_Recomment.objects.filter(comment=self).count()
-
-        except ObjectDoesNotExist:
-            return 0
-
 
 class Farmer_Story_Recomment(Comment):
     """Farmer_Story_Recomment Model Defiition"""
@@ -189,10 +187,3 @@ class Farmer_Story_Recomment(Comment):
     author = models.ForeignKey(
         User, related_name="farmer_story_recomment", on_delete=models.CASCADE
     )
-
-    def like_count(self):
-        try:
-            return FarmerStoryRecommentLike.objects.filter(recomment=self).count()
-
-        except ObjectDoesNotExist:
-            return 0
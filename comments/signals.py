@@ -1,7 +1,8 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from .models import Product_Comment, Farmer_Story_Comment
+from .models import Product_Comment, Farmer_Story_Comment, Editor_Review_Comment
 from admins.models import FarmerNotification
+from users.models import Editor
 
 
 @receiver(post_save, sender=Product_Comment)
@@ -22,3 +23,9 @@ def farmer_story_comment_post_save(sender, instance, **kwargs):
         notitype="story_comment_noti",
         obj_pk=instance.pk,
     )
+
+
+@receiver([post_save, post_delete], sender=Editor_Review_Comment)
+def editor_review_comment_changed(sender, instance, **kwargs):
+    # 에디터 마이페이지 새 댓글 수 cache 무효화
+    Editor.clear_unread_comment_count(instance.editor_review.author_id)
@@ -1,3 +1,118 @@
-from django.test import TestCase
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from core import testing
+from farmers.models import Farmer_Story
+from products.ratings import add_review
+from . import views
+from .models import Farmer_Story_Comment, Product_Comment, Product_Recomment
 
 # Create your tests here.
+
+
+class ProductCommentOwnershipTest(TestCase):
+    """Product 댓글 수정 / 삭제 - 작성자만 가능 (평점 집계도 변경되지 않아야 함)"""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        farmer = testing.make_farmer()
+        self.product = testing.make_product(farmer, testing.make_category("과일", "fruit"))
+        self.owner = testing.make_consumer()
+        self.other = testing.make_consumer()
+        self.comment = testing.make_product_comment(self.product, self.owner, rating=5)
+        add_review(self.comment)
+
+    def post(self, view, user, data=None):
+        request = self.factory.post("/", data or {})
+        request.user = user
+        return view(request, pk=self.comment.pk)
+
+    def rating_sum(self):
+        self.product.refresh_from_db()
+        return self.product.reviews, self.product.total_rating_sum
+
+    def test_update_by_other_user_is_rejected(self):
+        data = {"text": "수정", "freshness": 1, "flavor": 1, "cost_performance": 1}
+        response = self.post(views.product_comment_update, self.other.user, data)
+        self.assertEqual(response.status_code, 302)
+        self.comment.refresh_from_db()
+        self.assertEqual((self.comment.text, self.comment.freshness), ("리뷰", 5))
+        self.assertEqual(self.rating_sum(), (1, 5))
+
+    def test_update_by_owner(self):
+        data = {"text": "수정", "freshness": 1, "flavor": 1, "cost_performance": 1}
+        self.post(views.product_comment_update, self.owner.user, data)
+        self.comment.refresh_from_db()
+        self.assertEqual((self.comment.text, self.comment.freshness), ("수정", 1))
+        self.assertEqual(self.rating_sum(), (1, 1))
+
+    def test_delete_by_other_user_is_rejected(self):
+        self.post(views.product_comment_delete, self.other.user)
+        self.assertTrue(Product_Comment.objects.filter(pk=self.comment.pk).exists())
+        self.assertEqual(self.rating_sum(), (1, 5))
+
+        response = self.post(views.product_comment_delete, AnonymousUser())
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(Product_Comment.objects.filter(pk=self.comment.pk).exists())
+
+    def test_delete_by_owner(self):
+        self.post(views.product_comment_delete, self.owner.user)
+        self.assertFalse(Product_Comment.objects.filter(pk=self.comment.pk).exists())
+        self.assertEqual(self.rating_sum(), (0, 0))
+
+
+class RecommentOwnershipTest(TestCase):
+    """대댓글 / 스토리 댓글 AJAX 수정 / 삭제 - 작성자가 아니면 403"""
+
+    def setUp(self):
+        farmer = testing.make_farmer()
+        product = testing.make_product(farmer, testing.make_category("과일", "fruit"))
+        comment = testing.make_product_comment(product, testing.make_consumer())
+        self.author = testing.make_user()
+        self.other = testing.make_user()
+        self.recomment = Product_Recomment.objects.create(
+            comment=comment, author=self.author, text="대댓글"
+        )
+        self.story = Farmer_Story.objects.create(farmer=farmer, title="스토리", content="내용")
+        self.story_comment = Farmer_Story_Comment.objects.create(
+            story=self.story, author=self.author, text="댓글"
+        )
+
+    def test_product_recomment(self):
+        self.client.force_login(self.other)
+        url = reverse("comments:product_recomment_edit")
+        response = self.client.post(url, {"pk": self.recomment.pk, "text": "수정"})
+        self.assertEqual(response.status_code, 403)
+        response = self.client.post(
+            reverse("comments:product_recomment_delete"), {"pk": self.recomment.pk}
+        )
+        self.assertEqual(response.status_code, 403)
+        self.recomment.refresh_from_db()
+        self.assertEqual(self.recomment.text, "대댓글")
+
+        self.client.force_login(self.author)
+        response = self.client.post(url, {"pk": self.recomment.pk, "text": "수정"})
+        self.assertEqual(response.status_code, 200)
+        self.recomment.refresh_from_db()
+        self.assertEqual(self.recomment.text, "수정")
+
+    def test_farmer_story_comment(self):
+        kwargs = {"storypk": self.story.pk, "commentpk": self.story_comment.pk}
+        ajax = {"HTTP_X_REQUESTED_WITH": "XMLHttpRequest"}
+        self.client.force_login(self.other)
+        response = self.client.post(
+            reverse("comments:farmer_story_comment_edit", kwargs=kwargs), {"text": "수정"}, **ajax
+        )
+        self.assertEqual(response.status_code, 403)
+        response = self.client.post(
+            reverse("comments:farmer_story_comment_delete", kwargs=kwargs), **ajax
+        )
+        self.assertEqual(response.status_code, 403)
+        self.assertTrue(Farmer_Story_Comment.objects.filter(pk=self.story_comment.pk).exists())
+
+        self.client.force_login(self.author)
+        response = self.client.post(
+            reverse("comments:farmer_story_comment_delete", kwargs=kwargs), **ajax
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Farmer_Story_Comment.objects.filter(pk=self.story_comment.pk).exists())
@@ -9,12 +9,16 @@ from .models import (
 )
 from .forms import ProductCommentForm, ProductRecommentForm
 from products.models import Product
+from products.ratings import add_review, change_review, remove_review
 from users.models import Consumer
 from farmers.models import Farmer_Story
 from django.template.loader import render_to_string
 from django.http import JsonResponse, HttpResponse
 from django.views.decorators.csrf import csrf_exempt
+from django.contrib.auth.decorators import login_required
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+from core.models import AuthorNotMatched
 
 
 """
@@ -54,8 +58,11 @@ def product_comment_create(request, pk):
         product_comment.consumer = consumer
         product_comment.product = product
         product_comment.get_rating_avg()
-        product_comment.save()
-        product.reviews += 1
+
+        with transaction.atomic():
+            product_comment.save()
+            # 리뷰 수 / 평점 총합 / 점수별 개수를 한 번의 UPDATE로 반영
+            add_review(product_comment)
 
         # Product_Comment_Image
         for img in product_comment_imgs:
@@ -64,57 +71,52 @@ def product_comment_create(request, pk):
             )
             images.save()
 
-        # freshness
-        if product_comment.freshness == 1:
-            product.freshness_1 += 1
-        elif product_comment.freshness == 3:
-            product.freshness_3 += 1
-        else:
-            product.freshness_5 += 1
-
-        # flavor
-        if product_comment.flavor == 1:
-            product.flavor_1 += 1
-        elif product_comment.flavor == 3:
-            product.flavor_3 += 1
-        else:
-            product.flavor_5 += 1
-
-        # cost_performance
-        if product_comment.cost_performance == 1:
-            product.cost_performance_1 += 1
-        elif product_comment.cost_performance == 3:
-            product.cost_performance_3 += 1
-        else:
-            product.cost_performance_5 += 1
-
-        # total rating calculate
-        product.calculate_total_rating_sum(product_comment.avg)
-        result = product.calculate_total_rating_avg()
-
-        # specific rating calculate
-        product.calculate_specific_rating(
-            product_comment.freshness, product_comment.flavor, product_comment.cost_performance
-        )
-
     return redirect(reverse("comments:product_comment_detail", args=[pk]))
 
 
+def get_own_product_comment(request, pk):
+    """로그인한 소비자가 작성한 Product 댓글 - 다른 사용자의 댓글이면 AuthorNotMatched"""
+    product_comment = get_object_or_404(
+        Product_Comment.objects.select_related("consumer"), pk=pk
+    )
+    if product_comment.consumer.user_id != request.user.pk:
+        raise AuthorNotMatched
+    return product_comment
+
+
+def author_not_matched():
+    """AJAX 수정 / 삭제 요청 - 작성자가 아닌 경우"""
+    return JsonResponse({"status": False}, status=403)
+
+
+@login_required
 def product_comment_update(request, pk):
     """Product 댓글 수정"""
 
-    product_comment = Product_Comment.objects.get(pk=pk)
+    try:
+        product_comment = get_own_product_comment(request, pk)
+    except AuthorNotMatched:
+        return redirect(reverse("core:main"))
     product = product_comment.product
 
     if request.method == "POST":
+        # 수정 전 평점 - form이 instance를 직접 변경하므로 따로 조회
+        old_comment = Product_Comment.objects.get(pk=pk)
         product_comment_form = ProductCommentForm(
-            request.POST, request.FIELS, instance=product_comment
+            request.POST, request.FILES, instance=product_comment
         )
         if product_comment_form.is_valid():
             product_comment = product_comment_form.save(commit=False)
-            product_comment.author = request.user
             product_comment.product = product
-            return redirect(reverse("comments:product_comment_detail", kwargs={"pk": pk}))
+            product_comment.get_rating_avg()
+
+            with transaction.atomic():
+                product_comment.save()
+                change_review(old_comment, product_comment)
+
+            return redirect(
+                reverse("comments:product_comment_detail", kwargs={"pk": product.pk})
+            )
     else:
         product_comment_form = ProductCommentForm(instance=product_comment)
 
@@ -123,14 +125,20 @@ def product_comment_update(request, pk):
     )
 
 
+@login_required
 def product_comment_delete(request, pk):
     """Product 댓글 삭제"""
-    product_comment = Product_Comment.objects.get(pk=pk)
+    try:
+        product_comment = get_own_product_comment(request, pk)
+    except AuthorNotMatched:
+        return redirect(reverse("core:main"))
     product = product_comment.product
 
     if request.method == "POST":
-        product_comment.delete()
-        return redirect(product)
+        with transaction.atomic():
+            remove_review(product_comment)
+            product_comment.delete()
+        return redirect(reverse("products:product_detail", args=[product.pk]))
     else:
         return render(request, "coments/product_comment.html")
 
@@ -185,6 +193,8 @@ def product_recomment_edit(request):
     text = request.POST.get("text")
 
     comment = get_object_or_404(Product_Recomment, pk=pk)
+    if comment.author_id != request.user.pk:
+        return author_not_matched()
     comment.text = text
     comment.save()
 
@@ -204,6 +214,8 @@ def product_recomment_delete(request):
     pk = request.POST.get("pk")
 
     comment = get_object_or_404(Product_Recomment, pk=pk)
+    if comment.author_id != request.user.pk:
+        return author_not_matched()
     comment.delete()
 
     ctx = {
@@ -225,12 +237,15 @@ def farmer_story_comment_load(request):
         current_comment_count = int(request.POST.get("numberOfComments"))
         pk = request.POST.get("pk")
         review = Farmer_Story.objects.get(pk=pk)
-        comments = Farmer_Story_Comment.objects.filter(story=review).order_by("-create_at")
+        comments = (
+            Farmer_Story_Comment.objects.filter(story=review)
+            .select_related("author")
+            .with_counts()
+            .order_by("-create_at")
+        )
 
         try:
-            unloaded_comments = comments[
-                current_comment_count : min(current_comment_count + 10, comments.count())
-            ]
+            unloaded_comments = comments[current_comment_count : current_comment_count + 10]
 
             comment_list = list(
                 map(
@@ -285,7 +300,9 @@ def farmer_story_comment_edit(request, storypk, commentpk):
     """Farmer's story 댓글 수정 - AJAX"""
 
     if request.is_ajax():
-        comment = Farmer_Story_Comment.objects.get(pk=commentpk)
+        comment = get_object_or_404(Farmer_Story_Comment, pk=commentpk)
+        if comment.author_id != request.user.pk:
+            return author_not_matched()
         text = request.POST.get("text")
 
         comment.text = text
@@ -305,6 +322,8 @@ def farmer_story_comment_delete(request, storypk, commentpk):
     """Farmer's story 댓글 삭제 - AJAX"""
     if request.is_ajax():
         comment = get_object_or_404(Farmer_Story_Comment, pk=commentpk)
+        if comment.author_id != request.user.pk:
+            return author_not_matched()
 
         ctx = {"status": True}
 
@@ -327,13 +346,16 @@ def farmer_story_recomment_load(request):
         )  # Front-end 에서 현재 로딩된 댓글의 개수를 요청에 포함한다.
         pk = request.POST.get("pk")
         comment = Farmer_Story_Comment.objects.get(pk=pk)
-        recomments = Farmer_Story_Recomment.objects.filter(comment=comment).order_by("-create_at")
+        recomments = (
+            Farmer_Story_Recomment.objects.filter(comment=comment)
+            .select_related("author")
+            .with_counts()
+            .order_by("-create_at")
+        )
 
         try:
             # Posting의 전체 댓글 중에서 아직 불러오지 않은 것들을 가져온다. (10개 혹은 그 이하)
-            unloaded_comments = recomments[
-                current_comment_count : min(current_comment_count + 5, recomments.count())
-            ]
+            unloaded_comments = recomments[current_comment_count : current_comment_count + 5]
 
             # Front-end에서 동적으로 엘리먼트를 생성할 때 사용 가능한 방식으로 데이터를 분리한다.
             comment_list = list(
@@ -395,6 +417,8 @@ def farmer_story_recomment_edit(request):
     text = request.POST.get("text")
 
     comment = get_object_or_404(Farmer_Story_Recomment, pk=pk)
+    if comment.author_id != request.user.pk:
+        return author_not_matched()
     comment.text = text
     comment.save()
 
@@ -415,6 +439,8 @@ def farmer_story_recomment_delete(request):
     pk = request.POST.get("pk")
 
     comment = get_object_or_404(Farmer_Story_Recomment, pk=pk)
+    if comment.author_id != request.user.pk:
+        return author_not_matched()
     comment.delete()
 
     ctx = {
@@ -53,6 +53,16 @@ LOGGING = {
             "level": "INFO",
             "propagate": True,
         },
+        # 알림톡 발송 worker 오류 (kakaomessages.outbox)
+        "kakaomessages": {
+            "handlers": ["console", "file_error"],
+            "level": "INFO",
+        },
+        # 조회수 flush 오류 (core.hits)
+        "core": {
+            "handlers": ["console", "file_error"],
+            "level": "INFO",
+        },
     },
 }
 
@@ -221,10 +231,39 @@ STATICFILES_DIRS = [
 STATIC_ROOT = os.path.join(BASE_DIR, "static")
 STATIC_URL = "/static/"
 
+### Cache
+# CACHE_LOCATION 지정 시 file 기반 cache (여러 process 간 공유), 없으면 process별 local memory
+if os.environ.get("CACHE_LOCATION"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.environ.get("CACHE_LOCATION"),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "pickyfarm",
+        }
+    }
+
+# 메인 페이지 section fragment cache 만료 시간(초)
+INDEX_FRAGMENT_TIMEOUT = 60 * 5
+
+# 조회수 buffer flush 주기(초) (core.hits)
+HIT_FLUSH_INTERVAL = 30
+
 ### Media files
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 MEDIA_URL = "/media/"
 
+# 업로드 이미지 WebP 변환을 background process pool에서 처리 (core.images)
+COMPRESSED_IMAGE_DEFERRED = os.environ.get("COMPRESSED_IMAGE_DEFERRED", "") == "True"
+COMPRESSED_IMAGE_WORKERS = 2
+# 목록 페이지용 thumbnail 너비 (srcset)
+COMPRESSED_IMAGE_SIZES = (320, 640, 1024)
+
 
 ### Email 전송
 # 메일을 호스트하는 서버
@@ -0,0 +1,204 @@
+from bisect import bisect_left, bisect_right
+from django.db import connection
+from django.urls import reverse
+from products.models import Product
+from farmers.models import Farmer, Farm_Tag
+from urllib.parse import urlencode
+from .versions import LocalVersion
+import logging
+import threading
+import time
+
+"""
+검색어 자동완성 - process 내 정렬 배열 prefix 색인
+- 상품명(판매 중) / 농장 이름 / 농가 tag를 (key, (kind, pk)) 정렬 배열로 보관, bisect로 prefix 범위 조회
+- key는 한글을 자모 단위로 분해한 문자열 - 입력 중인 글자("삭" -> "사과")도 prefix로 일치
+- 단어 시작 위치마다 key를 만들어 두 번째 이후 단어로도 검색 ("행복한 사과농장" <- "사과")
+- 최초 조회 시 전체 색인, 이후 model 저장 / 삭제 시 core.signals에서 label이 바뀐 경우만 add / remove
+- 다른 process의 변경은 cache의 version(core.versions)으로 감지하여 재색인
+  색인이 이미 있으면 재색인은 background thread에서 하고 그동안은 기존 색인으로 응답
+"""
+
+logger = logging.getLogger(__name__)
+
+MAX_LABEL_LENGTH = 50  # 색인하는 label 최대 길이
+MAX_WORDS = 4  # label 하나 당 key (단어 시작 위치) 최대 개수
+DEFAULT_LIMIT = 10
+VERSION_KEY = "autocomplete_version"
+VERSION_CHECK_INTERVAL = 5  # 다른 process 변경 확인 주기(초) - 매 입력마다 cache 조회하지 않음
+
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+JUNGSEONG = (
+    "ㅏ ㅐ ㅑ ㅒ ㅓ ㅔ ㅕ ㅖ ㅗ ㅗㅏ ㅗㅐ ㅗㅣ ㅛ ㅜ ㅜㅓ ㅜㅔ ㅜㅣ ㅠ ㅡ ㅡㅣ ㅣ".split()
+)
+JONGSEONG = [""] + (
+    "ㄱ ㄲ ㄱㅅ ㄴ ㄴㅈ ㄴㅎ ㄷ ㄹ ㄹㄱ ㄹㅁ ㄹㅂ ㄹㅅ ㄹㅌ ㄹㅍ ㄹㅎ ㅁ ㅂ ㅂㅅ ㅅ ㅆ ㅇ ㅈ ㅊ ㅋ ㅌ ㅍ ㅎ".split()
+)
+# 입력 중 단독으로 들어오는 겹자모
+# fmt: off
+COMPOUND_JAMO = {
+    "ㄳ": "ㄱㅅ", "ㄵ": "ㄴㅈ", "ㄶ": "ㄴㅎ", "ㄺ": "ㄹㄱ", "ㄻ": "ㄹㅁ", "ㄼ": "ㄹㅂ", "ㄽ": "ㄹㅅ",
+    "ㄾ": "ㄹㅌ", "ㄿ": "ㄹㅍ", "ㅀ": "ㄹㅎ", "ㅄ": "ㅂㅅ", "ㅘ": "ㅗㅏ", "ㅙ": "ㅗㅐ", "ㅚ": "ㅗㅣ",
+    "ㅝ": "ㅜㅓ", "ㅞ": "ㅜㅔ", "ㅟ": "ㅜㅣ", "ㅢ": "ㅡㅣ",
+}
+# fmt: on
+
+
+def to_key(text):
+    """소문자 + 한글 음절을 자모로 분해"""
+    key = []
+    for char in text.lower():
+        code = ord(char) - 0xAC00
+        if 0 <= code < 11172:
+            key.append(CHOSEONG[code // 588])
+            key.append(JUNGSEONG[(code % 588) // 28])
+            key.append(JONGSEONG[code % 28])
+        else:
+            key.append(COMPOUND_JAMO.get(char, char))
+    return "".join(key)
+
+
+def label_keys(label):
+    """label의 단어 시작 위치마다 key 하나"""
+    label = " ".join(label.split())[:MAX_LABEL_LENGTH]
+    words = label.split(" ")
+    return {to_key(" ".join(words[i:])) for i in range(min(len(words), MAX_WORDS))}
+
+
+def _load():
+    for pk, title in Product.objects.filter(open=True).values_list("pk", "title").iterator():
+        yield ("product", pk), title
+    for pk, farm_name in Farmer.objects.values_list("pk", "farm_name").iterator():
+        yield ("farmer", pk), farm_name
+    for pk, tag in Farm_Tag.objects.values_list("pk", "tag").iterator():
+        yield ("tag", pk), tag
+
+
+def _url(kind, pk, label):
+    if kind == "product":
+        return reverse("products:product_detail", args=[pk])
+    if kind == "farmer":
+        return reverse("farmers:farmer_detail", args=[pk])
+    return reverse("farmers:farm_tag_search") + "?" + urlencode({"search_tag": label})
+
+
+class PrefixIndex:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.keys = []  # 정렬된 key
+        self.refs = []  # keys와 같은 위치의 (kind, pk)
+        self.labels = {}  # (kind, pk) -> label
+        self.version = LocalVersion(VERSION_KEY)
+        self.built = False
+        self.building = False
+        self.checked_at = 0
+
+    def build(self):
+        # 색인 중 다른 process의 변경을 놓치지 않도록 version을 먼저 읽음
+        version = self.version.current()
+        labels = dict(_load())
+        entries = sorted((key, ref) for ref, label in labels.items() for key in label_keys(label))
+        with self.lock:
+            self.keys = [key for key, _ in entries]
+            self.refs = [ref for _, ref in entries]
+            self.labels = labels
+            self.version.loaded(version)
+            self.built = True
+
+    def _build_in_background(self):
+        try:
+            self.build()
+        except Exception:
+            logger.exception("autocomplete index build failed")
+        finally:
+            self.building = False
+            connection.close()
+
+    def build_later(self):
+        with self.lock:
+            if self.building:
+                return
+            self.building = True
+        threading.Thread(target=self._build_in_background, daemon=True).start()
+
+    def _ensure(self):
+        now = time.monotonic()
+        if self.version.version is not None and now - self.checked_at < VERSION_CHECK_INTERVAL:
+            return
+        self.checked_at = now
+        if not self.version.is_stale():
+            return
+        if self.built:
+            self.build_later()
+        else:
+            self.build()
+
+    def _remove(self, ref):
+        label = self.labels.pop(ref, None)
+        if label is None:
+            return
+        for key in label_keys(label):
+            i = bisect_left(self.keys, key)
+            while i < len(self.keys) and self.keys[i] == key:
+                if self.refs[i] == ref:
+                    del self.keys[i]
+                    del self.refs[i]
+                    break
+                i += 1
+
+    def _add(self, ref, label):
+        self.labels[ref] = label
+        for key in label_keys(label):
+            i = bisect_right(self.keys, key)
+            self.keys.insert(i, key)
+            self.refs.insert(i, ref)
+
+    def update(self, kind, pk, label=None):
+        """label이 None이면 색인에서 제거"""
+        ref = (kind, pk)
+        label = label or None
+        with self.lock:
+            # 색인이 최신이고 label이 그대로면 version을 올리지 않음 (다른 process 재색인 방지)
+            if self.built and self.version.version is not None and self.labels.get(ref) == label:
+                return
+            # 이 process에 최신 색인이 있을 때만 증분 반영 - 아니면 다음 조회 때 다시 색인
+            if self.version.bump():
+                self._remove(ref)
+                if label:
+                    self._add(ref, label)
+
+    def lookup(self, query, limit=DEFAULT_LIMIT):
+        self._ensure()
+        prefix = to_key(" ".join(query.split()))
+        if not prefix:
+            return []
+        results = []
+        seen = set()
+        with self.lock:
+            i = bisect_left(self.keys, prefix)
+            while i < len(self.keys) and self.keys[i].startswith(prefix):
+                ref = self.refs[i]
+                if ref not in seen:
+                    seen.add(ref)
+                    results.append((ref, self.labels[ref]))
+                    if len(results) >= limit:
+                        break
+                i += 1
+        return results
+
+    def stats(self):
+        return {
+            "labels": len(self.labels),
+            "keys": len(self.keys),
+            "version": self.version.version,
+        }
+
+
+index = PrefixIndex()
+
+
+def autocomplete(query, limit=DEFAULT_LIMIT):
+    return [
+        {"kind": kind, "pk": pk, "label": label, "url": _url(kind, pk, label)}
+        for (kind, pk), label in index.lookup(query, limit)
+    ]
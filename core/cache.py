@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.safestring import mark_safe
+
+"""
+메인 페이지(core.views.index) section별 fragment cache
+- section html을 통째로 cache, 관련 model 저장/삭제 시 signal로 무효화 (core.signals)
+- section별 hit / miss 횟수를 cache에 함께 기록
+"""
+
+INDEX_SECTIONS = ("slider", "today_pick", "best", "editor_pick", "today_farmer")
+
+FRAGMENT_KEY = "fragment:index:%s"
+COUNTER_KEY = "fragment:index:%s:%s"
+
+
+def fragment_timeout():
+    # 시간 기반 만료 - signal이 발생하지 않는 queryset.update (재고, 판매율 등) 대비
+    return getattr(settings, "INDEX_FRAGMENT_TIMEOUT", 60 * 5)
+
+
+def _count(name, kind):
+    key = COUNTER_KEY % (name, kind)
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            # incr 직전에 만료/삭제된 경우
+            cache.set(key, 1, None)
+
+
+def get_fragment(name, render):
+    """section html 조회 - 없으면 render()로 만들어 저장"""
+    key = FRAGMENT_KEY % name
+    html = cache.get(key)
+    if html is not None:
+        _count(name, "hit")
+        return mark_safe(html)
+
+    _count(name, "miss")
+    html = render()
+    cache.set(key, html, fragment_timeout())
+    return mark_safe(html)
+
+
+def invalidate(*names):
+    cache.delete_many([FRAGMENT_KEY % name for name in names])
+
+
+def get_stats():
+    """section별 {"hit": n, "miss": n, "hit_rate": r}"""
+    keys = [COUNTER_KEY % (name, kind) for name in INDEX_SECTIONS for kind in ("hit", "miss")]
+    counts = cache.get_many(keys)
+
+    stats = {}
+    for name in INDEX_SECTIONS:
+        hit = counts.get(COUNTER_KEY % (name, "hit"), 0)
+        miss = counts.get(COUNTER_KEY % (name, "miss"), 0)
+        stats[name] = {
+            "hit": hit,
+            "miss": miss,
+            "hit_rate": hit / (hit + miss) if hit + miss else 0,
+        }
+    return stats
@@ -0,0 +1,114 @@
+from collections import Counter, defaultdict
+from django.conf import settings
+from django.db import connections
+from django.db.models import F
+import atexit
+import logging
+import threading
+import time
+import weakref
+
+"""
+조회수 buffer
+- 조회 시마다 row를 저장하지 않고 process 내 counter에 누적
+- flush 주기(HIT_FLUSH_INTERVAL초)가 지나거나 누적 대상이 많아지면
+  같은 증가량끼리 묶어 hits = F("hits") + n UPDATE로 반영
+- 요청이 없어도 background thread가 주기마다 flush, process 종료 시에도 flush
+  (flush 실패는 기록만 하고 남은 조회수는 다음 flush에서 다시 시도)
+"""
+
+logger = logging.getLogger(__name__)
+
+_buffers = weakref.WeakSet()
+_timer = None
+_timer_lock = threading.Lock()
+
+
+def flush_all():
+    """모든 buffer flush - 실패해도 예외를 올리지 않음"""
+    for buffer in list(_buffers):
+        buffer.safe_flush()
+
+
+def _run_timer(interval):
+    while True:
+        time.sleep(interval)
+        flush_all()
+        # 이 thread의 DB connection 정리
+        connections.close_all()
+
+
+def _start_timer():
+    global _timer
+    with _timer_lock:
+        if _timer is not None:
+            return
+        interval = getattr(settings, "HIT_FLUSH_INTERVAL", 30)
+        _timer = threading.Thread(target=_run_timer, args=(interval,), daemon=True)
+        _timer.start()
+
+
+# 종료 시 남은 조회수 반영
+atexit.register(flush_all)
+
+
+class HitBuffer:
+    def __init__(self, model, field_name="hits", max_pending=500):
+        self.model = model
+        self.field_name = field_name
+        self.max_pending = max_pending
+        self.pending = Counter()
+        self.last_flush = time.monotonic()
+        self.lock = threading.Lock()
+        _buffers.add(self)
+
+    @property
+    def flush_interval(self):
+        return getattr(settings, "HIT_FLUSH_INTERVAL", 30)
+
+    def add(self, pk, count=1):
+        _start_timer()
+        with self.lock:
+            self.pending[int(pk)] += count
+            due = (
+                len(self.pending) >= self.max_pending
+                or time.monotonic() - self.last_flush >= self.flush_interval
+            )
+        if due:
+            self.safe_flush()
+
+    def safe_flush(self):
+        try:
+            return self.flush()
+        except Exception:
+            # 조회수 반영 실패가 조회 요청을 실패시키지 않도록 기록만 - 남은 조회수는 다음 flush에서
+            logger.exception("조회수 flush 실패 (%s)", self.model.__name__)
+            return 0
+
+    def flush(self):
+        """누적된 조회수 반영 - 증가량이 같은 row끼리 UPDATE 한 번, 반영한 row 수 반환"""
+        with self.lock:
+            pending, self.pending = self.pending, Counter()
+            self.last_flush = time.monotonic()
+
+        if not pending:
+            return 0
+
+        by_count = defaultdict(list)
+        for pk, count in pending.items():
+            by_count[count].append(pk)
+
+        updated = 0
+        groups = list(by_count.items())
+        for i, (count, pks) in enumerate(groups):
+            try:
+                updated += self.model.objects.filter(pk__in=pks).update(
+                    **{self.field_name: F(self.field_name) + count}
+                )
+            except Exception:
+                # 반영하지 못한 조회수는 다음 flush에서 다시 시도
+                with self.lock:
+                    for count, pks in groups[i:]:
+                        self.pending.update({pk: count for pk in pks})
+                raise
+        return updated
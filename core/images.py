@@ -0,0 +1,340 @@
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db import connection
+from PIL import Image, ImageOps
+import os
+import queue
+import threading
+import time
+
+
+"""
+이미지 WebP 변환 pipeline
+- 기본(동기) : upload request 안에서 WebP로 변환 후 저장
+- COMPRESSED_IMAGE_DEFERRED = True : 원본을 먼저 저장하고 process pool에서 변환한 뒤 WebP로 교체
+- thumbnail : COMPRESSED_IMAGE_SIZES 너비별 <name>_<width>w.webp
+  (thumbnails=True 필드는 upload 시 생성, 그 외에는 template tag에서 발견 시 background에서 생성)
+"""
+
+# 교체 대상 row가 아직 저장(commit)되지 않은 경우 재시도 간격 / 횟수 (background worker thread)
+SWAP_RETRY_SECONDS = 0.5
+SWAP_RETRY_COUNT = 20
+
+# thumbnail url cache (렌더링 중 storage 존재 여부 확인 생략용)
+THUMBNAIL_CACHE_KEY = "thumbnail:%s"
+THUMBNAIL_CACHE_TIMEOUT = 60 * 60 * 24
+MISSING_SOURCE_TIMEOUT = 60 * 10
+THUMBNAIL_SOURCE_EXTENSIONS = (".webp", ".jpg", ".jpeg", ".png", ".gif", ".bmp")
+
+_executor = None
+_executor_lock = threading.Lock()
+
+_jobs = queue.Queue()
+_worker = None
+_worker_lock = threading.Lock()
+
+_metrics_lock = threading.Lock()
+_metrics = {"count": 0, "encode_time": 0.0, "bytes_in": 0, "bytes_out": 0, "errors": 0}
+
+
+def _open(data):
+    image = Image.open(BytesIO(data))
+    image = image.convert("RGB")
+    return ImageOps.exif_transpose(image)
+
+
+def _encode(image):
+    im_io = BytesIO()
+    image.save(im_io, "webp", optimize=True)
+    return im_io.getvalue()
+
+
+def _resize(image, width):
+    if image.width <= width:
+        return image
+    height = round(image.height * width / image.width)
+    return image.resize((width, height), Image.LANCZOS)
+
+
+def encode_webp(data, width=None):
+    """이미지 bytes -> (EXIF 회전 적용된) WebP bytes, width 지정 시 해당 너비 이하로 축소"""
+    image = _open(data)
+    if width:
+        image = _resize(image, width)
+    return _encode(image)
+
+
+def encode_with_thumbnails(data, sizes=()):
+    """원본 WebP와 너비별 thumbnail WebP를 한 번의 decode로 생성 - (원본 bytes, {너비: bytes})"""
+    image = _open(data)
+    thumbnails = {width: _encode(_resize(image, width)) for width in sizes}
+    return _encode(image), thumbnails
+
+
+def webp_name(name):
+    return f"{os.path.splitext(name)[0]}.webp"
+
+
+def thumbnail_name(name, width):
+    return f"{os.path.splitext(name)[0]}_{width}w.webp"
+
+
+def thumbnail_sizes():
+    return getattr(settings, "COMPRESSED_IMAGE_SIZES", (320, 640, 1024))
+
+
+def is_deferred():
+    return getattr(settings, "COMPRESSED_IMAGE_DEFERRED", False)
+
+
+def get_executor():
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=getattr(settings, "COMPRESSED_IMAGE_WORKERS", 2)
+            )
+        return _executor
+
+
+def record(elapsed, bytes_in, bytes_out, error=False):
+    with _metrics_lock:
+        if error:
+            _metrics["errors"] += 1
+            return
+        _metrics["count"] += 1
+        _metrics["encode_time"] += elapsed
+        _metrics["bytes_in"] += bytes_in
+        _metrics["bytes_out"] += bytes_out
+
+
+def get_metrics():
+    """변환 횟수, 총/평균 변환 시간, 절약한 용량(bytes)"""
+    with _metrics_lock:
+        metrics = dict(_metrics)
+    metrics["bytes_saved"] = metrics["bytes_in"] - metrics["bytes_out"]
+    count = metrics["count"]
+    metrics["avg_encode_time"] = metrics["encode_time"] / count if count else 0
+    return metrics
+
+
+def read_content(content):
+    if hasattr(content, "seek"):
+        content.seek(0)
+    data = content.read()
+    if hasattr(content, "seek"):
+        content.seek(0)
+    return data
+
+
+def save_thumbnails(storage, name, thumbnails):
+    """너비별 thumbnail을 원본 이름 기준(<name>_<width>w.webp)으로 저장하고 cache에 url 기록"""
+    for width, encoded in thumbnails.items():
+        path = thumbnail_name(name, width)
+        if storage.exists(path):
+            storage.delete(path)
+        storage.save(path, ContentFile(encoded))
+        cache.set(THUMBNAIL_CACHE_KEY % path, storage.url(path), THUMBNAIL_CACHE_TIMEOUT)
+
+
+def has_thumbnails(field_file):
+    # 기본 이미지(static svg 등)는 원본 그대로 사용
+    name = field_file.name.lower()
+    return not name.startswith("..") and name.endswith(THUMBNAIL_SOURCE_EXTENSIONS)
+
+
+def generate_thumbnails(storage, name, widths):
+    """
+    없는 너비의 thumbnail만 원본에서 생성 - 원본은 한 번만 읽고 decode
+    있는 thumbnail은 url만 cache에 기록
+    """
+    missing = []
+    for width in widths:
+        path = thumbnail_name(name, width)
+        if storage.exists(path):
+            cache.set(THUMBNAIL_CACHE_KEY % path, storage.url(path), THUMBNAIL_CACHE_TIMEOUT)
+        else:
+            missing.append(width)
+    if not missing:
+        return 0
+
+    with storage.open(name, "rb") as f:
+        image = _open(f.read())
+    save_thumbnails(storage, name, {width: _encode(_resize(image, width)) for width in missing})
+    return len(missing)
+
+
+_pending_thumbnails = set()
+_pending_lock = threading.Lock()
+
+
+class ThumbnailJob:
+    """template 렌더링 중 발견한 없는 thumbnail 생성 (background worker thread)"""
+
+    def __init__(self, storage, name, widths):
+        self.storage = storage
+        self.name = name
+        self.widths = widths
+
+    def run(self):
+        try:
+            generate_thumbnails(self.storage, self.name, self.widths)
+        except Exception:
+            # 원본을 읽을 수 없는 경우 (파일 누락 등) 한동안 원본 url 사용 - 렌더링마다 다시 시도하지 않음
+            url = self.storage.url(self.name)
+            cache.set_many(
+                {THUMBNAIL_CACHE_KEY % thumbnail_name(self.name, w): url for w in self.widths},
+                MISSING_SOURCE_TIMEOUT,
+            )
+            raise
+        finally:
+            with _pending_lock:
+                _pending_thumbnails.discard(self.name)
+        return True
+
+    def give_up(self):
+        pass
+
+
+def thumbnail_urls(field_file, widths):
+    """
+    {너비: thumbnail url} - 아직 없는 너비는 None
+    렌더링 중에는 storage를 조회하거나 이미지를 변환하지 않는다
+    cache에 없는 thumbnail은 background에서 확인 / 생성하고 (generate_thumbnails command로 미리 생성 가능)
+    생성되기 전까지는 원본을 사용
+    """
+    keys = {width: THUMBNAIL_CACHE_KEY % thumbnail_name(field_file.name, width) for width in widths}
+    cached = cache.get_many(keys.values())
+    urls = {width: cached.get(key) for width, key in keys.items()}
+
+    missing = tuple(width for width, url in urls.items() if url is None)
+    if missing:
+        with _pending_lock:
+            queued = field_file.name in _pending_thumbnails
+            _pending_thumbnails.add(field_file.name)
+        if not queued:
+            run_in_background(ThumbnailJob(field_file.storage, field_file.name, missing))
+    return urls
+
+
+def thumbnail_url(field_file, width):
+    """너비 width의 thumbnail url - 아직 없으면 원본 url"""
+    if not has_thumbnails(field_file):
+        return field_file.url
+    return thumbnail_urls(field_file, (width,))[width] or field_file.url
+
+
+def compress(content, sizes=()):
+    """동기 변환 - (WebP bytes, {너비: thumbnail bytes}) 반환"""
+    data = read_content(content)
+    start = time.monotonic()
+    encoded, thumbnails = encode_with_thumbnails(data, sizes)
+    record(time.monotonic() - start, len(data), len(encoded))
+    return encoded, thumbnails
+
+
+def _run_jobs():
+    """
+    background worker thread - 변환이 끝난 뒤의 storage 저장 / DB 교체를 순서대로 처리
+    job이 False를 반환하면 (row가 아직 commit되지 않음) SWAP_RETRY_SECONDS 뒤에 다시 시도
+    """
+    waiting = []  # (다시 시도할 시각, 남은 횟수, job)
+    while True:
+        try:
+            job = _jobs.get(timeout=SWAP_RETRY_SECONDS if waiting else None)
+            waiting.append((0, SWAP_RETRY_COUNT, job))
+        except queue.Empty:
+            pass
+
+        now = time.monotonic()
+        retry = []
+        for due, remaining, job in waiting:
+            if due > now:
+                retry.append((due, remaining, job))
+                continue
+            try:
+                done = job.run()
+            except Exception:
+                record(0, 0, 0, error=True)
+                done = True
+            if done:
+                continue
+            if remaining > 1:
+                retry.append((now + SWAP_RETRY_SECONDS, remaining - 1, job))
+            else:
+                job.give_up()
+        waiting = retry
+        connection.close()
+
+
+def run_in_background(job):
+    """job.run() / job.give_up()을 background worker thread에서 실행"""
+    global _worker
+
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_run_jobs, name="compressed-image", daemon=True)
+            _worker.start()
+    _jobs.put(job)
+
+
+class SwapJob:
+    """WebP 변환본을 저장하고 model row의 파일 경로를 원본에서 WebP로 교체"""
+
+    def __init__(self, field_file, encoded, thumbnails):
+        self.instance = field_file.instance
+        self.attname = field_file.field.attname
+        self.storage = field_file.storage
+        self.original_name = field_file.name
+        self.encoded = encoded
+        self.thumbnails = thumbnails
+        self.new_name = None
+
+    def run(self):
+        if self.new_name is None:
+            self.new_name = self.storage.save(
+                webp_name(self.original_name), ContentFile(self.encoded)
+            )
+        if self.instance.pk is None:
+            return False
+        # 원본 경로를 그대로 가리키고 있는 경우에만 교체
+        updated = (
+            type(self.instance)
+            ._default_manager.filter(pk=self.instance.pk, **{self.attname: self.original_name})
+            .update(**{self.attname: self.new_name})
+        )
+        if not updated:
+            return False
+        self.storage.delete(self.original_name)
+        setattr(self.instance, self.attname, self.new_name)
+        save_thumbnails(self.storage, self.new_name, self.thumbnails)
+        return True
+
+    def give_up(self):
+        # 교체 대상이 없으면 (삭제되었거나 다른 파일로 변경) 변환본 삭제
+        if self.new_name is not None:
+            self.storage.delete(self.new_name)
+
+
+def compress_later(field_file, data, sizes=()):
+    """
+    원본 저장 후 호출 - process pool에서 WebP(+ thumbnail)로 변환하고,
+    완료되면 background worker thread에서 storage에 저장한 뒤 model row의 파일 경로를 WebP로 교체
+    (done callback은 process pool의 결과 처리 thread에서 실행되므로 I/O / 대기 없이 넘기기만 한다)
+    """
+    start = time.monotonic()
+
+    def done(future):
+        try:
+            encoded, thumbnails = future.result()
+        except Exception:
+            record(0, 0, 0, error=True)
+            return
+        record(time.monotonic() - start, len(data), len(encoded))
+        run_in_background(SwapJob(field_file, encoded, thumbnails))
+
+    get_executor().submit(encode_with_thumbnails, data, tuple(sizes)).add_done_callback(done)
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from core.autocomplete import index
+import random
+import time
+
+
+class Command(BaseCommand):
+    help = "자동완성 prefix 색인 구축 시간과 조회 지연(p50 / p99)을 측정합니다 - 현재 DB 기준"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--queries", type=int, default=10000, help="측정할 조회 횟수")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        index.build()
+        build_time = time.perf_counter() - start
+
+        labels = list(index.labels.values())
+        if not labels:
+            self.stdout.write(self.style.WARNING("No labels to benchmark!"))
+            return
+
+        # 색인된 label의 앞 1~3글자를 입력 중인 검색어로 사용
+        queries = [
+            label[: random.randint(1, 3)]
+            for label in random.choices(labels, k=options["queries"])
+        ]
+        timings = []
+        for query in queries:
+            start = time.perf_counter()
+            index.lookup(query)
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+
+        stats = index.stats()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Built {stats['labels']} labels / {stats['keys']} keys in {build_time:.2f}s, "
+                f"lookup p50 {timings[len(timings) // 2] * 1000:.3f}ms "
+                f"p99 {timings[int(len(timings) * 0.99)] * 1000:.3f}ms"
+            )
+        )
@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from comments.models import Editor_Review_Comment
+from editor_reviews.models import Editor_Review
+from users.editor_stats import get_comment_feed, with_editor_stats
+from users.models import Editor, User
+import time
+
+
+class Command(BaseCommand):
+    help = "리뷰가 많은 에디터의 마이페이지 통계 조회 query 수 / 시간을 측정합니다 - 측정용 data는 rollback"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reviews", type=int, default=500, help="에디터 리뷰 수")
+        parser.add_argument("--comments", type=int, default=5, help="리뷰당 댓글 수")
+        parser.add_argument("--repeat", type=int, default=20, help="측정 반복 횟수")
+
+    def measure(self, func, repeat):
+        with CaptureQueriesContext(connection) as queries:
+            func()
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return len(queries), (time.perf_counter() - start) / repeat * 1000
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            user = User.objects.create(username="benchmark_editor", nickname="benchmark")
+            editor = Editor.objects.create(user=user)
+            Editor_Review.objects.bulk_create(
+                Editor_Review(author=editor, title=f"리뷰 {i}", contents="내용", hits=i)
+                for i in range(options["reviews"])
+            )
+            Editor_Review_Comment.objects.bulk_create(
+                Editor_Review_Comment(
+                    editor_review=review, author=user, text="댓글", is_read=i % 2 == 0
+                )
+                for review in Editor_Review.objects.filter(author=editor)
+                for i in range(options["comments"])
+            )
+
+            def stats():
+                annotated = with_editor_stats(Editor.objects.filter(pk=editor.pk)).get()
+                return (
+                    annotated.review_count(),
+                    annotated.review_hit_count(),
+                    annotated.unread_comment_count(),
+                )
+
+            def feed():
+                return list(get_comment_feed(editor)[:20])
+
+            Editor.clear_unread_comment_count(editor.pk)
+            for name, func in (("stats", stats), ("comment feed page", feed)):
+                count, elapsed = self.measure(func, options["repeat"])
+                self.stdout.write(self.style.SUCCESS(f"{name}: {count} queries, {elapsed:.2f}ms"))
+
+            Editor.clear_unread_comment_count(editor.pk)
+            transaction.set_rollback(True)
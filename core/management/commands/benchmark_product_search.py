@@ -0,0 +1,100 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from addresses.models import Address
+from farmers.models import Farmer
+from products import search
+from products.models import Category, Product
+from users.models import User
+import random
+import time
+
+FRUITS = ["사과", "배", "감귤", "한라봉", "복숭아", "포도", "딸기", "참외", "수박", "블루베리"]
+VEGETABLES = ["감자", "고구마", "양파", "당근", "배추", "무", "오이", "토마토", "단호박", "대파"]
+ADJECTIVES = ["못난이", "꿀", "유기농", "무농약", "햇", "흠과", "가정용", "선물용", "산지직송", "대과"]
+REGIONS = ["청송", "나주", "제주", "영주", "성주", "해남", "고창", "강원", "논산", "상주"]
+
+
+class Command(BaseCommand):
+    help = (
+        "상품 검색 색인 cold build 시간과 검색 지연(p50 / p99)을 측정합니다 "
+        "- 가상 상품을 만들어 측정한 뒤 rollback"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--products", type=int, default=100000, help="가상 상품 수")
+        parser.add_argument("--queries", type=int, default=1000, help="측정할 검색 횟수")
+        parser.add_argument("--batch-size", type=int, default=2000, help="한 번에 색인할 상품 수")
+
+    def seed(self, count):
+        user = User.objects.create(username="benchmark_farmer", nickname="benchmark")
+        farmer = Farmer.objects.create(
+            user=user,
+            address=Address.objects.create(full_address="서울시", user=user),
+            farm_name="벤치마크 농장",
+        )
+        fruit = Category.objects.create(name="과일", slug="benchmark-fruit")
+        vegetable = Category.objects.create(name="채소", slug="benchmark-vegetable")
+        categories = [
+            Category.objects.create(name=name, slug=f"{parent.slug}-{i}", parent=parent)
+            for parent, names in ((fruit, FRUITS), (vegetable, VEGETABLES))
+            for i, name in enumerate(names)
+        ]
+
+        def product(i):
+            category = random.choice(categories)
+            return Product(
+                farmer=farmer,
+                category=category,
+                title=f"{random.choice(ADJECTIVES)} {random.choice(REGIONS)} {category.name}",
+                sub_title=f"{random.choice(REGIONS)}에서 바로 보내는 {category.name} {i}",
+                desc=f"{random.choice(ADJECTIVES)} {category.name} - {random.choice(REGIONS)}",
+                weight=random.choice([1, 2, 5, 10]),
+                open=True,
+            )
+
+        Product.objects.bulk_create((product(i) for i in range(count)), batch_size=2000)
+        return [category.name for category in categories]
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            start = time.perf_counter()
+            names = self.seed(options["products"])
+            seed_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            indexed = search.index_products(
+                Product.objects.filter(farmer__farm_name="벤치마크 농장"),
+                batch_size=options["batch_size"],
+            )
+            build_time = time.perf_counter() - start
+
+            # 카테고리 이름 / 지역 + 카테고리 / 수식어 + 카테고리
+            queries = [
+                random.choice(
+                    [
+                        name,
+                        f"{random.choice(REGIONS)} {name}",
+                        f"{random.choice(ADJECTIVES)} {name}",
+                    ]
+                )
+                for name in random.choices(names, k=options["queries"])
+            ]
+            search.get_stats()
+            timings = []
+            for query in queries:
+                start = time.perf_counter()
+                search.search_products(query)
+                timings.append(time.perf_counter() - start)
+            timings.sort()
+
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Seeded {options['products']} Products in {seed_time:.2f}s, "
+                    f"indexed {indexed} in {build_time:.2f}s, "
+                    f"search p50 {timings[len(timings) // 2] * 1000:.1f}ms "
+                    f"p99 {timings[int(len(timings) * 0.99)] * 1000:.1f}ms"
+                )
+            )
+
+            search.clear_stats()
+            transaction.set_rollback(True)
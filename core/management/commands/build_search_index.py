@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from products.models import Product
+from products.search import index_products
+import time
+
+
+class Command(BaseCommand):
+    help = "전체 상품의 검색 색인(n-gram 역색인)을 다시 만들고 소요 시간을 출력합니다"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", default=500, type=int, help="한 번에 색인할 상품 수")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        indexed = index_products(Product.objects.all(), batch_size=options.get("batch_size"))
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            self.style.SUCCESS(f"Indexed {indexed} Products in {elapsed:.2f}s!")
+        )
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+from products.models import Product, Category
+from farmers.models import Farmer
+from users.models import Consumer, Editor
+from core.query_plans import hot_queries, full_scans
+
+
+class Command(BaseCommand):
+    help = "주요 view의 조회 query에 대한 실행 계획(EXPLAIN)을 출력합니다 - index 없이 SCAN하는 query가 있으면 실패"
+
+    def handle(self, *args, **options):
+        queries = hot_queries(
+            Farmer.objects.first(),
+            Consumer.objects.first(),
+            Category.objects.exclude(parent=None).first(),
+            Product.objects.first(),
+            Editor.objects.first(),
+        )
+
+        failed = []
+        for name, queryset in queries.items():
+            self.stdout.write(self.style.SUCCESS(f"== {name} =="))
+            self.stdout.write(str(queryset.query))
+            self.stdout.write(queryset.explain())
+            self.stdout.write("")
+            if full_scans(queryset):
+                failed.append(name)
+
+        if failed:
+            raise CommandError(f"Full table scan in: {', '.join(failed)}")
@@ -0,0 +1,33 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from core.images import generate_thumbnails, has_thumbnails, thumbnail_sizes
+from core.models import CompressedImageField
+
+
+class Command(BaseCommand):
+    help = "thumbnails=True 이미지 필드의 너비별 thumbnail 중 없는 것을 미리 생성합니다"
+
+    def handle(self, *args, **options):
+        widths = sorted(thumbnail_sizes())
+        created, errors = 0, 0
+        for model in apps.get_models():
+            fields = [
+                field.name
+                for field in model._meta.get_fields()
+                if isinstance(field, CompressedImageField) and field.thumbnails
+            ]
+            if not fields:
+                continue
+            for instance in model._default_manager.only("pk", *fields).iterator():
+                for name in fields:
+                    field_file = getattr(instance, name)
+                    if not field_file or not has_thumbnails(field_file):
+                        continue
+                    try:
+                        created += generate_thumbnails(field_file.storage, field_file.name, widths)
+                    except Exception as e:
+                        errors += 1
+                        self.stderr.write(f"{model.__name__} {instance.pk} {name}: {e!r}")
+        self.stdout.write(
+            self.style.SUCCESS(f"Created {created} thumbnails ({errors} images failed)")
+        )
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError
+from core import textsearch
+
+
+class Command(BaseCommand):
+    help = "농가 / 농가 스토리 검색 색인(FTS5 table 생성 포함 또는 trigram)을 다시 만듭니다"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--kind", default=None, help="farmer / farmer_story (기본: 전체)")
+
+    def handle(self, *args, **options):
+        try:
+            backend = textsearch.rebuild(options["kind"])
+        except OperationalError as e:
+            # FTS5 trigram tokenizer를 지원하지 않는 SQLite - 검색은 ORM으로 계속 동작
+            raise CommandError(f"FTS5 색인을 만들 수 없습니다 (ORM 검색 사용): {e}")
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt text search index ({backend})!"))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from products.models import Product, refresh_sales_rate
+
+
+class Command(BaseCommand):
+    help = "전체 상품의 판매율(sales_rate)을 한 번의 UPDATE로 재계산합니다"
+
+    def handle(self, *args, **options):
+        updated = refresh_sales_rate(Product.objects.all())
+        self.stdout.write(self.style.SUCCESS(f"Recalculated sales_rate of {updated} Products!"))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from likes.services import dedupe_likes, reconcile_like_counts
+
+
+class Command(BaseCommand):
+    help = "중복 좋아요를 정리하고 좋아요 table 기준으로 게시물 / 댓글의 좋아요 수(num_likes)를 재계산합니다"
+
+    def handle(self, *args, **options):
+        removed = dedupe_likes()
+        updated = reconcile_like_counts()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Removed {removed} duplicate likes, reconciled like counts of {updated} rows!"
+            )
+        )
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from products.ratings import reconcile
+
+
+class Command(BaseCommand):
+    help = "Product_Comment를 GROUP BY 한 번으로 집계하여 전체 상품의 리뷰 수 / 평점 필드를 재계산합니다"
+
+    def handle(self, *args, **options):
+        updated = reconcile()
+        self.stdout.write(self.style.SUCCESS(f"Reconciled ratings of {updated} Products!"))
@@ -5,7 +5,7 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         Category.objects.create(name='과일', slug='fruit', parent=None)
         Category.objects.create(name='야채', slug='vege', parent=None)
-        Category.objects.create(name='기타', slug='etc', parent=None)
+        Category.objects.create(name='기타', slug='others', parent=None)
         Category.objects.create(name='사과', slug='apple', parent=Category.objects.get(name='과일'))
         Category.objects.create(name='포도', slug='grape', parent=Category.objects.get(name='과일'))
         Category.objects.create(name='딸기', slug='strawberry', parent=Category.objects.get(name='과일'))
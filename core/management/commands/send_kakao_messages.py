@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from kakaomessages import outbox
+
+
+class Command(BaseCommand):
+    help = "알림톡 발송 대기열(outbox)의 메시지를 send-many로 묶어서 발송합니다"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="interval 마다 계속 발송 (worker 모드)")
+        parser.add_argument("--interval", type=int, default=5, help="worker 모드 발송 주기(초)")
+        parser.add_argument("--batch-size", type=int, default=outbox.BATCH_SIZE)
+        parser.add_argument("--stats", action="store_true", help="대기열 상태만 출력")
+
+    def handle(self, *args, **options):
+        if options["stats"]:
+            for key, value in outbox.stats().items():
+                self.stdout.write(f"{key}: {value}")
+            return
+
+        if options["loop"]:
+            outbox.run_worker(options["interval"], options["batch_size"])
+            return
+
+        sent, failed = outbox.flush(options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Sent {sent} messages, {failed} failed (will retry)"))
@@ -1,33 +1,51 @@
 from django.db import models
-from io import BytesIO
 from django.db.models.fields.files import ImageFieldFile
-from django.core.files import File
-from PIL import Image, ImageOps
-import os
+from django.core.files.base import ContentFile
+from .images import (
+    compress,
+    compress_later,
+    is_deferred,
+    read_content,
+    save_thumbnails,
+    thumbnail_sizes,
+    webp_name,
+)
 
 # Create your models here.
 
 
 class CompressedImageFieldFile(ImageFieldFile):
     def save(self, name, content, save=True):
-        # Compressed Image
-        image = Image.open(content)
-        image = image.convert("RGB")
-        image = ImageOps.exif_transpose(image)
-        im_io = BytesIO()
-        image.save(im_io, "webp", optimize=True)
+        sizes = thumbnail_sizes() if self.field.thumbnails else ()
 
-        # Change extension
-        filename = os.path.splitext(name)[0]
-        filename = f"{filename}.webp"
+        # Deferred - 원본을 먼저 저장하고 WebP 변환은 background에서 처리 (core.images)
+        if is_deferred():
+            data = read_content(content)
+            super().save(name, ContentFile(data), save)
+            compress_later(self, data, sizes)
+            return
 
-        image = File(im_io, name=filename)
-        super().save(filename, image, save)
+        # Compressed Image
+        filename = webp_name(name)
+        encoded, thumbnails = compress(content, sizes)
+        super().save(filename, ContentFile(encoded, name=filename), save)
+        save_thumbnails(self.storage, self.name, thumbnails)
 
 
 class CompressedImageField(models.ImageField):
     attr_class = CompressedImageFieldFile
 
+    def __init__(self, *args, thumbnails=False, **kwargs):
+        # thumbnails=True : upload 시 COMPRESSED_IMAGE_SIZES 너비별 thumbnail 함께 생성
+        self.thumbnails = thumbnails
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.thumbnails:
+            kwargs["thumbnails"] = True
+        return name, path, args, kwargs
+
 
 class Main_Slider_Image(models.Model):
 
@@ -0,0 +1,124 @@
+from django.core.cache import cache
+from django.db.models import Q
+import base64
+import json
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class CursorPage:
+    """CursorPaginator가 반환하는 한 페이지 분량의 결과"""
+
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class CursorPaginator:
+    """
+    Keyset(cursor) Pagination
+    OFFSET 대신 (정렬 필드, pk) 값을 기준으로 다음/이전 페이지를 가져오므로
+    페이지가 깊어져도 조회 비용이 일정하다.
+
+    ordering : "-create_at", "sales_rate", "stock" 처럼 정렬 필드 하나 (pk가 tie-breaker로 붙음)
+    count_cache_key : 지정 시 전체 개수(count)를 cache에 저장해 근사값으로 재사용
+    """
+
+    def __init__(self, queryset, ordering, per_page, count_cache_key=None, count_timeout=300):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.descending = ordering.startswith("-")
+        self.field_name = ordering.lstrip("-")
+        self.field = queryset.model._meta.get_field(self.field_name)
+        self.count_cache_key = count_cache_key
+        self.count_timeout = count_timeout
+
+    # cursor encode / decode
+    def encode_cursor(self, obj):
+        value = self.field.value_to_string(obj)
+        data = json.dumps([value, obj.pk])
+        return base64.urlsafe_b64encode(data.encode()).decode()
+
+    def decode_cursor(self, cursor):
+        try:
+            value, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+            return self.field.to_python(value), int(pk)
+        except Exception:
+            raise InvalidCursor
+
+    def _ordering(self, descending):
+        prefix = "-" if descending else ""
+        return (prefix + self.field_name, prefix + "pk")
+
+    def _after(self, value, pk, descending):
+        """정렬 방향 기준으로 (value, pk) 다음에 오는 row 조건"""
+        lookup = "lt" if descending else "gt"
+        return Q(**{f"{self.field_name}__{lookup}": value}) | Q(
+            **{self.field_name: value, f"pk__{lookup}": pk}
+        )
+
+    def page(self, cursor=None, previous=False):
+        """
+        cursor가 없으면 첫 페이지
+        previous=True이면 cursor 이전 페이지를 가져온다
+        """
+        if cursor:
+            value, pk = self.decode_cursor(cursor)
+        else:
+            value, pk, previous = None, None, False
+
+        # 이전 페이지는 정렬 방향을 뒤집어 가져온 뒤 다시 뒤집는다
+        descending = self.descending != previous
+        qs = self.queryset.order_by(*self._ordering(descending))
+        if cursor:
+            qs = qs.filter(self._after(value, pk, descending))
+
+        # 한 개를 더 가져와 다음 페이지 존재 여부 확인
+        rows = list(qs[: self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+
+        if previous:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, cursor is not None
+
+        next_cursor = self.encode_cursor(rows[-1]) if rows and has_next else None
+        previous_cursor = self.encode_cursor(rows[0]) if rows and has_previous else None
+        return CursorPage(rows, self, next_cursor, previous_cursor)
+
+    @property
+    def count(self):
+        """전체 개수 - count_cache_key가 있으면 cache된 근사값 사용"""
+        if self.count_cache_key is None:
+            return self.queryset.count()
+
+        count = cache.get(self.count_cache_key)
+        if count is None:
+            count = self.queryset.count()
+            cache.set(self.count_cache_key, count, self.count_timeout)
+        return count
+
+    @property
+    def num_pages(self):
+        count = self.count
+        if count == 0:
+            return 1
+        return (count + self.per_page - 1) // self.per_page
@@ -0,0 +1,57 @@
+from comments.models import Editor_Review_Comment, Product_Comment
+from orders.models import Order_Detail, Order_Group
+from products.categories import get_tree
+from products.models import Product
+from products.views import product_comments_queryset
+
+"""
+주요 view 조회 query의 실행 계획(EXPLAIN) 확인
+- hot_queries() : view가 실제로 실행하는 queryset과 같은 조건 / 정렬
+- full_scans() : SQLite 실행 계획에서 index 없이 table 전체를 읽는 단계(SCAN <table>)
+explain_queries command와 core.tests에서 index 회귀 확인용으로 사용
+"""
+
+# index가 있어 SCAN이 나오면 안 되는 table
+INDEXED_TABLES = tuple(
+    model._meta.db_table
+    for model in (Product, Order_Detail, Order_Group, Product_Comment, Editor_Review_Comment)
+)
+
+
+def hot_queries(farmer, consumer, category, product, editor):
+    """{이름: queryset} - 각 view의 조회 조건을 그대로 사용"""
+    newest = ("-create_at", "-pk")  # CursorPaginator 정렬 (정렬 필드 + pk)
+    return {
+        # products.views.store_list_all / store_list_cat
+        "store_list_all": Product.objects.filter(open=True).order_by(*newest)[:16],
+        "store_list_cat": Product.objects.filter(
+            category__in=get_tree().descendants(category.pk), open=True
+        ).order_by(*newest)[:16],
+        # farmers.views.FarmerMyPageProductManage
+        "farmer_mypage_product": Product.objects.filter(farmer=farmer, status="sale"),
+        # farmers.models.Farmer.order_status_counts / FarmerMyPageOrderManage
+        "farmer_mypage_order": Order_Detail.objects.filter(product__farmer=farmer)
+        .exclude(status="wait")
+        .filter(status="payment_complete"),
+        # users.views.mypage - 주문 상태별 개수 / 주문 목록
+        "mypage_orders": Order_Detail.objects.filter(order_group__consumer=consumer)
+        .exclude(order_group__status="wait")
+        .order_by(*newest)[:6],
+        # products.views.product_detail
+        "product_detail_comments": product_comments_queryset(product)[:5],
+        # users.models.Editor.unread_comment_count
+        "editor_unread_comments": Editor_Review_Comment.objects.filter(
+            editor_review__author=editor, is_read=False
+        ),
+    }
+
+
+def full_scans(queryset):
+    """실행 계획 중 index 대상 table을 전체 SCAN하는 줄"""
+    return [
+        line
+        for line in queryset.explain().splitlines()
+        if any(f"SCAN {table}" in line for table in INDEXED_TABLES)
+        and "USING INDEX" not in line
+        and "USING COVERING INDEX" not in line
+    ]
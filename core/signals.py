@@ -0,0 +1,53 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from products.models import Product
+from editor_reviews.models import Editor_Review
+from farmers.models import Farmer, Farm_Tag
+from . import autocomplete
+from .cache import invalidate
+from .models import Main_Slider_Image
+
+
+@receiver([post_save, post_delete], sender=Product)
+def product_changed(sender, instance, **kwargs):
+    invalidate("today_pick", "best")
+
+
+@receiver([post_save, post_delete], sender=Editor_Review)
+def editor_review_changed(sender, instance, **kwargs):
+    invalidate("editor_pick")
+
+
+@receiver([post_save, post_delete], sender=Farmer)
+def farmer_changed(sender, instance, **kwargs):
+    # best section에 농가 정보 노출
+    invalidate("today_farmer", "best")
+
+
+@receiver([post_save, post_delete], sender=Main_Slider_Image)
+def main_slider_image_changed(sender, instance, **kwargs):
+    invalidate("slider")
+
+
+@receiver(post_save, sender=Product)
+def product_autocomplete(sender, instance, **kwargs):
+    # 판매 중(open)인 상품만 자동완성에 노출
+    autocomplete.index.update("product", instance.pk, instance.title if instance.open else None)
+
+
+@receiver(post_save, sender=Farmer)
+def farmer_autocomplete(sender, instance, **kwargs):
+    autocomplete.index.update("farmer", instance.pk, instance.farm_name)
+
+
+@receiver(post_save, sender=Farm_Tag)
+def farm_tag_autocomplete(sender, instance, **kwargs):
+    autocomplete.index.update("tag", instance.pk, instance.tag)
+
+
+@receiver(post_delete, sender=Product)
+@receiver(post_delete, sender=Farmer)
+@receiver(post_delete, sender=Farm_Tag)
+def autocomplete_deleted(sender, instance, **kwargs):
+    kind = {Product: "product", Farmer: "farmer", Farm_Tag: "tag"}[sender]
+    autocomplete.index.update(kind, instance.pk)
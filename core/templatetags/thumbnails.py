@@ -0,0 +1,40 @@
+from django import template
+from django.utils.html import format_html
+from core.images import has_thumbnails, thumbnail_sizes, thumbnail_urls
+from core.images import thumbnail_url as get_thumbnail_url
+
+register = template.Library()
+
+
+@register.simple_tag
+def thumbnail_url(image, width):
+    """
+    너비 width의 thumbnail url
+    ex) style="background-image: url({% thumbnail_url product.main_image 640 %})"
+    """
+    if not image:
+        return ""
+    return get_thumbnail_url(image, int(width))
+
+
+@register.simple_tag
+def srcset(image, sizes="100vw"):
+    """
+    <img> 태그의 src / srcset / sizes 속성
+    ex) <img {% srcset product.main_image "(max-width: 768px) 50vw, 320px" %} id="product_img">
+    thumbnail이 아직 만들어지지 않았으면 원본 src만 출력
+    """
+    if not image:
+        return ""
+    if not has_thumbnails(image):
+        return format_html('src="{}"', image.url)
+
+    urls = thumbnail_urls(image, sorted(thumbnail_sizes()))
+    if None in urls.values():
+        return format_html('src="{}"', image.url)
+
+    candidates = ", ".join(f"{url} {width}w" for width, url in urls.items())
+    # src는 가장 큰 후보 (srcset을 지원하지 않는 browser)
+    return format_html(
+        'src="{}" srcset="{}" sizes="{}"', list(urls.values())[-1], candidates, sizes
+    )
@@ -0,0 +1,113 @@
+from django.core.cache import cache
+from addresses.models import Address
+from comments.models import Editor_Review_Comment, Product_Comment
+from editor_reviews.models import Editor_Review
+from farmers.models import Farmer
+from orders.models import Order_Detail, Order_Group
+from products.models import Category, Product
+from users.models import Consumer, Editor, User
+
+"""
+test 공용 fixture 생성 함수 - 각 app의 tests.py에서 사용
+필수 필드만 채우고 나머지는 kwargs로 덮어쓴다
+"""
+
+_sequence = {"n": 0}
+
+
+def _next():
+    _sequence["n"] += 1
+    return _sequence["n"]
+
+
+def clear_cache():
+    """cache 기반 기능(fragment, 통계, 색인 version 등) test 간 격리"""
+    cache.clear()
+
+
+def make_user(**kwargs):
+    n = _next()
+    defaults = {
+        "username": f"user{n}",
+        "nickname": f"닉네임{n}",
+        "phone_number": "01000000000",
+        "profile_image": "profile_image/test.webp",
+    }
+    defaults.update(kwargs)
+    return User.objects.create(**defaults)
+
+
+def make_farmer(user=None, **kwargs):
+    user = user or make_user()
+    address = Address.objects.create(full_address="서울시", user=user)
+    defaults = {"farm_name": f"농장{user.pk}", "profile_title": "농가 소개"}
+    defaults.update(kwargs)
+    return Farmer.objects.create(user=user, address=address, **defaults)
+
+
+def make_consumer(user=None):
+    return Consumer.objects.create(user=user or make_user())
+
+
+def make_editor(user=None):
+    return Editor.objects.create(user=user or make_user())
+
+
+def make_category(name, slug, parent=None):
+    return Category.objects.create(name=name, slug=slug, parent=parent)
+
+
+def make_product(farmer, category, **kwargs):
+    defaults = {
+        "title": "못난이 사과",
+        "sub_title": "맛있는 사과",
+        "weight": 1,
+        "open": True,
+        "status": "sale",
+        "stock": 10,
+        "sell_price": 10000,
+        "main_image": "product_main_image/test.webp",
+    }
+    defaults.update(kwargs)
+    return Product.objects.create(farmer=farmer, category=category, **defaults)
+
+
+def make_order(consumer, product, status="payment_complete", quantity=1, group_status=None):
+    group = Order_Group.objects.create(consumer=consumer, status=group_status or status)
+    detail = Order_Detail.objects.create(
+        order_group=group,
+        product=product,
+        status=status,
+        quantity=quantity,
+        total_price=product.sell_price * quantity,
+    )
+    return group, detail
+
+
+def make_product_comment(product, consumer, rating=5, **kwargs):
+    return Product_Comment.objects.create(
+        product=product,
+        consumer=consumer,
+        text="리뷰",
+        freshness=rating,
+        flavor=rating,
+        cost_performance=rating,
+        **kwargs,
+    )
+
+
+def make_editor_review(editor, **kwargs):
+    defaults = {
+        "title": "에디터 리뷰",
+        "sub_title": "부제",
+        "contents": "내용",
+        "main_image": "editor_review_main_image/test.webp",
+    }
+    defaults.update(kwargs)
+    return Editor_Review.objects.create(author=editor, **defaults)
+
+
+def make_editor_review_comment(review, author, **kwargs):
+    return Editor_Review_Comment.objects.create(
+        editor_review=review, author=author, text="댓글", **kwargs
+    )
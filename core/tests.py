@@ -1,3 +1,322 @@
-from django.test import TestCase
+from io import BytesIO, StringIO
+from unittest import mock, skipUnless
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import OperationalError
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from core import hits, images, testing
+from core.autocomplete import VERSION_KEY, PrefixIndex
+from core.hits import HitBuffer
+from core.models import Main_Slider_Image
+from core.query_plans import hot_queries, full_scans
+from core.versions import LOCAL_TTL, LocalVersion
+from editor_reviews.models import Editor_Review
+from products.models import Product
+import shutil
+from PIL import Image, features
+import tempfile
+import threading
+import time
 
 # Create your tests here.
+
+
+class QueryPlanTest(TestCase):
+    """주요 view query가 index를 사용하는지 (SQLite EXPLAIN QUERY PLAN)"""
+
+    def setUp(self):
+        testing.clear_cache()
+        fruit = testing.make_category("과일", "fruit")
+        self.category = testing.make_category("사과", "apple", fruit)
+        self.farmer = testing.make_farmer()
+        self.consumer = testing.make_consumer()
+        self.editor = testing.make_editor()
+        self.product = testing.make_product(self.farmer, self.category)
+        testing.make_order(self.consumer, self.product)
+        testing.make_product_comment(self.product, self.consumer)
+        review = testing.make_editor_review(self.editor)
+        testing.make_editor_review_comment(review, self.consumer.user)
+
+    def test_hot_queries_use_indexes(self):
+        queries = hot_queries(
+            self.farmer, self.consumer, self.category, self.product, self.editor
+        )
+        for name, queryset in queries.items():
+            with self.subTest(query=name):
+                self.assertEqual(full_scans(queryset), [], queryset.explain())
+
+
+class FakeJob:
+    def __init__(self, results):
+        self.results = list(results)
+        self.runs = 0
+        self.finished = threading.Event()
+        self.gave_up = False
+
+    def run(self):
+        self.runs += 1
+        done = self.results.pop(0)
+        if done:
+            self.finished.set()
+        return done
+
+    def give_up(self):
+        self.gave_up = True
+        self.finished.set()
+
+
+class SwapJobTest(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.slide = Main_Slider_Image(image="main_slider_images/slide.jpg")
+        self.storage = self.slide.image.storage
+        self.storage.save("main_slider_images/slide.jpg", ContentFile(b"jpeg"))
+
+    def job(self):
+        return images.SwapJob(self.slide.image, b"webp", {320: b"thumb"})
+
+    def test_waits_for_unsaved_row(self):
+        job = self.job()
+        self.assertFalse(job.run())
+        self.slide.save()
+        self.assertTrue(job.run())
+
+        self.slide.refresh_from_db()
+        self.assertEqual(self.slide.image.name, job.new_name)
+        self.assertTrue(job.new_name.endswith(".webp"))
+        self.assertFalse(self.storage.exists("main_slider_images/slide.jpg"))
+        self.assertTrue(self.storage.exists(images.thumbnail_name(job.new_name, 320)))
+
+    def test_give_up_deletes_converted_file(self):
+        job = self.job()
+        self.slide.save()
+        Main_Slider_Image.objects.update(image="main_slider_images/other.jpg")
+        self.assertFalse(job.run())
+        job.give_up()
+        self.assertFalse(self.storage.exists(job.new_name))
+        self.assertTrue(self.storage.exists("main_slider_images/slide.jpg"))
+
+
+class BackgroundJobTest(TestCase):
+    @mock.patch.object(images, "SWAP_RETRY_SECONDS", 0.01)
+    def test_retries_then_gives_up(self):
+        retried = FakeJob([False, False, True])
+        images.run_in_background(retried)
+        self.assertTrue(retried.finished.wait(5))
+        self.assertEqual(retried.runs, 3)
+
+        with mock.patch.object(images, "SWAP_RETRY_COUNT", 2):
+            failed = FakeJob([False, False])
+            images.run_in_background(failed)
+            self.assertTrue(failed.finished.wait(5))
+        self.assertTrue(failed.gave_up)
+
+
+skip_without_webp = skipUnless(features.check("webp"), "Pillow WebP 지원 필요")
+
+
+def jpeg_bytes(width=1200, height=800):
+    output = BytesIO()
+    Image.new("RGB", (width, height), "red").save(output, "jpeg")
+    return output.getvalue()
+
+
+class ThumbnailTest(TestCase):
+    def setUp(self):
+        testing.clear_cache()
+        images._pending_thumbnails.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.slide = Main_Slider_Image(image="main_slider_images/slide.jpg")
+        self.storage = self.slide.image.storage
+        self.storage.save("main_slider_images/slide.jpg", ContentFile(jpeg_bytes()))
+
+    def render(self):
+        return Template('{% load thumbnails %}<img {% srcset image "50vw" %}>').render(
+            Context({"image": self.slide.image})
+        )
+
+    def wait_for_thumbnails(self):
+        paths = [images.thumbnail_name(self.slide.image.name, w) for w in (320, 640, 1024)]
+        for _ in range(200):
+            if all(cache.get(images.THUMBNAIL_CACHE_KEY % path) for path in paths):
+                return
+            time.sleep(0.01)
+        self.fail("thumbnail이 생성되지 않음")
+
+    def test_render_does_not_generate_inline(self):
+        with mock.patch.object(images, "run_in_background") as run_in_background:
+            html = self.render()
+        self.assertEqual(html, '<img src="/media/main_slider_images/slide.jpg">')
+        self.assertEqual(run_in_background.call_count, 1)
+        self.assertFalse(self.storage.exists("main_slider_images/slide_320w.webp"))
+
+    @skip_without_webp
+    def test_srcset_after_background_generation(self):
+        self.render()
+        self.wait_for_thumbnails()
+        html = self.render()
+        self.assertIn('src="/media/main_slider_images/slide_1024w.webp"', html)
+        self.assertIn("/media/main_slider_images/slide_320w.webp 320w", html)
+        self.assertIn('sizes="50vw"', html)
+
+    @skip_without_webp
+    def test_generate_decodes_source_once(self):
+        with mock.patch.object(images, "_open", wraps=images._open) as decode:
+            created = images.generate_thumbnails(
+                self.storage, self.slide.image.name, (320, 640, 1024)
+            )
+        self.assertEqual((created, decode.call_count), (3, 1))
+        self.assertEqual(
+            images.generate_thumbnails(self.storage, self.slide.image.name, (320, 640)), 0
+        )
+
+    @skip_without_webp
+    def test_command_pregenerates_thumbnails(self):
+        farmer = testing.make_farmer()
+        product = testing.make_product(
+            farmer, testing.make_category("과일", "fruit"), main_image=self.slide.image.name
+        )
+        call_command("generate_thumbnails", stdout=StringIO(), stderr=StringIO())
+        for width in (320, 640, 1024):
+            self.assertTrue(
+                self.storage.exists(images.thumbnail_name(product.main_image.name, width))
+            )
+
+
+class StopTimer(Exception):
+    pass
+
+
+class HitBufferTest(TestCase):
+    def setUp(self):
+        self.review = testing.make_editor_review(testing.make_editor())
+        self.buffer = HitBuffer(Editor_Review, max_pending=2)
+
+    def hits(self):
+        return Editor_Review.objects.values_list("hits", flat=True).get(pk=self.review.pk)
+
+    def test_flush_groups_pending_hits(self):
+        other = testing.make_editor_review(testing.make_editor())
+        self.buffer.add(self.review.pk)
+        self.buffer.add(self.review.pk)
+        self.assertEqual(self.hits(), 0)
+        self.buffer.add(other.pk)  # 누적 대상 2개 -> flush
+        self.assertEqual(self.hits(), 2)
+
+    def test_flush_error_does_not_reach_request(self):
+        error = OperationalError("database is locked")
+        with mock.patch.object(Editor_Review.objects, "filter", side_effect=error):
+            with self.assertLogs("core.hits", "ERROR"):
+                self.buffer.add(self.review.pk)
+                self.buffer.add(self.review.pk + 1)
+        self.assertEqual(self.hits(), 0)
+
+        # 반영하지 못한 조회수는 다음 flush에서 반영
+        self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(self.hits(), 1)
+
+    def test_timer_flushes_without_traffic(self):
+        self.buffer.add(self.review.pk)
+        self.assertEqual(self.hits(), 0)
+
+        sleep = mock.Mock(side_effect=[None, StopTimer])
+        # 이 thread의 test DB connection은 닫지 않음
+        with mock.patch.object(hits.time, "sleep", sleep), mock.patch.object(
+            hits.connections, "close_all"
+        ):
+            with self.assertRaises(StopTimer):
+                hits._run_timer(30)
+        self.assertEqual(self.hits(), 1)
+
+    def test_timer_starts_once(self):
+        with mock.patch.object(hits, "_timer", None), mock.patch.object(
+            hits.threading, "Thread"
+        ) as thread:
+            self.buffer.add(self.review.pk)
+            self.buffer.add(self.review.pk)
+        thread.assert_called_once()
+        self.assertTrue(thread.call_args[1]["daemon"])
+
+    def test_exit_flush_logs_errors(self):
+        with mock.patch.object(hits.atexit, "register") as register:
+            HitBuffer(Editor_Review)
+        # atexit 등록은 module에서 한 번만
+        register.assert_not_called()
+
+        self.buffer.add(self.review.pk)
+        error = OperationalError("no such table")
+        with mock.patch.object(Editor_Review.objects, "filter", side_effect=error):
+            with self.assertLogs("core.hits", "ERROR"):
+                hits.flush_all()
+        hits.flush_all()
+        self.assertEqual(self.hits(), 1)
+
+
+class PrefixIndexTest(TestCase):
+    def setUp(self):
+        testing.clear_cache()
+        farmer = testing.make_farmer(farm_name="행복한 농장")
+        self.product = testing.make_product(farmer, testing.make_category("과일", "fruit"))
+        self.index = PrefixIndex()
+        self.index.build_later = mock.Mock()
+
+    def labels(self, query):
+        return [label for _, label in self.index.lookup(query)]
+
+    def test_lookup(self):
+        # 최초 조회는 바로 색인
+        self.assertEqual(self.labels("삭"), ["못난이 사과"])
+        self.assertEqual(self.labels("농장"), ["행복한 농장"])
+        self.assertEqual(self.labels("ㅎ"), ["행복한 농장"])
+        self.index.build_later.assert_not_called()
+
+    def test_update_bumps_only_changed_labels(self):
+        self.index.build()
+        version = self.index.version.current()
+
+        self.index.update("product", self.product.pk, "못난이 사과")
+        self.assertEqual(self.index.version.current(), version)
+
+        self.index.update("product", self.product.pk, "꿀 자두")
+        self.assertEqual(self.index.version.current(), version + 1)
+        self.assertEqual(self.labels("자두"), ["꿀 자두"])
+        self.assertEqual(self.labels("사과"), [])
+
+        self.index.update("product", self.product.pk)
+        self.assertEqual(self.labels("자두"), [])
+        self.index.build_later.assert_not_called()
+
+    def test_missed_update_rebuilds_in_background(self):
+        self.index.build()
+        # 다른 process의 변경 - version을 먼저 올림
+        LocalVersion(VERSION_KEY).bump()
+        Product.objects.filter(pk=self.product.pk).update(title="꿀 자두")
+        self.index.update("product", self.product.pk, "꿀 자두")
+
+        # 증분 반영하지 않고 기존 색인으로 응답하며 background에서 재색인
+        self.assertEqual(self.labels("사과"), ["못난이 사과"])
+        self.index.build_later.assert_called_once()
+
+        self.index.build()
+        self.assertEqual(self.labels("자두"), ["꿀 자두"])
+        self.assertFalse(self.index.version.is_stale())
+
+    def test_local_cache_ttl(self):
+        self.index.build()
+        self.assertEqual(self.labels("사과"), ["못난이 사과"])
+        later = time.monotonic() + LOCAL_TTL + 1
+        with mock.patch("time.monotonic", return_value=later):
+            self.assertEqual(self.labels("사과"), ["못난이 사과"])
+        self.index.build_later.assert_called_once()
@@ -0,0 +1,264 @@
+from collections import defaultdict
+from django.core.cache import cache
+from django.db import connection, OperationalError, transaction
+from django.db.models import Q
+from functools import reduce
+from .versions import LocalVersion
+import operator
+import threading
+
+"""
+부분 문자열 검색 backend - 농가 / 농가 스토리 검색 (__contains LIKE scan 대체)
+- SQLite는 FTS5 trigram tokenizer 가상 table에 색인
+  table은 rebuild_text_search command가 만들고 채운다 (요청 중에는 DDL / 전체 색인 X)
+  table이 아직 없으면 ORM __icontains 검색으로 대신하고 색인 갱신은 건너뛴다
+- 다른 DB는 process 내 trigram 역색인 사용 (변경은 core.versions의 cache version으로 감지)
+- 색인 대상(kind)은 register()로 등록, model 저장 / 삭제 시 signal에서 index_object / remove_object 호출
+- 검색 결과는 object pk set - 정렬 / pagination은 기존 view에서 그대로 처리
+
+3글자 미만 검색어는 trigram을 만들 수 없으므로
+FTS5는 색인 table에 LIKE, trigram 색인은 글자 / 2-gram posting으로 후보를 찾는다
+"""
+
+FTS_TABLE = "core_text_search"
+NGRAM_SIZE = 3
+
+# kind -> (전체 (pk, {field: text}) 를 돌려주는 loader, model, {field: ORM lookup 경로})
+_kinds = {}
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def register(kind, loader, model, lookups):
+    """lookups - 색인 field 이름 -> ORM 검색 경로 (FTS table이 없을 때 사용)"""
+    _kinds[kind] = (loader, model, lookups)
+
+
+def orm_search(kind, query, fields):
+    _, model, lookups = _kinds[kind]
+    condition = reduce(
+        operator.or_, [Q(**{f"{lookups[field]}__icontains": query}) for field in fields]
+    )
+    return set(model.objects.filter(condition).values_list("pk", flat=True))
+
+
+def _missing_table(error):
+    return f"no such table: {FTS_TABLE}" in str(error)
+
+
+def _normalize(text):
+    return (text or "").lower()
+
+
+def _grams(text):
+    """text의 1~3 글자 n-gram (짧은 검색어도 posting으로 찾을 수 있도록)"""
+    grams = set()
+    for n in range(1, NGRAM_SIZE + 1):
+        grams.update(text[i : i + n] for i in range(len(text) - n + 1))
+    return grams
+
+
+def _query_grams(query):
+    if len(query) < NGRAM_SIZE:
+        return {query}
+    return {query[i : i + NGRAM_SIZE] for i in range(len(query) - NGRAM_SIZE + 1)}
+
+
+class FTS5Backend:
+    """SQLite FTS5 (trigram tokenizer) 가상 table 색인"""
+
+    name = "fts5"
+
+    @classmethod
+    def create(cls):
+        if connection.vendor != "sqlite":
+            return None
+        return cls()
+
+    def create_table(self):
+        """rebuild (command)에서만 호출 - FTS5 trigram을 사용할 수 없으면 OperationalError"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                "kind UNINDEXED, obj_id UNINDEXED, field UNINDEXED, body, "
+                "tokenize='trigram')"
+            )
+
+    def rebuild(self, kind):
+        self.create_table()
+        loader = _kinds[kind][0]
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE kind = %s", [kind])
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} (kind, obj_id, field, body) VALUES (%s, %s, %s, %s)",
+                [
+                    (kind, pk, field, text or "")
+                    for pk, values in loader()
+                    for field, text in values.items()
+                ],
+            )
+
+    def _write(self, statements):
+        """table이 없으면 (command 실행 전) 건너뜀 - 만들 때 전체를 다시 색인"""
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                for sql, params in statements:
+                    cursor.executemany(sql, params)
+        except OperationalError as e:
+            if not _missing_table(e):
+                raise
+
+    def index(self, kind, pk, values):
+        self._write(
+            [
+                (f"DELETE FROM {FTS_TABLE} WHERE kind = %s AND obj_id = %s", [(kind, pk)]),
+                (
+                    f"INSERT INTO {FTS_TABLE} (kind, obj_id, field, body) "
+                    "VALUES (%s, %s, %s, %s)",
+                    [(kind, pk, field, text or "") for field, text in values.items()],
+                ),
+            ]
+        )
+
+    def remove(self, kind, pk):
+        self._write(
+            [(f"DELETE FROM {FTS_TABLE} WHERE kind = %s AND obj_id = %s", [(kind, pk)])]
+        )
+
+    def search(self, kind, query, fields):
+        placeholders = ", ".join(["%s"] * len(fields))
+        if len(query) < NGRAM_SIZE:
+            condition, term = "body LIKE %s ESCAPE '\\'", "%{}%".format(
+                query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            )
+        else:
+            # 검색어 전체를 phrase로 - trigram tokenizer에서 부분 문자열 일치
+            condition, term = f"{FTS_TABLE} MATCH %s", '"{}"'.format(query.replace('"', '""'))
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"SELECT DISTINCT obj_id FROM {FTS_TABLE} "
+                    f"WHERE kind = %s AND field IN ({placeholders}) AND {condition}",
+                    [kind, *fields, term],
+                )
+                return {int(row[0]) for row in cursor.fetchall()}
+        except OperationalError as e:
+            if not _missing_table(e):
+                raise
+        return orm_search(kind, query, fields)
+
+
+class TrigramBackend:
+    """
+    process 내 trigram 역색인
+    - 다른 process의 색인 변경은 cache의 kind별 version(core.versions)으로 감지하여 재색인
+    """
+
+    name = "trigram"
+    VERSION_KEY = "text_search_version:%s"
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.texts = {}  # kind -> {pk: {field: text}}
+        self.postings = {}  # kind -> {gram: {pk}}
+        self.versions = {}  # kind -> LocalVersion
+
+    @classmethod
+    def create(cls):
+        return cls()
+
+    def _version(self, kind):
+        if kind not in self.versions:
+            self.versions[kind] = LocalVersion(self.VERSION_KEY % kind)
+        return self.versions[kind]
+
+    def _add(self, kind, pk, values):
+        texts = {field: _normalize(text) for field, text in values.items()}
+        self.texts[kind][pk] = texts
+        postings = self.postings[kind]
+        for text in texts.values():
+            for gram in _grams(text):
+                postings[gram].add(pk)
+
+    def _discard(self, kind, pk):
+        texts = self.texts[kind].pop(pk, None)
+        if texts is None:
+            return
+        postings = self.postings[kind]
+        for text in texts.values():
+            for gram in _grams(text):
+                postings[gram].discard(pk)
+
+    def rebuild(self, kind):
+        # 색인 중 다른 process의 변경을 놓치지 않도록 version을 먼저 읽음
+        version = self._version(kind).current()
+        with self.lock:
+            self.texts[kind] = {}
+            self.postings[kind] = defaultdict(set)
+            for pk, values in _kinds[kind][0]():
+                self._add(kind, pk, values)
+            self._version(kind).loaded(version)
+
+    def _ensure(self, kind):
+        if kind not in self.texts or self._version(kind).is_stale():
+            self.rebuild(kind)
+
+    def index(self, kind, pk, values):
+        # 이 process에 최신 색인이 있을 때만 증분 반영 - 아니면 다음 검색 때 다시 색인
+        with self.lock:
+            if self._version(kind).bump():
+                self._discard(kind, pk)
+                self._add(kind, pk, values)
+
+    def remove(self, kind, pk):
+        with self.lock:
+            if self._version(kind).bump():
+                self._discard(kind, pk)
+
+    def search(self, kind, query, fields):
+        self._ensure(kind)
+        query = _normalize(query)
+        with self.lock:
+            postings = self.postings[kind]
+            candidates = None
+            for gram in _query_grams(query):
+                pks = postings.get(gram, set())
+                candidates = pks.copy() if candidates is None else candidates & pks
+                if not candidates:
+                    return set()
+            # trigram이 모두 나와도 연속된 부분 문자열이 아닐 수 있으므로 원문으로 확인
+            texts = self.texts[kind]
+            return {
+                pk
+                for pk in candidates
+                if any(query in texts[pk].get(field, "") for field in fields)
+            }
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = FTS5Backend.create() or TrigramBackend.create()
+    return _backend
+
+
+def search(kind, query, fields):
+    """kind 색인에서 fields 중 하나에 query를 포함하는 object pk set"""
+    return get_backend().search(kind, query, tuple(fields))
+
+
+def index_object(kind, pk, values):
+    get_backend().index(kind, pk, values)
+
+
+def remove_object(kind, pk):
+    get_backend().remove(kind, pk)
+
+
+def rebuild(kind=None):
+    backend = get_backend()
+    for name in [kind] if kind else _kinds:
+        backend.rebuild(name)
+    return backend.name
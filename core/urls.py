@@ -10,6 +10,8 @@ urlpatterns = [
     path("", views.index, name="main"),
     path("policy/disclaimer", views.disclaimer, name="disclaimer"),
     path("popup-callback", views.PopupCallback.as_view(), name="popup_callback"),
+    path("cache-stats", views.cache_stats, name="cache_stats"),
+    path("autocomplete", views.autocomplete, name="autocomplete"),
 ]
 
 if settings.DEBUG:
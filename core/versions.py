@@ -0,0 +1,62 @@
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+import time
+
+"""
+process 내 색인 / tree 의 cache version 관리 (core.textsearch, core.autocomplete, products.categories)
+- 변경 시 cache의 version을 올리고, 각 process는 자기가 읽은 version과 다르면 다시 만든다
+- version을 올린 결과가 "자기 version + 1"일 때만 변경을 증분 반영
+  (그 사이 다른 process가 올렸다면 그 변경을 놓쳤으므로 다시 만든다)
+- process 간 공유되지 않는 cache(LocMem - CACHE_LOCATION 미지정)에서는
+  다른 process의 version 변경을 볼 수 없으므로 LOCAL_TTL이 지나면 다시 만든다
+"""
+
+LOCAL_TTL = 60  # 공유 cache가 없을 때 process 내 구조를 다시 만드는 주기(초)
+
+
+def is_shared_cache():
+    return not isinstance(caches["default"], (LocMemCache, DummyCache))
+
+
+class LocalVersion:
+    def __init__(self, key, ttl=LOCAL_TTL):
+        self.key = key
+        self.ttl = ttl
+        self.version = None  # None - 아직 만들지 않았거나 다시 만들어야 함
+        self.loaded_at = 0
+
+    def current(self):
+        return cache.get(self.key, 0)
+
+    def loaded(self, version):
+        """current()로 미리 읽어 둔 version으로 다시 만들었음을 기록"""
+        self.version = version
+        self.loaded_at = time.monotonic()
+
+    def is_stale(self, version=None):
+        if self.version is None:
+            return True
+        if not is_shared_cache() and time.monotonic() - self.loaded_at > self.ttl:
+            return True
+        return self.version != (self.current() if version is None else version)
+
+    def bump(self):
+        """
+        version 증가 - 증분 반영해도 되면 True
+        False면 version을 비워 다음 조회 때 다시 만들도록 한다
+        """
+        if cache.add(self.key, 1, None):
+            new = 1
+        else:
+            try:
+                new = cache.incr(self.key)
+            except ValueError:
+                # incr 직전에 만료 / 삭제된 경우
+                cache.set(self.key, 1, None)
+                new = 1
+        if self.version is not None and new == self.version + 1:
+            self.version = new
+            return True
+        self.version = None
+        return False
@@ -1,57 +1,60 @@
 from django.shortcuts import render
+from django.template.loader import render_to_string
+from django.http import JsonResponse
+from django.contrib.admin.views.decorators import staff_member_required
 from products.models import Product
 from editor_reviews.models import Editor_Review
 from farmers.models import Farmer
 from .models import Main_Slider_Image
-from datetime import date
-from django.core.exceptions import ObjectDoesNotExist
+from .cache import get_fragment, get_stats
+from .autocomplete import autocomplete as get_suggestions
 from django.views.generic import TemplateView
 
 
 def index(request):
 
-    try:
-        products = Product.objects.filter(open=True)
-
-    except ObjectDoesNotExist:
-        pass
-
-    if len(products) < 5:
-        today_pick_list = products.order_by("create_at")[: len(products)]
-        best_product_list = products.order_by("sales_rate")[: len(products)]
-
-    elif len(products) < 4:
-        today_pick_list = products.order_by("create_at")[: len(products)]
-        best_product_list = products.order_by("sales_rate")[: len(products)]
-
-    else:
-        today_pick_list = products.order_by("create_at")[:5]
-        best_product_list = products.order_by("sales_rate")[0:4]
+    # section별 html fragment cache (core.cache) - 관련 model 변경 시 signal로 무효화
+    def render_section(template_name, **ctx):
+        return lambda: render_to_string(template_name, ctx)
+
+    products = Product.objects.filter(open=True)
+
+    sections = {
+        "slider": render_section(
+            "base/main_slider.html", main_slider_image=Main_Slider_Image.objects.all()
+        ),
+        "today_pick": render_section(
+            "base/today_pick.html", today_pick_list=products.order_by("create_at")[:5]
+        ),
+        "best": render_section(
+            "base/best.html",
+            best_product_list=products.select_related("farmer__user", "category").order_by(
+                "sales_rate"
+            )[:4],
+        ),
+        "editor_pick": render_section(
+            "base/editor_pick.html", editor_pick_list=Editor_Review.objects.all()
+        ),
+        "today_farmer": render_section(
+            "base/today_farmer.html", today_farmer_list=Farmer.objects.all()
+        ),
+    }
 
-    try:
-        editor_pick_list = Editor_Review.objects.all()
+    ctx = {f"{name}_html": get_fragment(name, render) for name, render in sections.items()}
 
-    except Editor_Review.DoesNotExist:
-        pass
+    return render(request, "base/index.html", ctx)
 
-    today_farmer_list = Farmer.objects.all()
-    main_slider_image = Main_Slider_Image.objects.all()
 
-    if len(today_farmer_list) < 3:
-        today_farmer_list = (
-            today_farmer_list | Farmer.objects.all()[: 3 - len(today_farmer_list)]
-        )
+@staff_member_required
+def cache_stats(request):
+    """메인 페이지 fragment cache hit / miss 현황"""
+    return JsonResponse(get_stats())
 
-    ctx = {
-        "products": products,
-        "today_pick_list": today_pick_list,
-        "best_product_list": best_product_list,
-        "editor_pick_list": editor_pick_list,
-        "today_farmer_list": today_farmer_list,
-        "main_slider_image": main_slider_image,
-    }
 
-    return render(request, "base/index.html", ctx)
+def autocomplete(request):
+    """검색어 자동완성 - 상품명 / 농장 이름 / 농가 tag (JSON)"""
+    q = request.GET.get("q", "")
+    return JsonResponse({"q": q, "results": get_suggestions(q)})
 
 
 def disclaimer(request):
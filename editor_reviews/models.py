@@ -14,9 +14,13 @@ class Editor_Review(models.Model):
 
     title = models.CharField(max_length=500)
     sub_title = models.CharField(max_length=500)
-    main_image = CompressedImageField(upload_to="editor_review_thumbnail/%Y/%m/%d")
+    main_image = CompressedImageField(
+        upload_to="editor_review_thumbnail/%Y/%m/%d", thumbnails=True
+    )
     contents = models.TextField()
     hits = models.PositiveIntegerField(default=0)
+    # like 수 - like 추가 / 취소 시 F()로 갱신 (likes.services)
+    num_likes = models.PositiveIntegerField(default=0)
 
     author = models.ForeignKey(
         "users.Editor", related_name="editor_reviews", on_delete=models.CASCADE
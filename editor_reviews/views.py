@@ -4,9 +4,11 @@ from .forms import Editors_Reviews_Form
 from django.views.generic import DetailView
 from django.views.generic.edit import FormMixin
 from users.models import Editor
+from users.editor_stats import with_editor_stats
 from django.views.decorators.clickjacking import xframe_options_sameorigin
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Prefetch
 from core.models import NoQuerySet, AuthorNotMatched
 from django.core.files.uploadedfile import SimpleUploadedFile
 from config.settings.base import BASE_DIR
@@ -17,6 +19,10 @@ from comments.forms import EditorReviewCommentForm, EditorReviewRecommentForm
 from comments.models import Editor_Review_Comment, Editor_Review_Recomment
 from django.http import JsonResponse, HttpResponse
 from users.models import User
+from core.hits import HitBuffer
+
+# 조회수 - 조회마다 저장하지 않고 모아서 반영
+review_hits = HitBuffer(Editor_Review)
 
 
 def index(request):
@@ -27,7 +33,7 @@ def index(request):
         review_list = Editor_Review.objects.all()[1:]
         if review_list is None:
             raise NoQuerySet
-        editors = Editor.objects.all()
+        editors = with_editor_stats(Editor.objects.select_related("user"))
         if editors is None:
             raise NoQuerySet
         ctx = {
@@ -59,9 +65,19 @@ class Editor_review_detail(DetailView):
 
     def get_context_data(self, **kwargs):
         ctx = super(DetailView, self).get_context_data(**kwargs)
-        comments = Editor_Review_Comment.objects.filter(editor_review=self.get_object())
+        comments = (
+            Editor_Review_Comment.objects.filter(editor_review=self.object)
+            .select_related("author")
+            .with_counts()
+            .prefetch_related(
+                Prefetch(
+                    "editor_review_recomments",
+                    queryset=Editor_Review_Recomment.objects.select_related("author").with_counts(),
+                )
+            )
+        )
 
-        ctx["comments"] = comments.order_by("-create_at")[: min(10, len(comments))]
+        ctx["comments"] = comments.order_by("-create_at")[:10]
         ctx["form"] = EditorReviewCommentForm()
 
         if self.request.user != AnonymousUser():
@@ -75,23 +91,15 @@ class Editor_review_detail(DetailView):
     def render_to_response(self, context, **response_kwargs):
         response = super().render_to_response(context, **response_kwargs)
 
-        try:
-            if self.request.user == AnonymousUser():
-                raise ObjectDoesNotExist
-
-            user = Editor.objects.get(user=self.request.user)
+        # 작성자가 조회한 경우 새 댓글 모두 읽음 처리 (UPDATE 한 번)
+        author = self.object.author
+        if self.request.user.is_authenticated and author.user_id == self.request.user.pk:
+            updated = Editor_Review_Comment.objects.filter(
+                editor_review=self.object, is_read=False
+            ).update(is_read=True)
 
-            if self.get_object().author == user:
-                new_comments = Editor_Review_Comment.objects.filter(
-                    editor_review=self.get_object(), is_read=False
-                )
-
-                for comment in new_comments:
-                    comment.is_read = True
-                    comment.save()
-
-        except ObjectDoesNotExist:
-            pass
+            if updated:
+                Editor.clear_unread_comment_count(author.pk)
 
         if self.request.session.get("_auth_user_id") is None:
             cookie_name = "editor_review_hit"
@@ -101,10 +109,7 @@ class Editor_review_detail(DetailView):
 
         if self.request.COOKIES.get(cookie_name) is None:
             response.set_cookie(cookie_name, self.kwargs["pk"], 3600)
-
-            review = self.get_object()
-            review.hits += 1
-            review.save()
+            review_hits.add(self.object.pk)
 
         else:
             cookie = self.request.COOKIES.get(cookie_name)
@@ -112,10 +117,7 @@ class Editor_review_detail(DetailView):
 
             if str(self.kwargs["pk"]) not in cookies:
                 response.set_cookie(cookie_name, cookie + f'|{self.kwargs["pk"]}', 3600)
-
-                review = self.get_object()
-                review.hits += 1
-                review.save()
+                review_hits.add(self.object.pk)
 
         return response
 
@@ -168,13 +170,16 @@ def editor_review_comment_load(request):
         )  # Front-end 에서 현재 로딩된 댓글의 개수를 요청에 포함한다.
         pk = request.POST.get("pk")
         review = Editor_Review.objects.get(pk=pk)
-        comments = Editor_Review_Comment.objects.filter(editor_review=review).order_by("-create_at")
+        comments = (
+            Editor_Review_Comment.objects.filter(editor_review=review)
+            .select_related("author")
+            .with_counts()
+            .order_by("-create_at")
+        )
 
         try:
             # Posting의 전체 댓글 중에서 아직 불러오지 않은 것들을 가져온다. (10개 혹은 그 이하)
-            unloaded_comments = comments[
-                current_comment_count : min(current_comment_count + 10, comments.count())
-            ]
+            unloaded_comments = comments[current_comment_count : current_comment_count + 10]
 
             # Front-end에서 동적으로 엘리먼트를 생성할 때 사용 가능한 방식으로 데이터를 분리한다.
             comment_list = list(
@@ -215,13 +220,16 @@ def editor_review_recomment_load(request):
         )  # Front-end 에서 현재 로딩된 댓글의 개수를 요청에 포함한다.
         pk = request.POST.get("pk")
         comment = Editor_Review_Comment.objects.get(pk=pk)
-        recomments = Editor_Review_Recomment.objects.filter(comment=comment).order_by("-create_at")
+        recomments = (
+            Editor_Review_Recomment.objects.filter(comment=comment)
+            .select_related("author")
+            .with_counts()
+            .order_by("-create_at")
+        )
 
         try:
             # Posting의 전체 댓글 중에서 아직 불러오지 않은 것들을 가져온다. (10개 혹은 그 이하)
-            unloaded_comments = recomments[
-                current_comment_count : min(current_comment_count + 5, recomments.count())
-            ]
+            unloaded_comments = recomments[current_comment_count : current_comment_count + 5]
 
             # Front-end에서 동적으로 엘리먼트를 생성할 때 사용 가능한 방식으로 데이터를 분리한다.
             comment_list = list(
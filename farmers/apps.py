@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class FarmersConfig(AppConfig):
     name = 'farmers'
+
+    # django signal
+    def ready(self):
+        import farmers.signals
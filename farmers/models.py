@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import Count, Q
+from django.core.cache import cache
 from core.models import CompressedImageField
 from django.templatetags.static import static
 from config.settings import base
@@ -22,6 +24,7 @@ class Farmer(models.Model):
         null=True,
         blank=True,
         default="..{}images/farm/farm_default.svg".format(base.STATIC_URL),
+        thumbnails=True,
     )  # 농장 대표사진 or 로고
     profile_title = models.CharField(max_length=200)  # 농가 한 줄 소개
     farm_desc = CompressedImageField(
@@ -53,6 +56,41 @@ class Farmer(models.Model):
         self.sub_count += 1
         return
 
+    # 주문 상태별 개수 (cache) - 주문 상태 변경 시 clear_order_status_counts로 무효화
+    ORDER_STATUS_CACHE_KEY = "farmer_order_status:%s"
+    ORDER_STATUS_CACHE_TIMEOUT = 60
+    CLAIM_STATUSES = ("re_recept", "ex_recept", "re_ex_approve", "re_ex_deny")
+    CLAIM_FILTER = "claim"  # 주문관리 "반품요청" 탭 - CLAIM_STATUSES 전체
+
+    def order_status_counts(self):
+        """농가 마이페이지 주문 상태별 개수 - 조건부 COUNT aggregate 한 번"""
+
+        from orders.models import Order_Detail
+
+        key = self.ORDER_STATUS_CACHE_KEY % self.pk
+        counts = cache.get(key)
+
+        if counts is None:
+            counts = (
+                Order_Detail.objects.filter(product__farmer=self)
+                .exclude(status="wait")
+                .aggregate(
+                    overall=Count("pk"),
+                    new=Count("pk", filter=Q(status="payment_complete")),
+                    preparing=Count("pk", filter=Q(status="preparing")),
+                    shipping=Count("pk", filter=Q(status="shipping")),
+                    delivered=Count("pk", filter=Q(status="delivery_complete")),
+                    claimed=Count("pk", filter=Q(status__in=self.CLAIM_STATUSES)),
+                )
+            )
+            cache.set(key, counts, self.ORDER_STATUS_CACHE_TIMEOUT)
+
+        return counts
+
+    @classmethod
+    def clear_order_status_counts(cls, *farmer_pks):
+        cache.delete_many([cls.ORDER_STATUS_CACHE_KEY % pk for pk in farmer_pks])
+
 
 class Farmer_Story(models.Model):
     farmer = models.ForeignKey(
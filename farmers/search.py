@@ -0,0 +1,40 @@
+from core import textsearch
+from .models import Farmer, Farmer_Story
+
+"""
+농가 / 농가 스토리 검색 색인 등록 (core.textsearch)
+- farmer: 농장 이름 / 농가 nickname
+- farmer_story: 스토리 제목 (농장 이름 / nickname 검색은 farmer 색인 결과로 필터)
+"""
+
+
+def farmer_values(farmer):
+    return {"farm_name": farmer.farm_name, "nickname": farmer.user.nickname}
+
+
+def story_values(story):
+    return {"title": story.title}
+
+
+def load_farmers():
+    for farmer in Farmer.objects.select_related("user").iterator():
+        yield farmer.pk, farmer_values(farmer)
+
+
+def load_stories():
+    for pk, title in Farmer_Story.objects.values_list("pk", "title").iterator():
+        yield pk, {"title": title}
+
+
+textsearch.register(
+    "farmer", load_farmers, Farmer, {"farm_name": "farm_name", "nickname": "user__nickname"}
+)
+textsearch.register("farmer_story", load_stories, Farmer_Story, {"title": "title"})
+
+
+def search_farmers(query, fields=("farm_name", "nickname")):
+    return textsearch.search("farmer", query, fields)
+
+
+def search_stories(query):
+    return textsearch.search("farmer_story", query, ("title",))
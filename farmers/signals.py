@@ -0,0 +1,38 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from core import textsearch
+from users.models import User
+from .models import Farmer, Farmer_Story
+from .search import farmer_values, story_values
+
+
+@receiver(post_save, sender=Farmer)
+def farmer_saved(sender, instance, **kwargs):
+    # 농가 검색 색인 갱신
+    textsearch.index_object("farmer", instance.pk, farmer_values(instance))
+
+
+@receiver(post_delete, sender=Farmer)
+def farmer_deleted(sender, instance, **kwargs):
+    textsearch.remove_object("farmer", instance.pk)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, update_fields=None, **kwargs):
+    # 농가 nickname 변경 반영 (last_login 갱신 등 nickname과 무관한 저장은 제외)
+    if update_fields is not None and "nickname" not in update_fields:
+        return
+    farmer = Farmer.objects.filter(user=instance).first()
+    if farmer is not None:
+        farmer.user = instance
+        textsearch.index_object("farmer", farmer.pk, farmer_values(farmer))
+
+
+@receiver(post_save, sender=Farmer_Story)
+def farmer_story_saved(sender, instance, **kwargs):
+    textsearch.index_object("farmer_story", instance.pk, story_values(instance))
+
+
+@receiver(post_delete, sender=Farmer_Story)
+def farmer_story_deleted(sender, instance, **kwargs):
+    textsearch.remove_object("farmer_story", instance.pk)
@@ -1,3 +1,214 @@
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.urls import reverse
+from core import testing, textsearch
+from core.versions import LocalVersion
+from orders.models import Order_Detail
+from orders.stock import reserve_stock
+from .models import Farmer, Farmer_Story
+from .search import search_farmers, search_stories
 
 # Create your tests here.
+
+
+def fts_table_exists():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name = %s", [textsearch.FTS_TABLE]
+        )
+        return cursor.fetchone() is not None
+
+
+class TextSearchTestMixin:
+    def setUp(self):
+        testing.clear_cache()
+        self.apple = testing.make_farmer(
+            user=testing.make_user(nickname="사과아저씨"), farm_name="행복한 사과농장"
+        )
+        self.pear = testing.make_farmer(farm_name="배나무 농원")
+        Farmer_Story.objects.create(farmer=self.pear, title="올해 첫 배 수확", content="내용")
+
+    def assertFinds(self, query, *farmers, fields=("farm_name", "nickname")):
+        self.assertEqual(search_farmers(query, fields), {farmer.pk for farmer in farmers})
+
+
+class ORMFallbackSearchTest(TextSearchTestMixin, TestCase):
+    """FTS table을 만들기 전 (rebuild_text_search 실행 전) - ORM 검색으로 대신"""
+
+    def test_search_without_table(self):
+        self.assertFalse(fts_table_exists())
+        self.assertFinds("사과농장", self.apple)
+        self.assertFinds("아저씨", self.apple)
+        self.assertFinds("농", self.apple, self.pear)
+        self.assertFinds("아저씨", fields=("farm_name",))
+        self.assertEqual(len(search_stories("첫 배")), 1)
+
+    def test_save_without_table_does_not_create_it(self):
+        testing.make_farmer(farm_name="감귤농장")
+        self.assertFalse(fts_table_exists())
+
+    def test_views(self):
+        response = self.client.get(reverse("farmers:farmer_search"), {"search_key": "사과"})
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(
+            reverse("farmers:farmer_story_search"), {"search_key_2": "수확"}
+        )
+        self.assertEqual(response.status_code, 200)
+
+
+class FTS5SearchTest(TextSearchTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.assertEqual(textsearch.rebuild(), "fts5")
+
+    def test_search(self):
+        self.assertTrue(fts_table_exists())
+        self.assertFinds("사과농장", self.apple)
+        self.assertFinds("사과농", self.apple)
+        # trigram보다 짧은 검색어
+        self.assertFinds("농", self.apple, self.pear)
+        self.assertFinds("없는농장")
+
+    def test_signals_keep_index_in_sync(self):
+        tangerine = testing.make_farmer(farm_name="감귤농장")
+        self.assertFinds("감귤농", tangerine)
+
+        tangerine.farm_name = "한라봉농장"
+        tangerine.save()
+        self.assertFinds("감귤농")
+        self.assertFinds("한라봉", tangerine)
+
+        tangerine.delete()
+        self.assertFinds("한라봉")
+
+
+class TrigramBackendTest(TextSearchTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.backend = textsearch.TrigramBackend.create()
+
+    def find(self, query):
+        return self.backend.search("farmer", query, ("farm_name", "nickname"))
+
+    def test_incremental_update(self):
+        self.assertEqual(self.find("사과농"), {self.apple.pk})
+        self.backend.index("farmer", self.pear.pk, {"farm_name": "사과농원", "nickname": ""})
+        self.assertEqual(self.find("사과농"), {self.apple.pk, self.pear.pk})
+        self.backend.remove("farmer", self.apple.pk)
+        self.assertEqual(self.find("사과농"), {self.pear.pk})
+
+    def test_change_from_other_process_rebuilds(self):
+        self.assertEqual(self.find("배나무"), {self.pear.pk})
+        # 다른 process에서 변경 후 version을 올린 경우 (이 process는 증분 반영을 놓침)
+        Farmer.objects.filter(pk=self.pear.pk).update(farm_name="복숭아 농원")
+        LocalVersion(self.backend.VERSION_KEY % "farmer").bump()
+        self.assertEqual(self.find("배나무"), set())
+        self.assertEqual(self.find("복숭아"), {self.pear.pk})
+
+    def test_update_after_missed_version_is_not_applied_incrementally(self):
+        self.find("사과")
+        LocalVersion(self.backend.VERSION_KEY % "farmer").bump()
+        Farmer.objects.filter(pk=self.pear.pk).update(farm_name="복숭아 농원")
+        # 다른 process의 변경 이후 자기 변경 - version이 2 올라 다시 색인해야 함
+        self.backend.index("farmer", self.apple.pk, {"farm_name": "사과농장", "nickname": ""})
+        self.assertIsNone(self.backend.versions["farmer"].version)
+        self.assertEqual(self.find("복숭아"), {self.pear.pk})
+
+
+class OrderStatusCountTest(TestCase):
+    """농가 마이페이지 주문 상태별 개수 - aggregate 한 번 + 농가별 cache"""
+
+    STATUSES = [
+        "payment_complete",
+        "payment_complete",
+        "preparing",
+        "shipping",
+        "delivery_complete",
+        "re_recept",
+        "ex_recept",
+        "wait",
+    ]
+
+    def setUp(self):
+        testing.clear_cache()
+        self.farmer = testing.make_farmer()
+        self.consumer = testing.make_consumer()
+        category = testing.make_category("과일", "fruit")
+        self.product = testing.make_product(self.farmer, category)
+        self.details = {}
+        for status in self.STATUSES:
+            self.details[status] = testing.make_order(self.consumer, self.product, status)[1]
+        # 다른 농가 주문은 제외
+        other = testing.make_product(testing.make_farmer(), category)
+        testing.make_order(self.consumer, other, "payment_complete")
+
+    def counts(self):
+        return Farmer.objects.get(pk=self.farmer.pk).order_status_counts()
+
+    def test_counts_in_one_query(self):
+        with self.assertNumQueries(1):
+            counts = self.farmer.order_status_counts()
+        self.assertEqual(
+            counts,
+            {
+                "overall": 7,
+                "new": 2,
+                "preparing": 1,
+                "shipping": 1,
+                "delivered": 1,
+                "claimed": 2,
+            },
+        )
+        with self.assertNumQueries(0):
+            self.assertEqual(self.farmer.order_status_counts(), counts)
+
+    def test_mypage_reads_cache(self):
+        self.client.force_login(self.farmer.user)
+        url = reverse("farmer:farmer_mypage_order")
+        self.assertEqual(self.client.get(url).context["order_counts"]["new"], 2)
+
+        # signal 없는 변경은 TTL 동안 반영되지 않음 - 두 번째 요청은 cache 사용
+        Order_Detail.objects.filter(status="payment_complete").update(status="preparing")
+        self.assertEqual(self.client.get(url).context["order_counts"]["new"], 2)
+        cache.delete(Farmer.ORDER_STATUS_CACHE_KEY % self.farmer.pk)
+        self.assertEqual(self.client.get(url).context["order_counts"]["new"], 0)
+
+    def test_claim_tab_matches_counter(self):
+        self.client.force_login(self.farmer.user)
+        response = self.client.get(reverse("farmer:farmer_mypage_order"), {"status": "claim"})
+        self.assertEqual(response.context["order_counts"]["claimed"], 2)
+        self.assertEqual(
+            {order.status for order in response.context["paginator"].object_list},
+            {"re_recept", "ex_recept"},
+        )
+        self.assertEqual(response.context["paginator"].count, 2)
+
+    def test_invalidated_on_save(self):
+        self.counts()
+        detail = self.details["preparing"]
+        detail.status = "shipping"
+        detail.save()
+        counts = self.counts()
+        self.assertEqual((counts["preparing"], counts["shipping"]), (0, 2))
+
+        detail.delete()
+        self.assertEqual(self.counts()["overall"], 6)
+
+    def test_invalidated_by_reserve_stock(self):
+        self.counts()
+        self.assertEqual(reserve_stock([self.details["wait"]]), [])
+        counts = self.counts()
+        self.assertEqual((counts["overall"], counts["new"]), (8, 3))
+
+    def test_invalidated_by_payment_fail(self):
+        self.counts()
+        group = self.details["payment_complete"].order_group
+        self.client.force_login(self.consumer.user)
+        self.client.get(
+            reverse("orders:payment_fail"),
+            {"errorType": "error_server", "orderGroupPk": group.pk},
+        )
+        self.assertEqual(Order_Detail.objects.get(order_group=group).status, "error_server")
+        counts = self.counts()
+        self.assertEqual((counts["overall"], counts["new"]), (7, 1))
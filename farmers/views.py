@@ -8,7 +8,7 @@ from django.core import exceptions
 from django.core.paginator import Paginator
 from django.core.exceptions import ObjectDoesNotExist
 from django.db import transaction
-from django.db.models import Q
+from django.db.models import Q, Prefetch
 from django.http import JsonResponse, HttpResponseBadRequest, HttpResponse
 from django.templatetags.static import static
 from requests.api import get
@@ -18,11 +18,11 @@ import json
 
 # models
 from .models import *
-from products.models import Product, Question
+from products.models import Product, Question, refresh_sales_rate
 from users.models import Consumer, Subscribe, User
 from editor_reviews.models import Editor_Review
 from orders.models import Order_Detail, Order_Group
-from comments.models import Farmer_Story_Comment, Product_Comment
+from comments.models import Farmer_Story_Comment, Farmer_Story_Recomment, Product_Comment
 from admins.models import FarmerNotice, FarmerNotification
 
 # forms
@@ -32,6 +32,11 @@ from users.forms import SignUpForm, LoginForm
 from addresses.forms import AddressForm
 
 from config import settings
+from core.hits import HitBuffer
+from .search import search_farmers, search_stories
+
+# 조회수 - 조회마다 저장하지 않고 모아서 반영
+story_hits = HitBuffer(Farmer_Story)
 
 
 # farmer's page
@@ -64,9 +69,7 @@ def farmer_search(request):
     search_key = request.GET.get("search_key")  # 검색어 가져오기
     search_list = Farmer.objects.all()
     if search_key:  # 검색어 존재 시
-        search_list = search_list.filter(
-            Q(farm_name__contains=search_key) | Q(user__nickname__contains=search_key)
-        )
+        search_list = search_list.filter(pk__in=search_farmers(search_key))
     search_list = search_list.order_by("-id")
     paginator = Paginator(search_list, 10)
     page = request.GET.get("page")
@@ -110,11 +113,15 @@ def farmer_story_search(request):
     search_list = Farmer_Story.objects.all()
     if search_key_2:
         if select_val == "title":
-            search_list = search_list.filter(Q(title__contains=search_key_2))
+            search_list = search_list.filter(pk__in=search_stories(search_key_2))
         elif select_val == "farm":
-            search_list = search_list.filter(Q(farmer__farm_name__contains=search_key_2))
+            search_list = search_list.filter(
+                farmer__in=search_farmers(search_key_2, fields=("farm_name",))
+            )
         elif select_val == "farmer":
-            search_list = search_list.filter(Q(farmer__user__nickname__contains=search_key_2))
+            search_list = search_list.filter(
+                farmer__in=search_farmers(search_key_2, fields=("nickname",))
+            )
     search_list = search_list.order_by("-id")
     paginator = Paginator(search_list, 10)
     page_2 = request.GET.get("page_2")
@@ -163,14 +170,23 @@ class Story_Detail(DetailView):
 
     def get_context_data(self, **kwargs):
         ctx = super(DetailView, self).get_context_data(**kwargs)
-        farmer = self.get_object().farmer
+        farmer = self.object.farmer
         story = Farmer_Story.objects.all().order_by("-id")
 
         paginator = Paginator(story, 3)
         page = self.request.GET.get("page")
         stories = paginator.get_page(page)
 
-        comments = self.get_object().farmer_story_comments.all()
+        comments = (
+            self.object.farmer_story_comments.select_related("author")
+            .with_counts()
+            .prefetch_related(
+                Prefetch(
+                    "farmer_story_recomments",
+                    queryset=Farmer_Story_Recomment.objects.select_related("author").with_counts(),
+                )
+            )
+        )
         form = FarmerStoryCommentForm()
 
         ctx["farmer"] = farmer
@@ -197,18 +213,14 @@ class Story_Detail(DetailView):
 
         if self.request.COOKIES.get(cookie_name) is None:
             response.set_cookie(cookie_name, self.kwargs["pk"], 3600)
-            main_story = self.get_object()
-            main_story.hits += 1
-            main_story.save()
+            story_hits.add(self.object.pk)
         else:
             cookie = self.request.COOKIES.get(cookie_name)
             cookies = cookie.split("|")
 
             if str(self.kwargs["pk"]) not in cookies:
                 response.set_cookie(cookie_name, cookie + f'|{self.kwargs["pk"]}')
-                main_story = self.get_object()
-                main_story.hits += 1
-                main_story.save()
+                story_hits.add(self.object.pk)
 
         return response
 
@@ -395,19 +407,9 @@ class FarmerMyPageBase(ListView):
         """context에 필요한 내용은 각 클래스에서 overriding하여 추가"""
 
         context = super().get_context_data(**kwargs)
-        context["farmer"] = Farmer.objects.get(user=self.request.user)
-
-        orders = Order_Detail.objects.filter(product__farmer=self.request.user.farmer).exclude(
-            status="wait"
-        )
-        context["overall_orders"] = orders
-        context["new_orders"] = orders.filter(status="payment_complete")
-        context["preparing_orders"] = orders.filter(status="preparing")
-        context["shipping_orders"] = orders.filter(status="shipping")
-        context["delivered_orders"] = orders.filter(status="delivery_complete")
-        context["claimed_orders"] = orders.filter(
-            Q(status="re_ex_recept") | Q(status="re_ex_approve") | Q(status="re_ex_deny")
-        )
+        farmer = self.request.user.farmer
+        context["farmer"] = farmer
+        context["order_counts"] = farmer.order_status_counts()
 
         return context
 
@@ -434,7 +436,9 @@ class FarmerMyPageOrderManage(FarmerMyPageBase):
 
         print(qs)
 
-        if status:
+        if status == Farmer.CLAIM_FILTER:
+            qs = qs.filter(status__in=Farmer.CLAIM_STATUSES)
+        elif status:
             qs = qs.filter(status=status)
 
         if q:
@@ -747,6 +751,8 @@ class FarmerMypPageProductStateUpdate(FarmerMyPagePopupBase):
                 "stock": quantity,
             }
         )
+        # 재고 변경에 따른 판매율 갱신
+        refresh_sales_rate(product)
 
         return redirect("core:popup_callback")
 
@@ -6,11 +6,12 @@ from config.settings import base
 from .auth import *
 
 
-def sendMany(data):
+def sendMany(data, timeout=10):
     return requests.post(
         base.getUrl("/messages/v4/send-many"),
         headers=get_headers(base.apiKey, base.apiSecret),
         json=data,
+        timeout=timeout,
     )
 
 
@@ -30,12 +31,14 @@ def post(path, data):
     )
 
 
-def put(path, data, headers={}):
+def put(path, data, headers=None):
+    headers = dict(headers or {})
     headers.update(get_headers(base.apiKey, base.apiSecret))
     return requests.put(base.getUrl(path), headers=headers, json=data)
 
 
-def get(path, headers={}):
+def get(path, headers=None):
+    headers = dict(headers or {})
     headers.update(get_headers(base.apiKey, base.apiSecret))
     return requests.get(base.getUrl(path), headers=headers)
 
@@ -1,3 +1,35 @@
 from django.db import models
 
 # Create your models here.
+
+
+class KakaoMessageOutbox(models.Model):
+    """알림톡 발송 대기열 - request에서는 저장만 하고 worker(send_kakao_messages)가 묶어서 발송"""
+
+    STATUS = (
+        ("pending", "발송 대기"),
+        ("sending", "발송 중"),
+        ("sent", "발송 완료"),
+        ("failed", "발송 실패"),
+    )
+
+    to = models.CharField(max_length=20)
+    template_id = models.CharField(max_length=100)
+    variables = models.JSONField(default=dict, blank=True)
+
+    status = models.CharField(max_length=10, choices=STATUS, default="pending")
+    attempts = models.IntegerField(default=0)
+    next_try_at = models.DateTimeField(auto_now_add=True)
+    last_error = models.TextField(null=True, blank=True)
+
+    sent_at = models.DateTimeField(null=True, blank=True)
+    update_at = models.DateTimeField(auto_now=True)
+    create_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_try_at"], name="kakao_outbox_status_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.to} - {self.template_id} ({self.status})"
@@ -0,0 +1,168 @@
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import F, Min
+from django.utils import timezone
+import logging
+import re
+import time
+
+from .message import sendMany
+from .models import KakaoMessageOutbox
+
+logger = logging.getLogger(__name__)
+
+# 발신 번호 / 카카오 채널 ID
+SENDER_NUMBER = "01033688026"
+PF_ID = "KA01PF210731082631285ecaWbc5i60e"
+
+# send-many 한 번에 묶어서 보낼 메시지 수
+BATCH_SIZE = 100
+# 재시도 횟수 / 재시도 간격(초) - 2^attempts 배로 증가
+MAX_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 30
+# 발송 중 상태로 남아있는 메시지를 다시 대기 상태로 돌리는 기준 (worker 비정상 종료 대비)
+STALE_SENDING_SECONDS = 60 * 10
+
+
+def enqueue(phonenum, templateId="", args=None):
+    """알림톡 발송 대기열에 추가 - 실제 발송은 worker에서 처리"""
+    phonenum = re.sub(r"[^0-9]", "", phonenum)
+    return KakaoMessageOutbox.objects.create(
+        to=phonenum, template_id=templateId, variables=args or {}
+    )
+
+
+def build_message(outbox):
+    return {
+        "to": outbox.to,
+        "from": SENDER_NUMBER,
+        "kakaoOptions": {
+            "pfId": PF_ID,
+            "templateId": outbox.template_id,
+            # 변수: 값 형식으로 모든 변수에 대한 변수값 입력
+            "variables": outbox.variables,
+        },
+    }
+
+
+def claim_batch(batch_size=BATCH_SIZE):
+    """발송할 메시지를 sending 상태로 선점 (여러 worker 동시 실행 대비)"""
+    now = timezone.now()
+
+    with transaction.atomic():
+        # 비정상 종료로 sending 상태에 남은 메시지 복구
+        KakaoMessageOutbox.objects.filter(
+            status="sending", update_at__lt=now - timedelta(seconds=STALE_SENDING_SECONDS)
+        ).update(status="pending", update_at=now)
+
+        pks = list(
+            KakaoMessageOutbox.objects.select_for_update(skip_locked=True)
+            .filter(status="pending", next_try_at__lte=now)
+            .order_by("next_try_at", "pk")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        KakaoMessageOutbox.objects.filter(pk__in=pks).update(status="sending", update_at=now)
+
+    return list(KakaoMessageOutbox.objects.filter(pk__in=pks).order_by("pk"))
+
+
+def failed_messages(messages, result):
+    """
+    send-many 응답의 failedMessageList -> {outbox pk: 오류}
+    실패 목록은 수신 번호로 구분되므로 같은 번호가 여러 개면 batch 앞에서부터 대응
+    """
+    by_number = {}
+    for message in messages:
+        by_number.setdefault(message.to, []).append(message.pk)
+
+    errors = {}
+    for failure in result.get("failedMessageList") or []:
+        pks = by_number.get(re.sub(r"[^0-9]", "", str(failure.get("to", ""))))
+        if pks:
+            errors[pks.pop(0)] = f"{failure.get('statusCode')} {failure.get('statusMessage')}"
+    return errors
+
+
+def retry_later(messages, errors, now):
+    """실패한 메시지는 attempts에 따라 backoff 후 재시도, 최대 횟수 초과 시 failed"""
+    for message in messages:
+        attempts = message.attempts + 1
+        if attempts >= MAX_ATTEMPTS:
+            status = "failed"
+        else:
+            status = "pending"
+        KakaoMessageOutbox.objects.filter(pk=message.pk).update(
+            status=status,
+            attempts=attempts,
+            last_error=errors[message.pk][:1000],
+            next_try_at=now + timedelta(seconds=RETRY_BASE_SECONDS * 2 ** message.attempts),
+            update_at=now,
+        )
+
+
+def send_batch(messages):
+    """send-many 한 번으로 묶어서 발송 후 메시지별 결과 반영, 접수된 메시지 수 반환"""
+    try:
+        response = sendMany({"messages": [build_message(message) for message in messages]})
+    except Exception as e:
+        errors = dict.fromkeys([message.pk for message in messages], repr(e))
+    else:
+        if response.status_code >= 400:
+            error = f"{response.status_code} {response.text[:500]}"
+            errors = dict.fromkeys([message.pk for message in messages], error)
+        else:
+            try:
+                errors = failed_messages(messages, response.json())
+            except ValueError:
+                # 접수는 되었으나 응답을 읽을 수 없는 경우 - 중복 발송을 피하기 위해 발송 완료로 처리
+                logger.warning("send-many 응답 해석 실패: %s", response.text[:500])
+                errors = {}
+
+    now = timezone.now()
+    accepted = [message.pk for message in messages if message.pk not in errors]
+    KakaoMessageOutbox.objects.filter(pk__in=accepted).update(
+        status="sent", sent_at=now, attempts=F("attempts") + 1, last_error=None, update_at=now
+    )
+    retry_later([message for message in messages if message.pk in errors], errors, now)
+    return len(accepted)
+
+
+def flush(batch_size=BATCH_SIZE):
+    """발송 가능한 메시지가 없을 때까지 batch 단위로 발송, (성공, 실패) 메시지 수 반환"""
+    sent, failed = 0, 0
+    while True:
+        messages = claim_batch(batch_size)
+        if not messages:
+            return sent, failed
+        accepted = send_batch(messages)
+        sent += accepted
+        failed += len(messages) - accepted
+
+
+def stats():
+    """대기열 깊이 / 가장 오래 대기 중인 메시지 대기 시간 / 최근 1시간 평균 발송 지연(초)"""
+    now = timezone.now()
+    pending = KakaoMessageOutbox.objects.filter(status__in=["pending", "sending"])
+    oldest = pending.aggregate(oldest=Min("create_at"))["oldest"]
+    recent = KakaoMessageOutbox.objects.filter(
+        status="sent", sent_at__gte=now - timedelta(hours=1)
+    ).values_list("create_at", "sent_at")[:1000]
+    latencies = [(sent_at - create_at).total_seconds() for create_at, sent_at in recent]
+
+    return {
+        "pending": pending.count(),
+        "failed": KakaoMessageOutbox.objects.filter(status="failed").count(),
+        "oldest_pending_seconds": (now - oldest).total_seconds() if oldest else 0,
+        "avg_latency_seconds": sum(latencies) / len(latencies) if latencies else 0,
+    }
+
+
+def run_worker(interval=5, batch_size=BATCH_SIZE):
+    """interval 초마다 대기열을 비우는 worker loop"""
+    while True:
+        try:
+            flush(batch_size)
+        except Exception:
+            # DB 오류 등으로 worker가 종료되지 않도록 기록 후 다음 주기에 다시 시도
+            logger.exception("알림톡 발송 worker 오류")
+        time.sleep(interval)
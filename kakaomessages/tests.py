@@ -1,3 +1,85 @@
+from datetime import timedelta
+from unittest import mock
+from django.db import OperationalError
 from django.test import TestCase
+from django.utils import timezone
+from . import outbox
+from .models import KakaoMessageOutbox
 
 # Create your tests here.
+
+
+def response(status_code=200, data=None):
+    return mock.Mock(status_code=status_code, text="error", json=mock.Mock(return_value=data))
+
+
+class SendBatchTest(TestCase):
+    def setUp(self):
+        self.messages = [
+            outbox.enqueue(f"010-0000-000{i}", "template", {"#{name}": "사과"}) for i in range(3)
+        ]
+
+    def send(self, result):
+        with mock.patch.object(outbox, "sendMany", return_value=result) as send_many:
+            sent, failed = outbox.flush()
+        return send_many, sent, failed
+
+    def statuses(self):
+        return list(KakaoMessageOutbox.objects.order_by("pk").values_list("status", "attempts"))
+
+    def test_all_accepted(self):
+        send_many, sent, failed = self.send(response(data={"failedMessageList": []}))
+        self.assertEqual((sent, failed), (3, 0))
+        self.assertEqual(send_many.call_count, 1)
+        self.assertEqual(len(send_many.call_args[0][0]["messages"]), 3)
+        self.assertEqual(self.statuses(), [("sent", 1)] * 3)
+
+    def test_only_rejected_messages_are_retried(self):
+        failure = {"to": "01000000001", "statusCode": "3104", "statusMessage": "카카오톡 미사용자"}
+        _, sent, failed = self.send(response(data={"failedMessageList": [failure]}))
+        self.assertEqual((sent, failed), (2, 1))
+        self.assertEqual(self.statuses(), [("sent", 1), ("pending", 1), ("sent", 1)])
+
+        retry = KakaoMessageOutbox.objects.get(pk=self.messages[1].pk)
+        self.assertEqual(retry.last_error, "3104 카카오톡 미사용자")
+        self.assertGreater(retry.next_try_at, timezone.now())
+        self.assertIsNone(retry.sent_at)
+
+    def test_request_error_retries_every_message(self):
+        _, sent, failed = self.send(response(status_code=500))
+        self.assertEqual((sent, failed), (0, 3))
+        self.assertEqual(self.statuses(), [("pending", 1)] * 3)
+
+        # backoff 전에는 다시 가져가지 않음
+        send_many, sent, failed = self.send(response(data={}))
+        self.assertEqual(send_many.call_count, 0)
+
+    def test_backoff_and_max_attempts(self):
+        KakaoMessageOutbox.objects.update(attempts=outbox.MAX_ATTEMPTS - 1)
+        self.send(response(status_code=500))
+        self.assertEqual(self.statuses(), [("failed", outbox.MAX_ATTEMPTS)] * 3)
+
+        message = outbox.enqueue("01000000009")
+        KakaoMessageOutbox.objects.filter(pk=message.pk).update(attempts=2)
+        before = timezone.now()
+        self.send(response(status_code=500))
+        message.refresh_from_db()
+        self.assertGreaterEqual(
+            message.next_try_at, before + timedelta(seconds=outbox.RETRY_BASE_SECONDS * 4)
+        )
+
+
+class StopWorker(Exception):
+    pass
+
+
+class RunWorkerTest(TestCase):
+    def test_worker_survives_errors(self):
+        flush = mock.Mock(side_effect=[OperationalError("database is locked"), (0, 0)])
+        sleep = mock.Mock(side_effect=[None, StopWorker])
+        with mock.patch.object(outbox, "flush", flush), mock.patch.object(
+            outbox.time, "sleep", sleep
+        ), self.assertLogs("kakaomessages.outbox", "ERROR"):
+            with self.assertRaises(StopWorker):
+                outbox.run_worker(interval=1)
+        self.assertEqual(flush.call_count, 2)
@@ -4,6 +4,7 @@ import sys
 import re
 
 from .message import *
+from .outbox import enqueue
 from django.http import HttpResponse
 
 
@@ -12,27 +13,8 @@ def send_kakao_message(
     templateId="",
     args={},
 ):
-    phonenum = re.sub(r"[^0-9]", "", phonenum)
-    data = {
-        "messages": [
-            # 변수가 있는 경우
-            {
-                "to": phonenum,
-                # array 사용으로 동일한 내용을 여러 수신번호에 전송 가능
-                # "to": ["01000000002", "01000000003"],
-                "from": "01033688026",
-                "kakaoOptions": {
-                    "pfId": "KA01PF210731082631285ecaWbc5i60e",
-                    "templateId": templateId,
-                    # 변수: 값 형식으로 모든 변수에 대한 변수값 입력
-                    # "variables": {},  # 변수가 없는 경우에도 입력
-                    "variables": args,
-                },
-            },
-        ]
-    }
-
-    sendMany(data)
+    """알림톡 발송 요청 - 발송 대기열(outbox)에 저장하고 worker가 send-many로 묶어서 발송"""
+    enqueue(phonenum, templateId, args)
 
 
 data = {
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class LikesConfig(AppConfig):
     name = 'likes'
+
+    # django signal
+    def ready(self):
+        import likes.signals
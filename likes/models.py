@@ -6,6 +6,9 @@ from editor_reviews.models import Editor_Review
 
 
 class AbstractLike(models.Model):
+    # "class meta"(소문자)는 Meta로 인식되지 않아 AbstractLike는 user를 가진 부모 table (multi-table 상속)
+    # 운영 중인 like row의 user가 이 table에 있으므로 구조를 유지
+    # -> (user, 대상) 중복은 DB constraint 대신 likes.services.set_like에서 막는다
     user = models.ForeignKey("users.User", related_name="Likes", on_delete=models.CASCADE)
 
     class meta:
@@ -0,0 +1,130 @@
+from django.db import transaction
+from django.db.models import Count, F, Min, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from .models import (
+    EditorReviewLike,
+    EditorReviewCommentLike,
+    EditorReviewRecommentLike,
+    FarmerStoryCommentLike,
+    FarmerStoryRecommentLike,
+    ProductRecommentLike,
+)
+
+"""
+좋아요 service - 대상 종류(target_type)별 like model / 대상 FK 필드
+- user는 부모 table(AbstractLike), 대상 FK는 자식 table에 있어 (user, 대상) unique constraint를 둘 수 없음
+  -> 대상 row를 먼저 update(lock)해 같은 대상에 대한 좋아요 변경을 직렬화한 뒤 존재 여부 확인 / 추가
+- like 취소 : 조건부 delete
+- 실제로 추가 / 삭제된 경우에만 대상 row의 num_likes를 F()로 갱신 (0 아래로 내려가지 않음)
+- num_likes는 migrate 시 like table 기준으로 다시 채움 (likes.signals - 이전부터 있던 좋아요 반영)
+- 기존 중복 row는 dedupe_likes()로 정리 (reconcile_like_counts command)
+"""
+
+LIKE_TARGETS = {
+    "editor_review": (EditorReviewLike, "review"),
+    "editor_review_comment": (EditorReviewCommentLike, "comment"),
+    "editor_review_recomment": (EditorReviewRecommentLike, "recomment"),
+    "farmer_story_comment": (FarmerStoryCommentLike, "comment"),
+    "farmer_story_recomment": (FarmerStoryRecommentLike, "recomment"),
+    "product_recomment": (ProductRecommentLike, "recomment"),
+}
+
+
+class UnknownLikeTarget(Exception):
+    pass
+
+
+def get_target(target_type):
+    """(like model, 대상 FK 필드 이름, 대상 model)"""
+    try:
+        like_model, field_name = LIKE_TARGETS[target_type]
+    except KeyError:
+        raise UnknownLikeTarget(target_type)
+    return like_model, field_name, like_model._meta.get_field(field_name).related_model
+
+
+def get_like_count(target_type, pk):
+    _, _, target_model = get_target(target_type)
+    return target_model.objects.values_list("num_likes", flat=True).get(pk=pk)
+
+
+@transaction.atomic
+def set_like(user, target_type, pk, like=True):
+    """
+    좋아요 상태를 like로 설정 - 같은 요청이 중복되어도 결과가 같다
+    대상이 없으면 target model의 DoesNotExist, (좋아요 여부, 좋아요 수) 반환
+    """
+    like_model, field_name, target_model = get_target(target_type)
+    # 값이 바뀌지 않는 update로 대상 row lock (sqlite는 transaction 쓰기 lock) - 대상이 없으면 0
+    if not target_model.objects.filter(pk=pk).update(num_likes=F("num_likes")):
+        raise target_model.DoesNotExist
+
+    likes = like_model.objects.filter(user=user, **{f"{field_name}_id": pk})
+    if like:
+        delta = 0 if likes.exists() else 1
+        if delta:
+            like_model.objects.create(user=user, **{f"{field_name}_id": pk})
+    else:
+        # 정리되지 않은 중복 row가 있으면 모두 삭제되므로 삭제된 수만큼 차감
+        _, deleted = likes.delete()
+        delta = -deleted.get(like_model._meta.label, 0)
+
+    if delta:
+        # num_likes가 채워지기 전의 좋아요를 취소해도 음수(CHECK constraint 위반)가 되지 않도록
+        target_model.objects.filter(pk=pk).update(num_likes=Greatest(F("num_likes") + delta, 0))
+
+    return like, get_like_count(target_type, pk)
+
+
+def toggle_like(user, target_type, pk):
+    like_model, field_name, _ = get_target(target_type)
+    liked = like_model.objects.filter(user=user, **{f"{field_name}_id": pk}).exists()
+    return set_like(user, target_type, pk, not liked)
+
+
+def get_like_states(user, target_type, pks):
+    """pks 중 user가 좋아요 한 대상 pk set - query 한 번"""
+    like_model, field_name, _ = get_target(target_type)
+    if not user.is_authenticated or not pks:
+        return set()
+    return set(
+        like_model.objects.filter(user=user, **{f"{field_name}_id__in": pks}).values_list(
+            f"{field_name}_id", flat=True
+        )
+    )
+
+
+def reconcile_like_counts():
+    """like table 기준으로 모든 대상의 num_likes 재계산 (대상 종류별 UPDATE 한 번)"""
+    updated = 0
+    for target_type in LIKE_TARGETS:
+        like_model, field_name, target_model = get_target(target_type)
+        counts = (
+            like_model.objects.filter(**{field_name: OuterRef("pk")})
+            .order_by()
+            .values(field_name)
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        updated += target_model.objects.update(num_likes=Coalesce(Subquery(counts), Value(0)))
+    return updated
+
+
+def dedupe_likes():
+    """같은 user / 대상의 중복 like row 중 가장 먼저 생긴 것만 남기고 삭제, 삭제한 like 수 반환"""
+    removed = 0
+    for target_type in LIKE_TARGETS:
+        like_model, field_name, _ = get_target(target_type)
+        duplicates = (
+            like_model.objects.order_by()
+            .values("user", field_name)
+            .annotate(count=Count("pk"), first=Min("pk"))
+            .filter(count__gt=1)
+        )
+        for row in duplicates:
+            extra = like_model.objects.filter(
+                user=row["user"], **{field_name: row[field_name]}
+            ).exclude(pk=row["first"])
+            removed += len(extra)
+            extra.delete()
+    return removed
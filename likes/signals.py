@@ -0,0 +1,11 @@
+from django.db.models.signals import post_migrate
+from django.dispatch import receiver
+from .services import reconcile_like_counts
+
+
+@receiver(post_migrate)
+def backfill_like_counts(sender, **kwargs):
+    # num_likes 추가 전에 있던 좋아요 반영 - migrate 때마다 like table 기준으로 재계산
+    if sender.name != "likes":
+        return
+    reconcile_like_counts()
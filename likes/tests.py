@@ -1,3 +1,113 @@
-from django.test import TestCase
+from django.core.management.sql import emit_post_migrate_signal
+from django.db import connection, OperationalError
+from django.test import TestCase, TransactionTestCase
+from core import testing
+from editor_reviews.models import Editor_Review
+from .models import AbstractLike, EditorReviewLike
+from .services import dedupe_likes, reconcile_like_counts, set_like, toggle_like
+import threading
+import time
 
 # Create your tests here.
+
+
+class SetLikeTest(TestCase):
+    def setUp(self):
+        self.user = testing.make_user()
+        self.review = testing.make_editor_review(testing.make_editor())
+
+    def num_likes(self):
+        return Editor_Review.objects.values_list("num_likes", flat=True).get(pk=self.review.pk)
+
+    def test_like_is_idempotent(self):
+        self.assertEqual(set_like(self.user, "editor_review", self.review.pk), (True, 1))
+        self.assertEqual(set_like(self.user, "editor_review", self.review.pk), (True, 1))
+        self.assertEqual(EditorReviewLike.objects.count(), 1)
+        # user는 부모 table(AbstractLike)에 저장
+        self.assertEqual(AbstractLike.objects.get().user, self.user)
+
+        self.assertEqual(set_like(self.user, "editor_review", self.review.pk, False), (False, 0))
+        self.assertEqual(set_like(self.user, "editor_review", self.review.pk, False), (False, 0))
+        self.assertFalse(AbstractLike.objects.exists())
+
+    def test_toggle(self):
+        self.assertEqual(toggle_like(self.user, "editor_review", self.review.pk), (True, 1))
+        self.assertEqual(toggle_like(self.user, "editor_review", self.review.pk), (False, 0))
+
+    def test_missing_target(self):
+        with self.assertRaises(Editor_Review.DoesNotExist):
+            set_like(self.user, "editor_review", 0)
+
+    def test_dedupe_and_reconcile(self):
+        other = testing.make_user()
+        for user in (self.user, self.user, self.user, other):
+            EditorReviewLike.objects.create(user=user, review=self.review)
+        self.assertEqual(dedupe_likes(), 2)
+        self.assertEqual(EditorReviewLike.objects.count(), 2)
+        self.assertEqual(AbstractLike.objects.count(), 2)
+
+        reconcile_like_counts()
+        self.assertEqual(self.num_likes(), 2)
+
+    def test_unlike_like_created_before_counter(self):
+        # num_likes가 생기기 전의 좋아요 - 대상의 num_likes는 0
+        EditorReviewLike.objects.create(user=self.user, review=self.review)
+        self.assertEqual(self.num_likes(), 0)
+        self.assertEqual(set_like(self.user, "editor_review", self.review.pk, False), (False, 0))
+        self.assertFalse(EditorReviewLike.objects.exists())
+
+    def test_migrate_backfills_counts(self):
+        other = testing.make_user()
+        for user in (self.user, other):
+            EditorReviewLike.objects.create(user=user, review=self.review)
+        emit_post_migrate_signal(verbosity=0, interactive=False, db="default")
+        self.assertEqual(self.num_likes(), 2)
+
+        self.assertEqual(set_like(self.user, "editor_review", self.review.pk, False), (False, 1))
+
+    def test_unlike_removes_leftover_duplicates(self):
+        for _ in range(2):
+            EditorReviewLike.objects.create(user=self.user, review=self.review)
+        Editor_Review.objects.update(num_likes=2)
+        self.assertEqual(set_like(self.user, "editor_review", self.review.pk, False), (False, 0))
+
+
+class SetLikeConcurrencyTest(TransactionTestCase):
+    """같은 user의 동시 좋아요 요청 - like row 하나 / num_likes 1"""
+
+    REQUESTS = 6
+
+    def setUp(self):
+        self.user = testing.make_user()
+        self.review = testing.make_editor_review(testing.make_editor())
+
+    def like(self, barrier, errors):
+        try:
+            barrier.wait()
+            for _ in range(50):
+                try:
+                    set_like(self.user, "editor_review", self.review.pk)
+                    return
+                except OperationalError:
+                    # sqlite - 다른 connection이 쓰는 중 (database table is locked)
+                    time.sleep(0.01)
+            errors.append(self.user.pk)
+        finally:
+            connection.close()
+
+    def test_concurrent_likes_create_one_row(self):
+        barrier = threading.Barrier(self.REQUESTS)
+        errors = []
+        threads = [
+            threading.Thread(target=self.like, args=(barrier, errors))
+            for _ in range(self.REQUESTS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(EditorReviewLike.objects.filter(user=self.user).count(), 1)
+        self.review.refresh_from_db()
+        self.assertEqual(self.review.num_likes, 1)
@@ -5,6 +5,11 @@ from . import views
 app_name = "likes"
 
 urlpatterns = [
+    path(
+        "editor_review/",
+        views.EditorReviewLikeView,
+        name="editor_review_like",
+    ),
     path(
         "editor_review_comment/",
         views.EditorReviewCommentLikeView,
@@ -30,4 +35,9 @@ urlpatterns = [
         views.ProductRecommentLikeView,
         name="product_recomment_like",
     ),
+    path(
+        "state/",
+        views.LikeStateView,
+        name="like_state",
+    ),
 ]
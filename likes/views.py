@@ -1,111 +1,79 @@
 from django.shortcuts import render, reverse, redirect
 from django.http import JsonResponse, HttpResponse
-from editor_reviews.models import Editor_Review
-from comments.models import (
-    Editor_Review_Comment,
-    Editor_Review_Recomment,
-    Farmer_Story_Comment,
-    Farmer_Story_Recomment,
-    Product_Recomment,
-)
-from .models import (
-    EditorReviewCommentLike,
-    EditorReviewRecommentLike,
-    EditorReviewLike,
-    FarmerStoryCommentLike,
-    FarmerStoryRecommentLike,
-    ProductRecommentLike,
-)
-from django.contrib.auth.models import AnonymousUser
 from django.core.exceptions import ObjectDoesNotExist
-from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_POST
+from .services import UnknownLikeTarget, get_like_states, set_like, toggle_like
 
 
 # Create your views here.
 
 
-@require_POST
-@login_required
-def EditorReviewLike(request):
-    if request.is_ajax():
-        pk = request.POST.get("pk")
-        post = Editor_Review.objects.get(pk=pk)
-        is_like = True
-
-        try:
-            like = EditorReviewLike.objects.get(user=request.user, review=post)
-            like.delete()
-            is_like = False
-
-        except ObjectDoesNotExist:
-            new_like = EditorReviewLike(user=request.user, review=post)
-            new_like.save()
-
-        ctx = {
-            "likes": EditorReviewLike.objects.filter(review=post).count(),
-            "status": is_like,
-        }
-
-        return JsonResponse(ctx)
+def like_view(request, target_type):
+    """
+    좋아요 / 좋아요 취소 - AJAX
+    status("true" / "false")를 함께 보내면 해당 상태로 설정 (중복 요청에도 결과 동일)
+    없으면 현재 상태를 반전
+    """
+    if request.user.is_anonymous:
+        return HttpResponse("로그인 후 좋아요 할 수 있습니다.", status=403)
 
+    pk = request.POST.get("pk")
+    status = request.POST.get("status")
 
-def EditorReviewCommentLikeView(request):
-    if request.is_ajax():
-        if request.user == AnonymousUser():
-            return HttpResponse("로그인 후 좋아요 할 수 있습니다.", status=403)
-
+    try:
+        if status in ("true", "false"):
+            is_like, likes = set_like(request.user, target_type, pk, status == "true")
         else:
-            pk = request.POST.get("pk")
-            comment = Editor_Review_Comment.objects.get(pk=pk)
-            is_like = True
+            is_like, likes = toggle_like(request.user, target_type, pk)
+    except (ObjectDoesNotExist, ValueError):
+        return HttpResponse("존재하지 않는 게시물입니다.", status=404)
 
-            try:
-                like = EditorReviewCommentLike.objects.get(user=request.user, comment=comment)
+    ctx = {
+        "likes": likes,
+        "status": is_like,
+    }
 
-                like.delete()
-                is_like = False
+    return JsonResponse(ctx)
 
-            except ObjectDoesNotExist:
-                new_like = EditorReviewCommentLike(user=request.user, comment=comment)
-                new_like.save()
 
-            ctx = {
-                "likes": EditorReviewCommentLike.objects.filter(comment=comment).count(),
-                "status": is_like,
-            }
+@require_POST
+def LikeStateView(request):
+    """
+    댓글 페이지 전체의 좋아요 여부 - AJAX
+    type : LIKE_TARGETS key, pks : 대상 pk list (콤마 구분)
+    """
+    target_type = request.POST.get("type")
+    try:
+        pks = [int(pk) for pk in request.POST.get("pks", "").split(",") if pk]
+        liked = get_like_states(request.user, target_type, pks)
+    except (UnknownLikeTarget, ValueError):
+        return HttpResponse("잘못된 요청입니다.", status=400)
 
-            return JsonResponse(ctx)
+    ctx = {
+        "likes": {pk: pk in liked for pk in pks},
+    }
 
-    return redirect(reverse("core:main"))
+    return JsonResponse(ctx)
 
 
-def EditorReviewRecommentLikeView(request):
+@require_POST
+def EditorReviewLikeView(request):
     if request.is_ajax():
-        if request.user == AnonymousUser():
-            return HttpResponse("로그인 후 좋아요 할 수 있습니다.", status=403)
+        return like_view(request, "editor_review")
 
-        else:
-            pk = request.POST.get("pk")
-            comment = Editor_Review_Recomment.objects.get(pk=pk)
-            is_like = True
+    return redirect(reverse("core:main"))
 
-            try:
-                like = EditorReviewRecommentLike.objects.get(user=request.user, recomment=comment)
 
-                like.delete()
-                is_like = False
+def EditorReviewCommentLikeView(request):
+    if request.is_ajax():
+        return like_view(request, "editor_review_comment")
 
-            except ObjectDoesNotExist:
-                new_like = EditorReviewRecommentLike(user=request.user, recomment=comment)
-                new_like.save()
+    return redirect(reverse("core:main"))
 
-            ctx = {
-                "likes": EditorReviewRecommentLike.objects.filter(recomment=comment).count(),
-                "status": is_like,
-            }
 
-            return JsonResponse(ctx)
+def EditorReviewRecommentLikeView(request):
+    if request.is_ajax():
+        return like_view(request, "editor_review_recomment")
 
     return redirect(reverse("core:main"))
 
@@ -113,89 +81,20 @@ def EditorReviewRecommentLikeView(request):
 # farmer story
 def FarmerStoryCommentLikeView(request):
     if request.is_ajax():
-        if request.user == AnonymousUser():
-            return HttpResponse("로그인 후 좋아요 할 수 있습니다.", status=403)
-
-        else:
-            pk = request.POST.get("pk")
-            comment = Farmer_Story_Comment.objects.get(pk=pk)
-            is_like = True
+        return like_view(request, "farmer_story_comment")
 
-            try:
-                like = FarmerStoryCommentLike.objects.get(user=request.user, comment=comment)
-
-                like.delete()
-                is_like = False
-
-            except ObjectDoesNotExist:
-                new_like = FarmerStoryCommentLike(user=request.user, comment=comment)
-                new_like.save()
-
-            ctx = {
-                "likes": FarmerStoryCommentLike.objects.filter(comment=comment).count(),
-                "status": is_like,
-            }
-
-            return JsonResponse(ctx)
-
-    return redirect(reverse("core:home"))
+    return redirect(reverse("core:main"))
 
 
 def FarmerStoryRecommentLikeView(request):
     if request.is_ajax():
-        if request.user == AnonymousUser():
-            return HttpResponse("로그인 후 좋아요 할 수 있습니다.", status=403)
-
-        else:
-            pk = request.POST.get("pk")
-            comment = Farmer_Story_Recomment.objects.get(pk=pk)
-            is_like = True
-
-            try:
-                like = FarmerStoryRecommentLike.objects.get(user=request.user, recomment=comment)
-
-                like.delete()
-                is_like = False
-
-            except ObjectDoesNotExist:
-                new_like = FarmerStoryRecommentLike(user=request.user, recomment=comment)
-                new_like.save()
+        return like_view(request, "farmer_story_recomment")
 
-            ctx = {
-                "likes": FarmerStoryRecommentLike.objects.filter(recomment=comment).count(),
-                "status": is_like,
-            }
-
-            return JsonResponse(ctx)
-
-    return redirect(reverse("core:home"))
+    return redirect(reverse("core:main"))
 
 
 def ProductRecommentLikeView(request):
     if request.is_ajax():
-        if request.user == AnonymousUser():
-            return HttpResponse("로그인 후 좋아요 할 수 있습니다.", status=403)
-
-        else:
-            pk = request.POST.get("pk")
-            comment = Product_Recomment.objects.get(pk=pk)
-            is_like = True
-
-            try:
-                like = ProductRecommentLike.objects.get(user=request.user, recomment=comment)
+        return like_view(request, "product_recomment")
 
-                like.delete()
-                is_like = False
-
-            except ObjectDoesNotExist:
-                new_like = ProductRecommentLike(user=request.user, recomment=comment)
-                new_like.save()
-
-            ctx = {
-                "likes": ProductRecommentLike.objects.filter(recomment=comment).count(),
-                "status": is_like,
-            }
-
-            return JsonResponse(ctx)
-
-    return redirect(reverse("core:home"))
+    return redirect(reverse("core:main"))
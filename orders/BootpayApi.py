@@ -1,5 +1,10 @@
 import requests
 import json
+import os
+import time
+import threading
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 
 class BootpayApi:
@@ -8,25 +13,118 @@ class BootpayApi:
         "production": "https://api.bootpay.co.kr",
     }
 
-    def __init__(self, application_id, private_key, mode="production"):
+    # (connect, read) timeout - 초 단위
+    timeout = (3.05, 10)
+    # 만료 정보가 없는 경우 token 재사용 시간 / 만료 전 미리 재발급하는 여유 시간
+    token_ttl = 60 * 30
+    token_margin = 60
+
+    def __init__(self, application_id, private_key, mode="production", api_base_url=None):
         self.application_id = application_id
         self.pk = private_key
         self.mode = mode
+        # local stub 서버 등 다른 주소로 요청을 보낼 때 사용
+        self.api_base_url = api_base_url
         self.token = None
+        self.token_expire_at = 0
+        self.token_result = None
+
+        self.lock = threading.Lock()
+        self.metrics = {}
+
+        # keep-alive connection pool / 연결 실패 및 일시적인 서버 오류에 대한 재시도
+        # POST는 요청 전송 전(connect) 실패만 재시도
+        retry = Retry(
+            total=3,
+            connect=3,
+            read=2,
+            status=2,
+            backoff_factor=0.3,
+            status_forcelist=(502, 503, 504),
+        )
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(max_retries=retry, pool_maxsize=10))
+        self.session.mount("http://", HTTPAdapter(max_retries=retry, pool_maxsize=10))
 
     def api_url(self, uri=None):
         if uri is None:
             uri = []
-        return "/".join([self.base_url[self.mode]] + uri)
+        base_url = self.api_base_url or self.base_url[self.mode]
+        return "/".join([base_url] + uri)
+
+    def request(self, method, uri, **kwargs):
+        """session을 통한 API 요청 - timeout 적용 및 endpoint별 latency 기록"""
+        kwargs.setdefault("timeout", self.timeout)
+        endpoint = self.endpoint_name(uri)
+        start = time.monotonic()
+        error = False
+        try:
+            return self.session.request(method, self.api_url(uri), **kwargs)
+        except requests.RequestException:
+            error = True
+            raise
+        finally:
+            self.record_metric(endpoint, time.monotonic() - start, error)
+
+    @staticmethod
+    def endpoint_name(uri):
+        """metric key - receipt_id 등 path에 포함된 id는 하나로 묶음"""
+        if len(uri) > 1 and not uri[-1].endswith(".json") and uri[-1] != "token":
+            uri = uri[:-1] + [":id"]
+        return "/".join(uri)
+
+    def record_metric(self, endpoint, elapsed, error=False):
+        with self.lock:
+            metric = self.metrics.setdefault(
+                endpoint, {"count": 0, "errors": 0, "total_time": 0.0, "max_time": 0.0}
+            )
+            metric["count"] += 1
+            metric["total_time"] += elapsed
+            metric["max_time"] = max(metric["max_time"], elapsed)
+            if error:
+                metric["errors"] += 1
+
+    def get_metrics(self):
+        """endpoint별 호출 수, 오류 수, 평균/최대 응답 시간"""
+        with self.lock:
+            return {
+                endpoint: dict(metric, avg_time=metric["total_time"] / metric["count"])
+                for endpoint, metric in self.metrics.items()
+            }
+
+    def auth_headers(self, headers=None):
+        auth = {"Authorization": self.token}
+        if headers:
+            auth.update(headers)
+        return auth
+
+    def get_access_token(self, force=False):
+        """token 발급 - 만료 전까지는 발급받은 token 재사용"""
+        with self.lock:
+            if not force and self.token is not None and time.time() < self.token_expire_at:
+                return self.token_result
 
-    def get_access_token(self):
         data = {"application_id": self.application_id, "private_key": self.pk}
-        response = requests.post(self.api_url(["request", "token"]), data=data)
+        response = self.request("post", ["request", "token"], data=data)
         result = response.json()
-        if result["status"] is 200:
-            self.token = result["data"]["token"]
+        if result["status"] == 200:
+            with self.lock:
+                self.token = result["data"]["token"]
+                self.token_expire_at = self.get_token_expire_at(result["data"])
+                self.token_result = result
         return result
 
+    def get_token_expire_at(self, data):
+        expired_at = data.get("expired_at")
+        try:
+            expired_at = float(expired_at)
+            # millisecond 단위로 오는 경우
+            if expired_at > 1e12:
+                expired_at = expired_at / 1000
+        except (TypeError, ValueError):
+            expired_at = time.time() + self.token_ttl
+        return expired_at - self.token_margin
+
     def cancel(self, receipt_id, price=None, name=None, reason=None):
         payload = {
             "receipt_id": receipt_id,
@@ -35,15 +133,18 @@ class BootpayApi:
             "reason": reason,
         }
 
-        return requests.post(
-            self.api_url(["cancel.json"]),
+        return self.request(
+            "post",
+            ["cancel.json"],
             data=payload,
-            headers={"Authorization": self.token},
+            headers=self.auth_headers(),
         ).json()
 
     def verify(self, receipt_id):
-        return requests.get(
-            self.api_url(["receipt", receipt_id]), headers={"Authorization": self.token}
+        return self.request(
+            "get",
+            ["receipt", receipt_id],
+            headers=self.auth_headers(),
         ).json()
 
     def subscribe_billing(
@@ -67,10 +168,11 @@ class BootpayApi:
             "user_info": user_info,
             "extra": extra,
         }
-        return requests.post(
-            self.api_url(["subscribe", "billing.json"]),
+        return self.request(
+            "post",
+            ["subscribe", "billing.json"],
             data=json.dumps(payload),
-            headers={"Authorization": self.token, "Content-Type": "application/json"},
+            headers=self.auth_headers({"Content-Type": "application/json"}),
         ).json()
 
     def subscribe_billing_reserve(
@@ -95,16 +197,18 @@ class BootpayApi:
             "execute_at": execute_at,
             "feedback_url": feedback_url,
         }
-        return requests.post(
-            self.api_url(["subscribe", "billing", "reserve.json"]),
+        return self.request(
+            "post",
+            ["subscribe", "billing", "reserve.json"],
             data=json.dumps(payload),
-            headers={"Authorization": self.token, "Content-Type": "application/json"},
+            headers=self.auth_headers({"Content-Type": "application/json"}),
         ).json()
 
     def subscribe_billing_reserve_cancel(self, reserve_id):
-        return requests.delete(
-            self.api_url(["subscribe", "billing", "reserve", reserve_id]),
-            headers={"Authorization": self.token, "Content-Type": "application/json"},
+        return self.request(
+            "delete",
+            ["subscribe", "billing", "reserve", reserve_id],
+            headers=self.auth_headers({"Content-Type": "application/json"}),
         ).json()
 
     def get_subscribe_billing_key(
@@ -134,31 +238,36 @@ class BootpayApi:
             "user_info": user_info,
             "extra": extra,
         }
-        return requests.post(
-            self.api_url(["request", "card_rebill.json"]),
+        return self.request(
+            "post",
+            ["request", "card_rebill.json"],
             data=json.dumps(payload),
-            headers={"Authorization": self.token, "Content-Type": "application/json"},
+            headers=self.auth_headers({"Content-Type": "application/json"}),
         ).json()
 
     def destroy_subscribe_billing_key(self, billing_key):
-        return requests.delete(
-            self.api_url(["subscribe", "billing", billing_key]),
-            headers={"Authorization": self.token},
+        return self.request(
+            "delete",
+            ["subscribe", "billing", billing_key],
+            headers=self.auth_headers(),
         ).json()
 
     def request_payment(self, payload={}):
-        return requests.post(
-            self.api_url(["request", "payment.json"]),
+        return self.request(
+            "post",
+            ["request", "payment.json"],
             data=payload,
-            headers={"Authorization": self.token},
+            headers=self.auth_headers(),
         ).json()
 
     def remote_link(self, payload={}, sms_payload=None):
         if sms_payload is None:
             sms_payload = {}
         payload["sms_payload"] = sms_payload
-        return requests.post(
-            self.api_url(["app", "rest", "remote_link.json"]), data=payload
+        return self.request(
+            "post",
+            ["app", "rest", "remote_link.json"],
+            data=payload,
         ).json()
 
     def remote_form(self, remoter_form, sms_payload=None):
@@ -169,10 +278,11 @@ class BootpayApi:
             "remote_form": remoter_form,
             "sms_payload": sms_payload,
         }
-        return requests.post(
-            self.api_url(["app", "rest", "remote_form.json"]),
+        return self.request(
+            "post",
+            ["app", "rest", "remote_form.json"],
             data=payload,
-            headers={"Authorization": self.token},
+            headers=self.auth_headers(),
         ).json()
 
     def send_sms(self, receive_numbers, message, send_number=None, extra={}):
@@ -185,10 +295,11 @@ class BootpayApi:
                 "o_id": extra["o_id"],
             }
         }
-        return requests.post(
-            self.api_url(["push", "sms.json"]),
+        return self.request(
+            "post",
+            ["push", "sms.json"],
             data=payload,
-            headers={"Authorization": self.token},
+            headers=self.auth_headers(),
         ).json()
 
     def send_lms(self, receive_numbers, message, subject, send_number=None, extra={}):
@@ -202,29 +313,52 @@ class BootpayApi:
                 "o_id": extra["o_id"],
             }
         }
-        return requests.post(
-            self.api_url(["push", "lms.json"]),
+        return self.request(
+            "post",
+            ["push", "lms.json"],
             data=payload,
-            headers={"Authorization": self.token},
+            headers=self.auth_headers(),
         ).json()
 
     def certificate(self, receipt_id):
-        return requests.get(
-            self.api_url(["certificate", receipt_id]),
-            headers={"Authorization": self.token},
+        return self.request(
+            "get",
+            ["certificate", receipt_id],
+            headers=self.auth_headers(),
         ).json()
 
     def submit(self, receipt_id):
         payload = {"receipt_id": receipt_id}
-        return requests.post(
-            self.api_url(["submit.json"]),
+        return self.request(
+            "post",
+            ["submit.json"],
             data=payload,
-            headers={"Authorization": self.token},
+            headers=self.auth_headers(),
         ).json()
 
     def get_user_token(self, data={}):
-        return requests.post(
-            self.api_url(["request", "user", "token.json"]),
+        return self.request(
+            "post",
+            ["request", "user", "token.json"],
             data=data,
-            headers={"Authorization": self.token, "Content-Type": "application/json"},
+            headers=self.auth_headers({"Content-Type": "application/json"}),
         ).json()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_bootpay_client():
+    """process 내에서 공유하는 BootpayApi client (connection pool / token 재사용)"""
+    global _client
+
+    with _client_lock:
+        if _client is None:
+            _client = BootpayApi(
+                application_id=os.environ.get("BOOTPAY_REST_KEY"),
+                private_key=os.environ.get("BOOTPAY_PRIVATE_KEY"),
+                mode=os.environ.get("BOOTPAY_MODE", "production"),
+                api_base_url=os.environ.get("BOOTPAY_API_URL"),
+            )
+        return _client
@@ -40,6 +40,13 @@ class Order_Group(models.Model):
         "users.Consumer", related_name="order_groups", on_delete=models.CASCADE
     )
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["consumer", "status", "order_at"], name="order_group_consumer_idx"
+            ),
+        ]
+
     def __str__(self):
         name = []
         name.append(self.consumer.user.nickname)
@@ -91,6 +98,12 @@ class Order_Detail(models.Model):
         Order_Group, related_name="order_details", on_delete=models.SET_NULL, null=True
     )
 
+    class Meta:
+        indexes = [
+            # 농가별 주문 조회(product__farmer)는 product FK로 join 후 status로 필터
+            models.Index(fields=["product", "status"], name="order_detail_product_idx"),
+        ]
+
     def __str__(self):
         name = []
         name.append(str(self.product.title))
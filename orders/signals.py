@@ -0,0 +1,19 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from farmers.models import Farmer
+from products.models import Product
+from .models import Order_Detail
+
+
+def clear_farmer_order_counts(order_details):
+    """queryset.update()처럼 signal이 없는 일괄 변경 후 관련 농가의 주문 상태 개수 cache 무효화"""
+
+    product_pks = {detail.product_id for detail in order_details}
+    farmer_pks = Product.objects.filter(pk__in=product_pks).values_list("farmer_id", flat=True)
+    Farmer.clear_order_status_counts(*set(farmer_pks))
+
+
+@receiver([post_save, post_delete], sender=Order_Detail)
+def order_detail_changed(sender, instance, **kwargs):
+    # 농가 마이페이지 주문 상태별 개수 cache 무효화
+    clear_farmer_order_counts([instance])
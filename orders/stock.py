@@ -0,0 +1,90 @@
+from collections import defaultdict
+from django.db import transaction
+from django.db.models import F
+from products.models import Product, refresh_sales_rate
+from .models import Order_Detail
+from .signals import clear_farmer_order_counts
+
+
+class StockShortage(Exception):
+    def __init__(self, titles):
+        super().__init__(titles)
+        self.titles = titles
+
+
+def _quantities_by_product(order_details):
+    """상품 pk 별 주문 수량 합계"""
+    quantities = defaultdict(int)
+    for detail in order_details:
+        quantities[detail.product_id] += detail.quantity
+    return quantities
+
+
+@transaction.atomic
+def reserve_stock(order_details, status="payment_complete"):
+    """
+    결제 전 재고 차감
+    - 결제 대기(wait) 주문만 차감 - 같은 주문으로 다시 호출되어도(결제 요청 재전송) 한 번만 차감
+    - 주문 상품을 pk 순서로 select_for_update (deadlock 방지)
+    - 재고 부족 상품을 한 번에 확인하여 title list로 반환 (재고 부족 시 아무것도 변경하지 않음)
+    - F() 조건부 update로 재고 차감 / 판매량 증가, order_detail status는 한 번에 update
+    """
+
+    # 주문 row를 pk 순서로 먼저 lock한 뒤 아직 wait인 주문만 다시 읽음
+    # (row lock이 없는 sqlite는 값이 바뀌지 않는 update로 transaction 쓰기 lock)
+    pks = [detail.pk for detail in order_details]
+    list(Order_Detail.objects.select_for_update().filter(pk__in=pks).order_by("pk"))
+    Order_Detail.objects.filter(pk__in=pks).update(status=F("status"))
+    order_details = list(Order_Detail.objects.filter(pk__in=pks, status="wait"))
+    if not order_details:
+        return []
+    quantities = _quantities_by_product(order_details)
+
+    products = list(
+        Product.objects.select_for_update().filter(pk__in=quantities.keys()).order_by("pk")
+    )
+
+    # [1] 재고 부족 상품 한 번에 확인
+    shortages = [p.title for p in products if p.stock < quantities[p.pk]]
+    if shortages:
+        return shortages
+
+    # [2] 재고 차감 - row lock을 지원하지 않는 DB(sqlite)를 위해 stock 조건을 함께 검사
+    try:
+        with transaction.atomic():
+            for product in products:
+                quantity = quantities[product.pk]
+                updated = Product.objects.filter(pk=product.pk, stock__gte=quantity).update(
+                    stock=F("stock") - quantity,
+                    sales_count=F("sales_count") + quantity,
+                )
+                if updated == 0:
+                    raise StockShortage([product.title])
+    except StockShortage as e:
+        return e.titles
+
+    refresh_sales_rate(Product.objects.filter(pk__in=quantities.keys()))
+
+    # [3] order_detail status 한 번에 변경
+    Order_Detail.objects.filter(pk__in=[detail.pk for detail in order_details]).update(
+        status=status
+    )
+    clear_farmer_order_counts(order_details)
+
+    return []
+
+
+@transaction.atomic
+def release_stock(order_details):
+    """주문 취소 / 결제 실패 시 차감했던 재고 복구"""
+
+    quantities = _quantities_by_product(order_details)
+
+    for pk in sorted(quantities.keys()):
+        quantity = quantities[pk]
+        Product.objects.filter(pk=pk).update(
+            stock=F("stock") + quantity,
+            sales_count=F("sales_count") - quantity,
+        )
+
+    refresh_sales_rate(Product.objects.filter(pk__in=quantities.keys()))
@@ -1,3 +1,291 @@
-from django.test import TestCase
+from django.db import connection, OperationalError
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from addresses.models import Address
+from core.testing import make_category, make_consumer, make_farmer, make_order, make_product
+from .BootpayApi import BootpayApi
+from .models import Order_Detail, Order_Group
+from .stock import release_stock, reserve_stock
+import json
+import threading
+import time
 
 # Create your tests here.
+
+
+class PaymentCreateQueryTest(TestCase):
+    """결제 페이지 생성 - 주문 상품 수와 관계없이 query 수 일정"""
+
+    def setUp(self):
+        self.consumer = make_consumer()
+        self.consumer.default_address = Address.objects.create(
+            full_address="서울시", user=self.consumer.user
+        )
+        self.consumer.save()
+        self.client.force_login(self.consumer.user)
+
+        category = make_category("과일", "fruit")
+        self.products = [
+            make_product(
+                make_farmer(),
+                category,
+                title=f"사과 {i}",
+                additional_delivery_fee_unit=2,
+                additional_delivery_fee=1000,
+            )
+            for i in range(20)
+        ]
+
+    def post_orders(self, products):
+        orders = [{"pk": product.pk, "quantity": 3} for product in products]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                reverse("orders:payment_create"), {"orders": json.dumps(orders)}
+            )
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_cart_size(self):
+        single = self.post_orders(self.products[:1])
+        many = self.post_orders(self.products)
+        self.assertEqual(single, many)
+
+    def test_creates_waiting_order(self):
+        self.post_orders(self.products[:3])
+        group = Order_Group.objects.get()
+        self.assertEqual(group.status, "wait")
+        self.assertEqual(group.total_quantity, 9)
+        # 상품 3개 * 3개 - 추가 배송비 단위(2개) 초과분 1회씩
+        self.assertEqual(group.total_price, 3 * 3 * 10000 + 3 * 1000)
+        self.assertEqual(Order_Detail.objects.filter(order_group=group, status="wait").count(), 3)
+        self.assertTrue(group.order_management_number.endswith(f"_PF{group.pk}"))
+
+
+class StockTest(TestCase):
+    def setUp(self):
+        self.consumer = make_consumer()
+        category = make_category("과일", "fruit")
+        farmer = make_farmer()
+        self.apple = make_product(farmer, category, title="사과", stock=5)
+        self.pear = make_product(farmer, category, title="배", stock=1)
+
+    def order(self, *items):
+        group = Order_Group.objects.create(consumer=self.consumer, status="wait")
+        return [
+            Order_Detail.objects.create(
+                order_group=group,
+                product=product,
+                status="wait",
+                quantity=quantity,
+                total_price=product.sell_price * quantity,
+            )
+            for product, quantity in items
+        ]
+
+    def assertStock(self, product, stock, sales_count):
+        product.refresh_from_db()
+        self.assertEqual((product.stock, product.sales_count), (stock, sales_count))
+        self.assertAlmostEqual(product.sales_rate, sales_count / (stock + sales_count))
+
+    def test_reserve_and_release(self):
+        details = self.order((self.apple, 2), (self.pear, 1))
+        self.assertEqual(reserve_stock(details), [])
+        self.assertStock(self.apple, 3, 2)
+        self.assertStock(self.pear, 0, 1)
+        self.assertEqual(
+            set(Order_Detail.objects.values_list("status", flat=True)), {"payment_complete"}
+        )
+
+        release_stock(details)
+        self.assertStock(self.apple, 5, 0)
+        self.assertStock(self.pear, 1, 0)
+
+    def test_shortage_changes_nothing(self):
+        details = self.order((self.apple, 2), (self.pear, 2))
+        self.assertEqual(reserve_stock(details), ["배"])
+        self.assertStock(self.apple, 5, 0)
+        self.assertStock(self.pear, 1, 0)
+        self.assertEqual(set(Order_Detail.objects.values_list("status", flat=True)), {"wait"})
+
+    def test_repeated_reservation_is_ignored(self):
+        # 같은 주문으로 결제 요청이 다시 들어와도 재고는 한 번만 차감
+        details = self.order((self.apple, 2))
+        self.assertEqual(reserve_stock(details), [])
+        self.assertEqual(reserve_stock(details), [])
+        self.assertEqual(reserve_stock(Order_Detail.objects.filter(pk=details[0].pk)), [])
+        self.assertStock(self.apple, 3, 2)
+
+        # 일부만 처리된 주문은 wait인 주문만 차감
+        details += self.order((self.pear, 1))
+        self.assertEqual(reserve_stock(details), [])
+        self.assertStock(self.apple, 3, 2)
+        self.assertStock(self.pear, 0, 1)
+
+    def test_same_product_in_several_details(self):
+        details = self.order((self.apple, 3), (self.apple, 3))
+        self.assertEqual(reserve_stock(details), ["사과"])
+        self.assertEqual(reserve_stock(details[:1]), [])
+        self.assertStock(self.apple, 2, 3)
+
+
+class StockConcurrencyTest(TransactionTestCase):
+    """동시 결제 - 재고보다 많이 차감되지 않음 (thread마다 별도 DB connection)"""
+
+    BUYERS = 8
+    STOCK = 3
+
+    def setUp(self):
+        consumer = make_consumer()
+        category = make_category("과일", "fruit")
+        self.product = make_product(make_farmer(), category, stock=self.STOCK)
+        self.details = [
+            make_order(consumer, self.product, status="wait")[1] for _ in range(self.BUYERS)
+        ]
+
+    def reserve(self, detail, barrier, results):
+        try:
+            barrier.wait()
+            for _ in range(50):
+                try:
+                    results.append(reserve_stock([detail]))
+                    return
+                except OperationalError:
+                    # sqlite - 다른 connection이 쓰는 중 (database table is locked)
+                    time.sleep(0.01)
+            results.append(None)
+        finally:
+            connection.close()
+
+    def test_concurrent_reservations_never_oversell(self):
+        barrier = threading.Barrier(self.BUYERS)
+        results = []
+        threads = [
+            threading.Thread(target=self.reserve, args=(detail, barrier, results))
+            for detail in self.details
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertNotIn(None, results)
+        self.assertEqual(results.count([]), self.STOCK)
+        self.assertEqual(results.count([self.product.title]), self.BUYERS - self.STOCK)
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 0)
+        self.assertEqual(self.product.sales_count, self.STOCK)
+        self.assertEqual(
+            Order_Detail.objects.filter(status="payment_complete").count(), self.STOCK
+        )
+
+    def test_concurrent_replays_reserve_once(self):
+        # 같은 주문의 결제 요청이 동시에 여러 번 들어온 경우
+        detail = self.details[0]
+        barrier = threading.Barrier(self.BUYERS)
+        results = []
+        threads = [
+            threading.Thread(target=self.reserve, args=(detail, barrier, results))
+            for _ in range(self.BUYERS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, [[]] * self.BUYERS)
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.stock, self.product.sales_count), (self.STOCK - 1, 1))
+
+
+class StubBootpayHandler(BaseHTTPRequestHandler):
+    """Bootpay API stub - server.responses[path]에 쌓인 (status, body)를 순서대로 응답"""
+
+    def respond(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        self.server.requests.append((self.command, self.path, self.headers.get("Authorization")))
+        queue = self.server.responses.get(self.path) or [(404, {"status": 404})]
+        status, body = queue.pop(0) if len(queue) > 1 else queue[0]
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_DELETE = respond
+
+    def log_message(self, *args):
+        pass
+
+
+class BootpayApiTest(TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubBootpayHandler)
+        self.server.requests = []
+        self.server.responses = {
+            "/request/token": [
+                (200, {"status": 200, "data": {"token": "token-1", "expired_at": None}})
+            ]
+        }
+        threading.Thread(
+            target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        ).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        host, port = self.server.server_address
+        self.api = BootpayApi("app", "key", api_base_url=f"http://{host}:{port}")
+        # 재시도 대기 시간 없이
+        for adapter in self.api.session.adapters.values():
+            adapter.max_retries.backoff_factor = 0
+
+    def paths(self):
+        return [path for _, path, _ in self.server.requests]
+
+    def test_token_is_reused_until_expired(self):
+        self.assertEqual(self.api.get_access_token()["data"]["token"], "token-1")
+        self.api.get_access_token()
+        self.assertEqual(self.paths(), ["/request/token"])
+
+        self.api.token_expire_at = time.time() - 1
+        self.api.get_access_token()
+        self.api.get_access_token(force=True)
+        self.assertEqual(self.paths(), ["/request/token"] * 3)
+
+    def test_token_expire_at_in_milliseconds(self):
+        expired_at = time.time() + 600
+        self.server.responses["/request/token"] = [
+            (200, {"status": 200, "data": {"token": "t", "expired_at": expired_at * 1000}})
+        ]
+        self.api.get_access_token()
+        self.assertAlmostEqual(
+            self.api.token_expire_at, expired_at - self.api.token_margin, places=2
+        )
+
+    def test_get_is_retried_on_server_error(self):
+        self.server.responses["/receipt/r1"] = [
+            (503, {"status": 503}),
+            (200, {"status": 200, "data": {"receipt_id": "r1"}}),
+        ]
+        self.api.get_access_token()
+        result = self.api.verify("r1")
+        self.assertEqual(result["data"]["receipt_id"], "r1")
+        self.assertEqual(self.paths(), ["/request/token", "/receipt/r1", "/receipt/r1"])
+        # 발급받은 token으로 인증
+        self.assertEqual(self.server.requests[-1][2], "token-1")
+
+        metric = self.api.get_metrics()["receipt/:id"]
+        self.assertEqual((metric["count"], metric["errors"]), (1, 0))
+
+    def test_post_is_not_retried_after_sending(self):
+        # 결제 취소 같은 POST는 서버가 받은 뒤에는 재시도하지 않음 (중복 취소 방지)
+        self.server.responses["/cancel.json"] = [
+            (503, {"status": 503}),
+            (200, {"status": 200}),
+        ]
+        self.assertEqual(self.api.cancel("r1", price=1000)["status"], 503)
+        self.assertEqual(self.paths(), ["/cancel.json"])
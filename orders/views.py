@@ -12,7 +12,9 @@ from users.models import Subscribe
 import requests, base64
 import json
 import os, datetime
-from .BootpayApi import BootpayApi
+from .BootpayApi import get_bootpay_client
+from .stock import reserve_stock, release_stock
+from .signals import clear_farmer_order_counts
 import pprint
 from kakaomessages.views import send_kakao_message
 from kakaomessages.template import templateIdList
@@ -128,20 +130,20 @@ def payment_create(request):
         # (변수) 총 주문 상품 가격의 합
         price_sum = 0
 
-        # [PROCESS 1] 결제 대기 상태인 Order_Group 생성
+        # [PROCESS 1] 주문 상품 한 번에 select (농가 / 농가 user join)
+        product_pks = [(int)(order["pk"]) for order in orders]
+        product_dict = Product.objects.select_related("farmer__user").in_bulk(product_pks)
+
+        # [PROCESS 2] 결제 대기 상태인 Order_Group 생성
         order_group = Order_Group(status="wait", consumer=consumer)
         order_group.save()
         order_group_pk = order_group.pk
 
-        # [PROCESS 2] order_group pk와 주문날짜를 기반으로 order_group 주문 번호 생성
+        # [PROCESS 3] order_group pk와 주문날짜를 기반으로 order_group 주문 번호 생성
         order_group_management_number = create_order_group_management_number(
             order_group_pk
         )
 
-        # [PROCESS 3] Order_Group 주문 번호 저장 (결제 단위 구별용 - BootPay 전송)
-        order_group.order_management_number = order_group_management_number
-        order_group.save()
-
         # 부트페이 API로 보내기 위한 name parameter 뒤에 들어갈 숫자 정보 ex) 맛있는 딸기 외 3개
         order_detail_cnt = 0
         # 부트페이 API로 보내기 위한 name parameter
@@ -150,6 +152,9 @@ def payment_create(request):
         # 전체 배송비 (기본 배송비 + 단위별 추가 배송비)
         total_delivery_fee = 0
 
+        # bulk_create할 order_detail list
+        order_details = []
+
         # [PROCESS 4] 소비자 주문목록에서 각 주문 사항 order_detail로 생성
         for order in orders:
 
@@ -158,8 +163,8 @@ def payment_create(request):
             pk = (int)(order["pk"])
             quantity = (int)(order["quantity"])
 
-            # 주문 상품의 본래 상품 select
-            product = Product.objects.get(pk=pk)
+            # 주문 상품의 본래 상품
+            product = product_dict[pk]
 
             # 기본 배송비 total_delivery_fee에 추가
             total_delivery_fee += product.default_delivery_fee
@@ -172,7 +177,7 @@ def payment_create(request):
                     if quantity % product.additional_delivery_fee_unit == 0:
                         total_delivery_fee += (
                             (int)(quantity_per_unit - 1)
-                        ) * product.addtional_delivery_fee
+                        ) * product.additional_delivery_fee
                     else:
                         total_delivery_fee += (int)(
                             quantity / product.additional_delivery_fee_unit
@@ -184,26 +189,24 @@ def payment_create(request):
             # order_detail 구매 총액
             total_price = product.sell_price * quantity
 
-            # [PROCESS 5] 결제 대기 상태의 order_detail 생성 및 Order_Group으로 묶어줌
-            order_detail = Order_Detail(
-                status="wait",
-                quantity=quantity,
-                total_price=total_price,
-                product=product,
-                order_group=order_group,
-            )
-            order_detail.save()
-
-            order_detail_pk = order_detail.pk
+            # [PROCESS 5] Order_detail 주문 번호 생성
+            # order_group pk와 주문날짜를 기반으로 생성하므로 insert 전에 계산 가능
             farmer_id = product.farmer.user.username
-
-            # [PROCESS 6] Order_detail 주문 번호 저장
-            # order_group pk와 주문날짜를 기반으로 order_group 주문 번호 생성
             order_detail_management_number = create_order_detail_management_number(
                 order_group_pk, farmer_id
             )
-            order_detail.order_management_number = order_detail_management_number
-            order_detail.save()
+
+            # [PROCESS 6] 결제 대기 상태의 order_detail 생성 및 Order_Group으로 묶어줌
+            order_details.append(
+                Order_Detail(
+                    status="wait",
+                    quantity=quantity,
+                    total_price=total_price,
+                    product=product,
+                    order_group=order_group,
+                    order_management_number=order_detail_management_number,
+                )
+            )
 
             price_sum += total_price
 
@@ -211,10 +214,7 @@ def payment_create(request):
             if order_detail_cnt == 1:
                 order_group_name = product.title
 
-            print(f"product_weight : {product.weight}")
-            print(f"product_quantity : {quantity}")
             total_weight += (product.weight) * quantity
-            print(f"중간 결과 {total_weight}")
             products.append(
                 {
                     "order_number": order_detail_management_number,
@@ -225,24 +225,27 @@ def payment_create(request):
                 }
             )
 
+        # order_detail 한 번에 insert
+        Order_Detail.objects.bulk_create(order_details)
+
         # 구매하는 상품 개수가 1을 초과 시, **외 2개** 식으로 표기하기 위함
         if order_detail_cnt > 1:
             rest_cnt = order_detail_cnt - 1
             order_group_name = order_group_name + " 외 " + str(rest_cnt) + "개"
 
-        print(order_group_name)
-
         # [PROCESS 7] 할인 관련 logic (예정)
         discount = 0  # 추후 할인 전략 도입 시 작성
-        print(total_weight)
 
         # [PROCESS 8] 최종 결제 금액 계산
         final_price = price_sum + total_delivery_fee + discount
 
+        # [PROCESS 9] Order_Group 주문 번호 (결제 단위 구별용 - BootPay 전송) 및 결제 정보 한 번에 저장
+        order_group.order_management_number = order_group_management_number
         order_group.total_price = final_price
         order_group.total_quantity = total_quantity
-        order_group.save()
-        print(order_group.pk)
+        order_group.save(
+            update_fields=["order_management_number", "total_price", "total_quantity", "update_at"]
+        )
         ctx = {
             "order_group_management_number": order_group_management_number,
             "order_group_pk": order_group_pk,
@@ -280,36 +283,17 @@ def payment_update(request, pk):
         order_group_pk = pk
         order_group = Order_Group.objects.get(pk=order_group_pk)
 
-        # [PROCESS 2] Order_Group에 속한 Order_detail을 모두 가져와서 재고량 확인
+        # [PROCESS 2] Order_Group에 속한 Order_detail을 모두 가져옴
         order_details = order_group.order_details.all()
 
+        # [PROCESS 3] 결제 전 최종 재고 확인 및 재고 차감 / status 변경
+        # 재고가 부족한 상품명 리스트 -> 추후 결제 실패 페이지의 오류 메시지로 출력
+        invalid_products = reserve_stock(order_details)
         # 모든 주문 상품 재고량 확인 태그
-        valid = True
-        # 재고가 부족한 상품명 리스트
-        invalid_products = list()
-
-        # [PROCESS 3] 결제 전 최종 재고 확인
-        for detail in order_details:
-            print("[재고 확인 상품 재고] " + (str)(detail.product.stock))
-            print("[재고 확인 주문양] " + (str)(detail.quantity))
-            if detail.product.stock - detail.quantity < 0:
-                valid = False
-                # 재고가 부족한 경우 부족한 상품 title 저장 -> 추후 결제 실패 페이지의 오류 메시지로 출력
-                invalid_products.append(detail.product.title)
-                print(detail.product.title + "재고 부족")
-
-        print(invalid_products)
-
-        # [PROCESS 4] 재고 확인 성공인 경우, 각 상품 재고 차감 / status 변경
-        if valid is True:
-            for detail in order_details:
-                # order_detail 재고 차감
-                detail.product.stock -= detail.quantity
-                # order_detail status - payment_complete로 변경
-                detail.status = "payment_complete"
-                detail.product.save()
-                detail.save()
+        valid = len(invalid_products) == 0
 
+        # [PROCESS 4] 재고 확인 성공인 경우 주문 정보 저장
+        if valid is True:
             # [PROCESS 5] 주문 정보 Order_Group에 등록
             rev_name = request.POST.get("rev_name")
             rev_phone_number = request.POST.get("rev_phone_number")
@@ -443,12 +427,10 @@ def payment_fail(request):
         order_group.status = error_type
         order_details = order_group.order_details.all()
 
-        for detail in order_details:
-            detail.product.stock += detail.quantity
-            print("[detail] - " + detail.product.title + " stock 복구")
-            detail.status = error_type
-            print("[detail] status - " + detail.status + "변경")
-            detail.save()
+        # 재고가 차감된(결제완료 처리된) 주문만 재고/판매량 복구
+        release_stock(order_details.filter(status="payment_complete"))
+        order_details.update(status=error_type)
+        clear_farmer_order_counts(order_details)
 
         order_group.save()
 
@@ -460,9 +442,6 @@ def payment_fail(request):
 @transaction.atomic
 def payment_valid(request):
     if request.method == "POST":
-        REST_API_KEY = os.environ.get("BOOTPAY_REST_KEY")
-        PRIVATE_KEY = os.environ.get("BOOTPAY_PRIVATE_KEY")
-
         receipt_id = request.POST.get("receipt_id")
         order_group_pk = int(request.POST.get("orderGroupPk"))
         order_group = Order_Group.objects.get(pk=order_group_pk)
@@ -485,7 +464,7 @@ def payment_valid(request):
         order_group.receipt_number = receipt_id
         order_group.save()
 
-        bootpay = BootpayApi(application_id=REST_API_KEY, private_key=PRIVATE_KEY)
+        bootpay = get_bootpay_client()
         result = bootpay.get_access_token()
 
         if result["status"] == 200:
@@ -597,10 +576,7 @@ def order_cancel(request, pk):
         cancel_reason = request.POST.get("cancel_reason")
         order.cancel_reason = cancel_reason
 
-        REST_API_KEY = os.environ.get("BOOTPAY_REST_KEY")
-        PRIVATE_KEY = os.environ.get("BOOTPAY_PRIVATE_KEY")
-
-        bootpay = BootpayApi(application_id=REST_API_KEY, private_key=PRIVATE_KEY)
+        bootpay = get_bootpay_client()
         result = bootpay.get_access_token()
 
         if result["status"] == 200:
@@ -613,9 +589,7 @@ def order_cancel(request, pk):
 
             if cancel_result["status"] == 200:
                 order.status = "cancel"
-                product = order.product
-                product.stock += order.quantity
-                product.save()
+                release_stock([order])
                 order.save()
 
                 return HttpResponse(status=200)
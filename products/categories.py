@@ -0,0 +1,128 @@
+from collections import namedtuple
+from django.core.cache import cache
+from django.db.models import Count
+from core.versions import LocalVersion
+from .models import Category, Product
+import threading
+
+"""
+카테고리 tree - 전체 Category를 query 한 번으로 읽어 process 내 불변 구조로 보관
+- node마다 materialized path(root부터의 pk tuple)를 미리 계산 -> 조상 / 자손 조회에 query 없음
+- Category 저장 / 삭제 시 cache의 version을 올리고, 각 process는 version이 바뀌면 다시 읽는다
+  (core.versions - 공유 cache가 없으면 LOCAL_TTL마다 다시 읽음)
+- 카테고리별 판매 중 상품 수(하위 카테고리 포함)는 GROUP BY 한 번으로 계산해 cache
+"""
+
+VERSION_KEY = "category_tree_version"
+COUNT_CACHE_KEY = "category_product_counts"
+COUNT_CACHE_TIMEOUT = 60 * 5
+
+CategoryNode = namedtuple("CategoryNode", ["pk", "name", "slug", "parent_pk", "path", "children"])
+
+
+class CategoryTree:
+    def __init__(self, rows):
+        parents = {pk: parent_pk for pk, _, _, parent_pk in rows}
+        children = {pk: [] for pk in parents}
+        for pk, name, _, parent_pk in sorted(rows, key=lambda row: row[1]):
+            if parent_pk in children:
+                children[parent_pk].append(pk)
+
+        def path(pk):
+            pks = []
+            while pk is not None and pk not in pks:  # parent 순환 방지
+                pks.append(pk)
+                pk = parents.get(pk)
+            return tuple(reversed(pks))
+
+        self.nodes = {
+            pk: CategoryNode(pk, name, slug, parent_pk, path(pk), tuple(children[pk]))
+            for pk, name, slug, parent_pk in rows
+        }
+        self.slugs = {node.slug: node for node in self.nodes.values()}
+        self.roots = tuple(
+            node
+            for node in sorted(self.nodes.values(), key=lambda node: node.name)
+            if node.parent_pk is None
+        )
+        # 자기 자신을 포함한 자손 pk
+        descendants = {pk: {pk} for pk in self.nodes}
+        for node in self.nodes.values():
+            for ancestor_pk in node.path[:-1]:
+                descendants[ancestor_pk].add(node.pk)
+        self.descendant_pks = {pk: frozenset(pks) for pk, pks in descendants.items()}
+
+    def get(self, pk):
+        return self.nodes.get(pk)
+
+    def get_by_slug(self, slug):
+        return self.slugs.get(slug)
+
+    def ancestors(self, pk):
+        """root부터 자기 자신까지의 node"""
+        return [self.nodes[ancestor_pk] for ancestor_pk in self.nodes[pk].path]
+
+    def root(self, pk):
+        return self.nodes[self.nodes[pk].path[0]]
+
+    def children(self, pk):
+        return [self.nodes[child_pk] for child_pk in self.nodes[pk].children]
+
+    def descendants(self, pk):
+        return self.descendant_pks[pk]
+
+    def full_name(self, pk):
+        return "->".join(node.name for node in self.ancestors(pk))
+
+
+_tree = None
+_version = LocalVersion(VERSION_KEY)
+_lock = threading.Lock()
+
+
+def get_tree():
+    global _tree
+    if _tree is None or _version.is_stale():
+        with _lock:
+            # 기다리는 동안 다른 thread가 이미 다시 읽었으면 그대로 사용
+            version = _version.current()
+            if _tree is None or _version.is_stale(version):
+                rows = list(Category.objects.values_list("pk", "name", "slug", "parent_id"))
+                _tree = CategoryTree(rows)
+                _version.loaded(version)
+    return _tree
+
+
+def invalidate_tree():
+    global _tree
+    # tree는 증분 반영하지 않음 - 이 process도 다음 조회 때 다시 읽는다
+    _version.bump()
+    _tree = None
+    invalidate_counts()
+
+
+def get_product_counts():
+    """카테고리 pk -> 판매 중 상품 수 (하위 카테고리 포함)"""
+    counts = cache.get(COUNT_CACHE_KEY)
+    if counts is None:
+        tree = get_tree()
+        counts = dict.fromkeys(tree.nodes, 0)
+        rows = (
+            Product.objects.filter(open=True)
+            .values("category")
+            .annotate(count=Count("pk"))
+            .values_list("category", "count")
+            .order_by()
+        )
+        for category_pk, count in rows:
+            node = tree.get(category_pk)
+            if node is None:
+                continue
+            for ancestor_pk in node.path:
+                counts[ancestor_pk] += count
+        cache.set(COUNT_CACHE_KEY, counts, COUNT_CACHE_TIMEOUT)
+    return counts
+
+
+def invalidate_counts():
+    cache.delete(COUNT_CACHE_KEY)
@@ -0,0 +1,156 @@
+from django.core.cache import cache
+from django.db.models import Case, Count, IntegerField, Q, Value, When
+from urllib.parse import urlencode
+from .models import Product
+
+"""
+상품 목록 facet 필터 - 작물 종류(kinds) / 가격대 / 이벤트 여부 / 농가
+- (kinds, 가격대, is_event, 농가) 조합별 상품 수를 GROUP BY query 한 번으로 가져와 카테고리별로 cache
+- 각 facet 값의 개수는 "자기 facet을 제외한 나머지 선택 필터"를 적용해 Python에서 합산
+  (같은 facet 안의 다른 값을 눌렀을 때 나올 상품 수)
+- 상품 저장 / 삭제 시 전체 목록과 모든 카테고리의 cache 무효화 (products.signals)
+  상품의 카테고리가 바뀌면 이전 카테고리도 달라지므로 카테고리 단위로 골라 지우지 않음
+"""
+
+FACET_CACHE_KEY = "store_facets:%s"
+FACET_CACHE_TIMEOUT = 60 * 5
+
+# 가격대 - (key, label, 최소 가격 이상, 최대 가격 미만)
+PRICE_BANDS = (
+    ("0", "1만원 미만", None, 10000),
+    ("1", "1만원 ~ 2만원", 10000, 20000),
+    ("2", "2만원 ~ 3만원", 20000, 30000),
+    ("3", "3만원 이상", 30000, None),
+)
+EVENT_LABELS = {"1": "이벤트 상품"}
+# Product.kinds는 class 본문에서 field로 덮어써지므로 field의 choices를 사용
+KIND_LABELS = dict(Product._meta.get_field("kinds").choices)
+FILTER_PARAMS = ("kinds", "price", "event", "farmer")
+
+
+def _price_q(band):
+    _, _, low, high = band
+    q = Q()
+    if low is not None:
+        q &= Q(sell_price__gte=low)
+    if high is not None:
+        q &= Q(sell_price__lt=high)
+    return q
+
+
+def price_band_expression():
+    return Case(
+        *[When(_price_q(band), then=Value(int(band[0]))) for band in PRICE_BANDS],
+        output_field=IntegerField(),
+    )
+
+
+def get_filters(request):
+    """GET parameter 중 유효한 필터 값만 {param: value}"""
+    filters = {}
+    kinds = request.GET.get("kinds")
+    if kinds in KIND_LABELS:
+        filters["kinds"] = kinds
+    price = request.GET.get("price")
+    if price in {band[0] for band in PRICE_BANDS}:
+        filters["price"] = price
+    if request.GET.get("event") in EVENT_LABELS:
+        filters["event"] = "1"
+    farmer = request.GET.get("farmer", "")
+    if farmer.isdigit():
+        # facet 값(str(farmer pk))과 같은 형태로 - "007" -> "7"
+        filters["farmer"] = str(int(farmer))
+    return filters
+
+
+def apply_filters(products, filters):
+    if "kinds" in filters:
+        products = products.filter(kinds=filters["kinds"])
+    if "price" in filters:
+        band = next(band for band in PRICE_BANDS if band[0] == filters["price"])
+        products = products.filter(_price_q(band))
+    if "event" in filters:
+        products = products.filter(is_event=True)
+    if "farmer" in filters:
+        products = products.filter(farmer_id=int(filters["farmer"]))
+    return products
+
+
+def filter_query(filters):
+    """pagination / 정렬 link에 붙일 필터 query string"""
+    return urlencode(filters)
+
+
+def _toggle(filters, param, value):
+    filters = dict(filters)
+    if filters.get(param) == value:
+        del filters[param]
+    else:
+        filters[param] = value
+    return filters
+
+
+def _facet_rows(products, cache_name):
+    rows = cache.get(FACET_CACHE_KEY % cache_name)
+    if rows is None:
+        rows = list(
+            products.annotate(price_band=price_band_expression())
+            .values("kinds", "price_band", "is_event", "farmer", "farmer__farm_name")
+            .annotate(count=Count("pk"))
+            .values_list("kinds", "price_band", "is_event", "farmer", "farmer__farm_name", "count")
+            .order_by()
+        )
+        cache.set(FACET_CACHE_KEY % cache_name, rows, FACET_CACHE_TIMEOUT)
+    return rows
+
+
+def _row_values(row):
+    kinds, price_band, is_event, farmer, _, _ = row
+    return {
+        "kinds": kinds,
+        "price": str(price_band),
+        "event": "1" if is_event else None,
+        "farmer": str(farmer),
+    }
+
+
+def get_facets(products, cache_name, filters):
+    """
+    facet별 [{value, label, count, selected}] - products는 필터 적용 전 queryset
+    """
+    counts = {param: {} for param in FILTER_PARAMS}
+    farm_names = {}
+    for row in _facet_rows(products, cache_name):
+        values = _row_values(row)
+        farm_names[values["farmer"]] = row[4]
+        for param in FILTER_PARAMS:
+            # 자기 facet을 제외한 선택 필터를 모두 만족하는 row만 합산
+            if all(values[other] == filters[other] for other in filters if other != param):
+                if values[param] is not None:
+                    counts[param][values[param]] = counts[param].get(values[param], 0) + row[5]
+
+    labels = {
+        "kinds": KIND_LABELS,
+        "price": {band[0]: band[1] for band in PRICE_BANDS},
+        "event": EVENT_LABELS,
+        "farmer": dict(sorted(farm_names.items(), key=lambda item: item[1])),
+    }
+    facets = {}
+    for param in FILTER_PARAMS:
+        facets[param] = [
+            {
+                "value": value,
+                "label": label,
+                "count": counts[param].get(value, 0),
+                "selected": filters.get(param) == value,
+                # 선택된 값을 다시 누르면 해제
+                "query": filter_query(_toggle(filters, param, value)),
+            }
+            for value, label in labels[param].items()
+            if counts[param].get(value, 0) or filters.get(param) == value
+        ]
+    return facets
+
+
+def invalidate(*cache_names):
+    cache.delete_many([FACET_CACHE_KEY % name for name in cache_names])
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Case, When, Value, F, Q, FloatField, ExpressionWrapper
 from django.core.exceptions import ObjectDoesNotExist
 from core.models import CompressedImageField
 from django.utils import timezone
@@ -35,7 +36,7 @@ class Product(models.Model):
 
     title = models.CharField(max_length=50)
     sub_title = models.CharField(max_length=100)
-    main_image = CompressedImageField(upload_to="product_main_image/%Y/%m/%d/")
+    main_image = CompressedImageField(upload_to="product_main_image/%Y/%m/%d/", thumbnails=True)
 
     kinds = models.CharField(max_length=100, default="ugly", choices=kinds)
     status = models.CharField(
@@ -51,7 +52,7 @@ class Product(models.Model):
     )
     stock = models.IntegerField(default=0, help_text="총 재고 수량")
     sales_count = models.IntegerField(default=0, help_text="총 판매 수량", blank=True)
-    sales_rate = models.FloatField(default=0, blank=True)
+    sales_rate = models.FloatField(default=0, blank=True, db_index=True)
 
     instruction = models.TextField(blank=True)
 
@@ -122,9 +123,21 @@ class Product(models.Model):
         "Category", related_name="products", on_delete=models.CASCADE
     )
 
+    class Meta:
+        indexes = [
+            # sqlite는 open=True를 "WHERE open"으로 비교하여 (open, ...) index의 앞부분을 쓰지 못함
+            # -> 판매 중 상품만 담은 partial index로 최신순 목록 조회
+            models.Index(
+                fields=["create_at"], name="product_open_create_idx", condition=Q(open=True)
+            ),
+            models.Index(fields=["category", "open"], name="product_category_open_idx"),
+            models.Index(fields=["farmer", "status"], name="product_farmer_status_idx"),
+        ]
+
     def save(self, *args, **kwargs):
         self.weight = round(self.weight, 1)
         self.sales_count = round(self.sales_count, 2)
+        self.calculate_sale_rate()
         super(Product, self).save(*args, **kwargs)
 
     def sold(self):
@@ -137,82 +150,34 @@ class Product(models.Model):
             self.save()
         return
 
+    # 판매율 계산 (save 시 자동 호출 - 별도 저장 X)
     def calculate_sale_rate(self):
-        rate = self.sales_count / (self.stock + self.sales_count)
-        self.sales_rate = rate
-        self.save()
-        print("판매율 계산")
+        total = self.stock + self.sales_count
+        if total > 0:
+            self.sales_rate = self.sales_count / total
+        else:
+            self.sales_rate = 0
         return self.sales_rate
 
-    # 리뷰 생성 시 평점 총합 계산을 위한 함수
-    def calculate_total_rating_sum(self, new_rating):
-        try:
-            self.total_rating_sum += new_rating
-            self.save()
-            return self.total_rating_sum
-
-        except ObjectDoesNotExist:
+    # 평점 평균 - 저장된 총합 / 리뷰 수로 조회 시 계산 (aspect : freshness, flavor, cost_performance)
+    def get_rating_avg(self, aspect=None):
+        if self.reviews <= 0:
             return 0
+        if aspect is None:
+            return self.total_rating_sum / self.reviews
+        return getattr(self, f"{aspect}_rating_sum") / self.reviews
 
-    # 리뷰 생성 시 평점 평균 계산을 위한 함수
+    # 리뷰 평점 평균 (template / view 호환용)
     def calculate_total_rating_avg(self):
-        try:
-            self.total_rating_avg = self.total_rating_sum / self.reviews
-            self.save()
-            return self.total_rating_avg
-
-        except ObjectDoesNotExist:
-            return 0
-        except ZeroDivisionError:
-            return 0
-
-    # 리뷰 생성 시 항목별 평점(총합, 평균) 계산을 위한 함수
-    def calculate_specific_rating(self, fresh, flavor, cost):
-        try:
-            self.freshness_rating_sum += fresh
-            self.flavor_rating_sum += flavor
-            self.cost_performance_rating_sum += cost
+        return self.get_rating_avg()
 
-            self.freshness_rating_avg = self.freshness_rating_sum / self.reviews
-            self.flavor_rating_avg = self.flavor_rating_sum / self.reviews
-            self.cost_performance_rating_avg = (
-                self.cost_performance_rating_sum / self.reviews
-            )
-
-            self.save()
-
-        except ObjectDoesNotExist:
-            return 0
-        except ZeroDivisionError:
-            return 0
-        # freshness_array = [0, 0, 0]
-        # flavor_array = [0, 0, 0]
-        # cost_performance_array = [0, 0, 0]
-        # result = []
-        # try:
-        #     comments = self.product_comments.all()
-        #     if comments.exists() is False:
-        #         raise ObjectDoesNotExist
-        #     ratio = 100 / comments.count()
-        #     for comment in comments:
-        #         freshness_array[check_rate(comment.freshness)] += 1
-        #         flavor_array[check_rate(comment.flavor)] += 1
-        #         cost_performance_array[check_rate(comment.cost_performance)] += 1
-
-        #     for i in range(0, 3):
-        #         freshness_array[i] = round(freshness_array[i] * ratio)
-        #         flavor_array[i] = round(flavor_array[i] * ratio)
-        #         cost_performance_array[i] = round(cost_performance_array[i] * ratio)
-
-        #     result.append(freshness_array)
-        #     result.append(flavor_array)
-        #     result.append(cost_performance_array)
-        #     return result
-        # except ObjectDoesNotExist:
-        #     result.append(freshness_array)
-        #     result.append(flavor_array)
-        #     result.append(cost_performance_array)
-        #     return result
+    # 항목별 점수(1, 3, 5) 비율(%) - 저장된 점수별 리뷰 수로 조회 시 계산
+    def get_rating_percentages(self, aspect):
+        if self.reviews <= 0:
+            return [0, 0, 0]
+        return [
+            int(100 * getattr(self, f"{aspect}_{score}") / self.reviews) for score in (1, 3, 5)
+        ]
 
     def __str__(self):
         return self.title
@@ -223,12 +188,40 @@ class Product_Image(models.Model):
         Product, related_name="product_images", on_delete=models.CASCADE
     )
 
-    image = CompressedImageField(upload_to="product_images/%Y/%m/%d/")
+    image = CompressedImageField(upload_to="product_images/%Y/%m/%d/", thumbnails=True)
 
     create_at = models.DateTimeField(auto_now_add=True)
     update_at = models.DateTimeField(auto_now=True)
 
 
+class Product_Search_Document(models.Model):
+    """상품 검색 문서 - 색인된 n-gram 수 (BM25 문서 길이)"""
+
+    product = models.OneToOneField(
+        Product, related_name="search_document", on_delete=models.CASCADE
+    )
+    length = models.IntegerField(default=0)
+
+    update_at = models.DateTimeField(auto_now=True)
+
+
+class Product_Search_Token(models.Model):
+    """상품 검색 역색인 - n-gram(token) 별 상품과 출현 횟수(tf)"""
+
+    product = models.ForeignKey(
+        Product, related_name="search_tokens", on_delete=models.CASCADE
+    )
+    token = models.CharField(max_length=3)
+    tf = models.IntegerField(default=1)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["token", "product"], name="product_search_token_unique"
+            ),
+        ]
+
+
 class Category(models.Model):
     name = models.CharField(max_length=200)
     slug = models.SlugField()
@@ -237,6 +230,13 @@ class Category(models.Model):
     )
 
     def __str__(self):
+        # 카테고리 tree에서 경로 조회 (parent 단계마다 query 하지 않음)
+        from .categories import get_tree
+
+        tree = get_tree()
+        if self.pk in tree.nodes:
+            return tree.full_name(self.pk)
+
         full_path = [self.name]
         k = self.parent
         while k is not None:
@@ -288,5 +288,22 @@ class Answer(models.Model):
         return self.question.__str__().join("에 대한 답변")
 
 
+def sales_rate_expression():
+    """queryset.update()로 판매율을 DB에서 바로 계산하기 위한 expression"""
+    return Case(
+        When(sales_count__lte=0, then=Value(0.0)),
+        default=ExpressionWrapper(
+            F("sales_count") * 1.0 / (F("stock") + F("sales_count")),
+            output_field=FloatField(),
+        ),
+        output_field=FloatField(),
+    )
+
+
+def refresh_sales_rate(queryset):
+    """stock / sales_count를 queryset.update()로 변경한 뒤 판매율 재계산"""
+    return queryset.update(sales_rate=sales_rate_expression())
+
+
 def get_delete_product():
     return Product.objects.get_or_create(title="삭제된 상품")[0]
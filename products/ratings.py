@@ -0,0 +1,91 @@
+from collections import defaultdict
+from django.db.models import Count, F, Q, Sum
+from .models import Product
+
+"""
+상품 리뷰 평점 집계
+- 리뷰 작성 / 수정 / 삭제 시 개수, 총합, 점수별 개수 변화량을 F() UPDATE 한 번으로 반영
+- 평균은 저장하지 않고 조회 시 총합 / 리뷰 수로 계산 (Product.get_rating_avg)
+"""
+
+RATING_ASPECTS = ("freshness", "flavor", "cost_performance")
+RATING_SCORES = (1, 3, 5)
+
+
+def review_deltas(comment, sign=1):
+    """리뷰 하나가 상품 집계 필드에 더하는 값 (sign=-1 이면 빼는 값)"""
+    deltas = defaultdict(int)
+    deltas["reviews"] += sign
+    deltas["total_rating_sum"] += sign * comment.avg
+    for aspect in RATING_ASPECTS:
+        score = getattr(comment, aspect)
+        deltas[f"{aspect}_rating_sum"] += sign * score
+        deltas[f"{aspect}_{score}"] += sign
+    return deltas
+
+
+def apply_deltas(product_pk, deltas):
+    updates = {field: F(field) + delta for field, delta in deltas.items() if delta}
+    if not updates:
+        return 0
+    return Product.objects.filter(pk=product_pk).update(**updates)
+
+
+def add_review(comment):
+    return apply_deltas(comment.product_id, review_deltas(comment))
+
+
+def remove_review(comment):
+    return apply_deltas(comment.product_id, review_deltas(comment, -1))
+
+
+def change_review(old, new):
+    """리뷰 수정 - 이전 평점을 빼고 새 평점을 더한 순 변화량만 반영"""
+    deltas = review_deltas(old, -1)
+    for field, delta in review_deltas(new).items():
+        deltas[field] += delta
+    return apply_deltas(new.product_id, deltas)
+
+
+def reconcile(products=None):
+    """
+    Product_Comment 전체를 GROUP BY 한 번으로 집계하여 상품 평점 필드 재계산
+    리뷰가 없는 상품은 0으로 초기화, 변경된 상품 수 반환
+    """
+    from comments.models import Product_Comment
+
+    if products is None:
+        products = Product.objects.all()
+
+    annotations = {
+        "reviews": Count("pk"),
+        "total_rating_sum": Sum("avg"),
+    }
+    for aspect in RATING_ASPECTS:
+        annotations[f"{aspect}_rating_sum"] = Sum(aspect)
+        for score in RATING_SCORES:
+            annotations[f"{aspect}_{score}"] = Count("pk", filter=Q(**{aspect: score}))
+
+    rows = (
+        Product_Comment.objects.filter(product__in=products)
+        .values("product")
+        .annotate(**annotations)
+        .order_by()
+    )
+    aggregates = {row.pop("product"): row for row in rows}
+
+    fields = list(annotations.keys()) + ["total_rating_avg"] + [
+        f"{aspect}_rating_avg" for aspect in RATING_ASPECTS
+    ]
+    changed = []
+    for product in products.only(*fields):
+        values = aggregates.get(product.pk, {})
+        for field in annotations:
+            setattr(product, field, values.get(field) or 0)
+        product.total_rating_avg = product.get_rating_avg()
+        for aspect in RATING_ASPECTS:
+            setattr(product, f"{aspect}_rating_avg", product.get_rating_avg(aspect))
+        changed.append(product)
+
+    Product.objects.bulk_update(changed, fields, batch_size=500)
+    return len(changed)
@@ -0,0 +1,182 @@
+from collections import Counter, defaultdict
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Avg, Case, Count, ExpressionWrapper, F, FloatField, Sum, Value, When
+from django.utils.html import strip_tags
+import math
+import re
+from .models import Product, Product_Search_Document, Product_Search_Token
+
+"""
+상품 검색 - 한글 n-gram 역색인 + BM25
+- 형태소 분석 없이 단어별 글자 2-gram / 3-gram을 token으로 사용 (한 글자 단어는 그대로)
+- 색인 대상: 상품명 / 부제 / 상세설명 / 농장 이름 / 카테고리
+- 상품 저장 시 signal로 commit 후 해당 상품 색인을 다시 만든다 (build_search_index command로 전체 재색인)
+- token별 문서 수(idf)로 SQL에서 상품별 예비 점수를 매겨 상위 MAX_CANDIDATES개만 가져온 뒤
+  해당 상품들의 row로 BM25 점수를 계산해 정렬 (흔한 token도 Python으로 옮기는 row 수가 일정)
+"""
+
+NGRAM_SIZES = (2, 3)
+WORD_RE = re.compile(r"[0-9a-z가-힣]+")
+
+# BM25 parameter
+K1 = 1.2
+B = 0.75
+
+# BM25로 다시 정렬할 후보 상품 수 - 검색 결과도 최대 이만큼
+MAX_CANDIDATES = 1000
+
+# 문서 수 / 평균 문서 길이 (cache) - 색인 변경 시 무효화
+STATS_CACHE_KEY = "product_search_stats"
+STATS_CACHE_TIMEOUT = 60 * 10
+
+
+def tokenize(text):
+    """text -> n-gram token list (중복 포함, tf 계산용)"""
+
+    tokens = []
+    for word in WORD_RE.findall(strip_tags(text or "").lower()):
+        if len(word) == 1:
+            tokens.append(word)
+            continue
+        for n in NGRAM_SIZES:
+            tokens.extend(word[i : i + n] for i in range(len(word) - n + 1))
+    return tokens
+
+
+def product_text(product):
+    category = product.category
+    return " ".join(
+        [
+            product.title,
+            product.sub_title,
+            product.desc,
+            product.farmer.farm_name,
+            category.name,
+            category.parent.name if category.parent_id else "",
+        ]
+    )
+
+
+def _index_rows(product):
+    tf = Counter(tokenize(product_text(product)))
+    tokens = [Product_Search_Token(product=product, token=t, tf=n) for t, n in tf.items()]
+    return tokens, sum(tf.values())
+
+
+def clear_stats():
+    cache.delete(STATS_CACHE_KEY)
+
+
+def index_products(products, batch_size=500):
+    """여러 상품 색인 - 전체 재색인 시 사용, 색인한 상품 수 반환"""
+
+    products = products.select_related("farmer", "category__parent").order_by("pk")
+    indexed = 0
+    batch = []
+
+    def flush():
+        with transaction.atomic():
+            pks = [product.pk for product, _, _ in batch]
+            Product_Search_Token.objects.filter(product__in=pks).delete()
+            Product_Search_Document.objects.filter(product__in=pks).delete()
+            Product_Search_Token.objects.bulk_create(
+                [token for _, tokens, _ in batch for token in tokens], batch_size=2000
+            )
+            Product_Search_Document.objects.bulk_create(
+                [Product_Search_Document(product=p, length=length) for p, _, length in batch]
+            )
+
+    for product in products.iterator(chunk_size=batch_size):
+        tokens, length = _index_rows(product)
+        batch.append((product, tokens, length))
+        if len(batch) >= batch_size:
+            flush()
+            indexed += len(batch)
+            batch = []
+
+    if batch:
+        flush()
+        indexed += len(batch)
+
+    clear_stats()
+    return indexed
+
+
+def get_stats():
+    """검색 대상(open) 문서 수와 평균 문서 길이"""
+
+    stats = cache.get(STATS_CACHE_KEY)
+    if stats is None:
+        stats = Product_Search_Document.objects.filter(product__open=True).aggregate(
+            count=Count("pk"), avg_length=Avg("length")
+        )
+        stats["avg_length"] = stats["avg_length"] or 0
+        cache.set(STATS_CACHE_KEY, stats, STATS_CACHE_TIMEOUT)
+    return stats
+
+
+def _idf(n, df):
+    return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+
+def search(query, limit=None):
+    """
+    검색어 -> [(product pk, score)] (점수 높은 순, 최대 MAX_CANDIDATES개)
+    1. token별 문서 수 (GROUP BY token)
+    2. 문서 길이를 뺀 BM25(idf * tf 포화)로 상품별 예비 점수 - 상위 MAX_CANDIDATES개 상품
+    3. 후보 상품의 (product, token, tf, 문서 길이) row만 가져와 BM25 점수 계산
+    """
+
+    query_tokens = set(tokenize(query))
+    if not query_tokens:
+        return []
+
+    stats = get_stats()
+    if not stats["count"]:
+        return []
+
+    postings = Product_Search_Token.objects.filter(token__in=query_tokens, product__open=True)
+    doc_counts = dict(
+        postings.values("token").annotate(df=Count("pk")).values_list("token", "df").order_by()
+    )
+    if not doc_counts:
+        return []
+
+    n = stats["count"]
+    idf = {token: _idf(n, df) for token, df in doc_counts.items()}
+
+    weight = Case(
+        *[When(token=token, then=Value(value)) for token, value in idf.items()],
+        output_field=FloatField(),
+    )
+    saturation = ExpressionWrapper(F("tf") * (K1 + 1) / (F("tf") + K1), FloatField())
+    candidates = list(
+        postings.values("product_id")
+        .annotate(pre_score=Sum(ExpressionWrapper(weight * saturation, FloatField())))
+        .order_by("-pre_score", "-product_id")
+        .values_list("product_id", flat=True)[:MAX_CANDIDATES]
+    )
+
+    rows = postings.filter(product_id__in=candidates).values_list(
+        "product_id", "token", "tf", "product__search_document__length"
+    )
+
+    avg_length = stats["avg_length"] or 1
+    scores = defaultdict(float)
+    for product_pk, token, tf, length in rows:
+        norm = K1 * (1 - B + B * (length or 0) / avg_length)
+        scores[product_pk] += idf[token] * tf * (K1 + 1) / (tf + norm)
+
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], -item[0]))
+    return ranked[:limit] if limit else ranked
+
+
+def search_products(query, offset=0, limit=20):
+    """검색 결과 상품 목록 (점수 순) 과 전체 결과 수"""
+
+    ranked = search(query)
+    page = ranked[offset : offset + limit]
+    products = Product.objects.select_related("farmer").in_bulk([pk for pk, _ in page])
+    results = [(products[pk], score) for pk, score in page if pk in products]
+    return results, len(ranked)
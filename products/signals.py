@@ -1,7 +1,14 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_save, post_delete, pre_save
 from django.dispatch import receiver
 from admins.models import FarmerNotification
-from .models import Question
+from farmers.models import Farmer
+from .models import Question, Product, Category
+from . import search, categories, facets
+
+# 검색 색인 대상 상품 필드 - update_fields로 이 필드들을 건드리지 않은 저장은 재색인하지 않음
+SEARCH_FIELDS = {"title", "sub_title", "desc", "farmer", "category", "open"}
 
 
 @receiver(post_save, sender=Question)
@@ -12,3 +19,46 @@ def question_post_save(sender, instance, **kwargs):
         notitype="qna_noti",
         obj_pk=instance.pk,
     )
+
+
+@receiver(post_save, sender=Product)
+def product_search_index(sender, instance, update_fields=None, **kwargs):
+    # 상품 검색 색인 갱신 (commit 후 - 저장 transaction을 붙잡지 않고, rollback 시 색인하지 않음)
+    if update_fields is not None and not SEARCH_FIELDS.intersection(update_fields):
+        return
+    pk = instance.pk
+    transaction.on_commit(lambda: search.index_products(Product.objects.filter(pk=pk)))
+
+
+@receiver(pre_save, sender=Farmer)
+def farmer_search_index(sender, instance, **kwargs):
+    # 농장 이름이 바뀐 경우 해당 농가 상품 재색인 (commit 후)
+    if instance.pk is None:
+        return
+    old_name = Farmer.objects.filter(pk=instance.pk).values_list("farm_name", flat=True).first()
+    if old_name is not None and old_name != instance.farm_name:
+        transaction.on_commit(
+            lambda: search.index_products(Product.objects.filter(farmer_id=instance.pk))
+        )
+
+
+@receiver(post_save, sender=Category)
+def category_search_index(sender, instance, created, **kwargs):
+    # 카테고리 이름 변경 시 하위 상품 재색인 (commit 후)
+    if created:
+        return
+    products = Product.objects.filter(Q(category=instance) | Q(category__parent=instance))
+    transaction.on_commit(lambda: search.index_products(products))
+
+
+@receiver([post_save, post_delete], sender=Category)
+def category_changed(sender, instance, **kwargs):
+    # 카테고리 tree / 카테고리별 상품 수 무효화
+    categories.invalidate_tree()
+
+
+@receiver([post_save, post_delete], sender=Product)
+def product_category_count(sender, instance, **kwargs):
+    categories.invalidate_counts()
+    # 상품 목록 facet cache - 전체 목록 + 모든 카테고리
+    facets.invalidate("all", *categories.get_tree().slugs)
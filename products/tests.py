@@ -1,3 +1,304 @@
-from django.test import TestCase
+from unittest import mock
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from comments.models import Product_Comment_Image, Product_Recomment
+from core import testing
+from core.versions import LOCAL_TTL
+from . import categories, search
+from .models import Answer, Category, Product, Product_Search_Token, Question
+import time
 
 # Create your tests here.
+
+WRITE_STATEMENTS = ("INSERT", "UPDATE", "DELETE", "REPLACE")
+
+
+class ProductDetailTest(TestCase):
+    def setUp(self):
+        testing.clear_cache()
+        self.farmer = testing.make_farmer()
+        category = testing.make_category("과일", "fruit")
+        images = {
+            "desc_image": "product_desc_image/desc.webp",
+            "desc_image2": "product_desc_image/desc2.webp",
+        }
+        related = testing.make_product(self.farmer, category, kinds="normal", **images)
+        self.product = testing.make_product(
+            self.farmer, category, related_product=related, **images
+        )
+        self.url = reverse("products:product_detail", args=[self.product.pk])
+        self.add_reviews(1)
+
+    def add_reviews(self, n):
+        for _ in range(n):
+            consumer = testing.make_consumer()
+            comment = testing.make_product_comment(self.product, consumer, rating=3)
+            for _ in range(2):
+                Product_Comment_Image.objects.create(
+                    product_comment=comment, image="comments/review.jpg"
+                )
+                Product_Recomment.objects.create(
+                    comment=comment, author=self.farmer.user, text="감사합니다"
+                )
+            question = Question.objects.create(
+                title="문의", content="배송 언제 되나요", consumer=consumer, product=self.product
+            )
+            Answer.objects.create(content="내일 출발합니다", question=question, farmer=self.farmer)
+
+    def get(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return [query["sql"] for query in queries]
+
+    def test_get_does_not_write(self):
+        before = Product.objects.values().get(pk=self.product.pk)
+        writes = [sql for sql in self.get() if sql.lstrip().upper().startswith(WRITE_STATEMENTS)]
+        self.assertEqual(writes, [])
+        self.assertEqual(Product.objects.values().get(pk=self.product.pk), before)
+
+    def test_query_count_does_not_grow_with_reviews(self):
+        self.get()  # category tree 등 process / cache 초기화
+        few = len(self.get())
+        self.add_reviews(4)
+        many = len(self.get())
+        self.assertEqual(few, many)
+
+    def test_missing_product_redirects(self):
+        response = self.client.get(reverse("products:product_detail", args=[0]))
+        self.assertRedirects(response, "/", fetch_redirect_response=False)
+
+
+class ProductSearchTest(TestCase):
+    def setUp(self):
+        testing.clear_cache()
+        farmer = testing.make_farmer(farm_name="햇살농장")
+        fruit = testing.make_category("과일", "fruit")
+        apple = testing.make_category("사과", "apple", parent=fruit)
+        pear = testing.make_category("배", "pear", parent=fruit)
+
+        self.title = testing.make_product(farmer, apple, title="청송 사과", sub_title="꿀사과")
+        self.desc = testing.make_product(
+            farmer,
+            pear,
+            title="나주 배",
+            sub_title="달콤한 배",
+            desc="<p>배 과수원 옆에서 함께 키운 사과 한두 개가 섞여 있을 수 있습니다 당도 보장</p>",
+        )
+        self.other = testing.make_product(farmer, pear, title="신고 배", sub_title="선물용")
+        self.closed = testing.make_product(farmer, apple, title="청송 사과", open=False)
+        search.index_products(Product.objects.all())
+
+    def pks(self, query):
+        return [pk for pk, _ in search.search(query)]
+
+    def test_tokenize(self):
+        self.assertEqual(search.tokenize("<b>꿀사과</b> 배"), ["꿀사", "사과", "꿀사과", "배"])
+
+    def test_ranking(self):
+        # 제목 / 부제 / 카테고리에 여러 번 나오는 짧은 문서가 상세설명에 한 번 나오는 문서보다 위
+        self.assertEqual(self.pks("사과"), [self.title.pk, self.desc.pk])
+        self.assertEqual(self.pks("청송 사과")[0], self.title.pk)
+        self.assertEqual(self.pks("나주")[0], self.desc.pk)
+        # 농장 이름도 색인 대상, 비공개 상품은 제외
+        self.assertEqual(set(self.pks("햇살농장")), {self.title.pk, self.desc.pk, self.other.pk})
+        self.assertEqual(self.pks("없는상품"), [])
+        self.assertEqual(self.pks("!!"), [])
+
+    def test_candidates_are_capped(self):
+        with mock.patch.object(search, "MAX_CANDIDATES", 1):
+            self.assertEqual(self.pks("사과"), [self.title.pk])
+        with mock.patch.object(search, "MAX_CANDIDATES", 2):
+            self.assertEqual(self.pks("배"), self.pks("배")[:2])
+            self.assertEqual(len(self.pks("배")), 2)
+
+    def test_search_endpoint(self):
+        response = self.client.get(reverse("products:product_search"), {"q": "사과"})
+        data = response.json()
+        self.assertEqual(data["total"], 2)
+        self.assertEqual([product["pk"] for product in data["products"]], self.pks("사과"))
+        self.assertFalse(data["has_next"])
+
+
+class ProductSearchIndexSignalTest(TransactionTestCase):
+    """상품 저장 시 commit 후 재색인 - rollback된 저장은 색인하지 않음"""
+
+    def setUp(self):
+        testing.clear_cache()
+        self.farmer = testing.make_farmer()
+        self.category = testing.make_category("과일", "fruit")
+
+    def tokens(self, product):
+        tokens = Product_Search_Token.objects.filter(product=product)
+        return set(tokens.values_list("token", flat=True))
+
+    def test_reindex_on_commit(self):
+        product = testing.make_product(self.farmer, self.category, title="사과", sub_title="제철")
+        self.assertIn("사과", self.tokens(product))
+
+        with transaction.atomic():
+            product.title = "자두"
+            product.save()
+            self.assertNotIn("자두", self.tokens(product))
+        self.assertIn("자두", self.tokens(product))
+        self.assertNotIn("사과", self.tokens(product))
+
+        try:
+            with transaction.atomic():
+                product.title = "복숭아"
+                product.save()
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        self.assertNotIn("복숭", self.tokens(product))
+
+
+class CategoryTreeTest(TestCase):
+    def setUp(self):
+        testing.clear_cache()
+        self.fruit = testing.make_category("과일", "fruit")
+        self.apple = testing.make_category("사과", "apple", parent=self.fruit)
+        self.fuji = testing.make_category("부사", "fuji", parent=self.apple)
+        self.vegetable = testing.make_category("채소", "vegetable")
+
+    def test_tree(self):
+        tree = categories.get_tree()
+        self.assertEqual([node.slug for node in tree.roots], ["fruit", "vegetable"])
+        self.assertEqual(
+            tree.descendants(self.fruit.pk), {self.fruit.pk, self.apple.pk, self.fuji.pk}
+        )
+        self.assertEqual(tree.descendants(self.fuji.pk), {self.fuji.pk})
+        self.assertEqual(tree.root(self.fuji.pk).slug, "fruit")
+        self.assertEqual([node.slug for node in tree.children(self.fruit.pk)], ["apple"])
+        self.assertEqual(tree.get_by_slug("fuji").pk, self.fuji.pk)
+        self.assertIsNone(tree.get_by_slug("none"))
+
+    def test_str_uses_tree(self):
+        categories.get_tree()
+        fuji = Category.objects.get(pk=self.fuji.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(str(fuji), "과일->사과->부사")
+
+    def test_reload_on_change(self):
+        self.assertIsNone(categories.get_tree().get_by_slug("pear"))
+        testing.make_category("배", "pear", parent=self.fruit)
+        tree = categories.get_tree()
+        self.assertEqual(tree.get_by_slug("pear").parent_pk, self.fruit.pk)
+        self.assertIn(tree.get_by_slug("pear").pk, tree.descendants(self.fruit.pk))
+
+        # 변경 없으면 다시 읽지 않음
+        with self.assertNumQueries(0):
+            self.assertIs(categories.get_tree(), tree)
+
+    def test_local_cache_ttl(self):
+        tree = categories.get_tree()
+        # signal 없이 바뀐 경우 (다른 process) - 공유 cache가 없으면 LOCAL_TTL 후 다시 읽음
+        Category.objects.filter(pk=self.apple.pk).update(name="홍옥")
+        self.assertIs(categories.get_tree(), tree)
+        with mock.patch("time.monotonic", return_value=time.monotonic() + LOCAL_TTL + 1):
+            self.assertEqual(categories.get_tree().get(self.apple.pk).name, "홍옥")
+
+    def test_unknown_category_404(self):
+        response = self.client.get(reverse("products:store_list_category", args=["none"]))
+        self.assertEqual(response.status_code, 404)
+
+
+class StoreListFacetTest(TestCase):
+    """상품 목록 / 카테고리 목록 - 필터별 상품과 facet 개수"""
+
+    def setUp(self):
+        testing.clear_cache()
+        fruit = testing.make_category("과일", "fruit")
+        apple = testing.make_category("사과", "apple", parent=fruit)
+        pear = testing.make_category("배", "pear", parent=fruit)
+        vegetable = testing.make_category("채소", "vege")
+        self.a = testing.make_farmer(farm_name="가 농장")
+        self.b = testing.make_farmer(farm_name="나 농장")
+
+        make = testing.make_product
+        self.p1 = make(self.a, apple, kinds="ugly", sell_price=5000, is_event=True)
+        self.p2 = make(self.b, apple, kinds="normal", sell_price=15000)
+        self.p3 = make(self.a, pear, kinds="normal", sell_price=25000)
+        self.p4 = make(self.b, vegetable, kinds="ugly", sell_price=35000)
+        make(self.a, apple, open=False)
+
+    def get(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        pks = {product.pk for product in response.context["products"]}
+        counts = {
+            param: {item["value"]: item["count"] for item in items}
+            for param, items in response.context["facets"].items()
+        }
+        return response, pks, counts
+
+    def all(self, **params):
+        return self.get(reverse("products:store_list"), **params)
+
+    def category(self, slug, **params):
+        return self.get(reverse("products:store_list_category", args=[slug]), **params)
+
+    def test_store_list(self):
+        a, b = str(self.a.pk), str(self.b.pk)
+        _, pks, counts = self.all()
+        self.assertEqual(pks, {self.p1.pk, self.p2.pk, self.p3.pk, self.p4.pk})
+        self.assertEqual(
+            counts,
+            {
+                "kinds": {"ugly": 2, "normal": 2},
+                "price": {"0": 1, "1": 1, "2": 1, "3": 1},
+                "event": {"1": 1},
+                "farmer": {a: 2, b: 2},
+            },
+        )
+
+        # 자기 facet 개수는 그대로, 다른 facet은 선택한 필터 기준
+        _, pks, counts = self.all(kinds="ugly")
+        self.assertEqual(pks, {self.p1.pk, self.p4.pk})
+        self.assertEqual(counts["kinds"], {"ugly": 2, "normal": 2})
+        self.assertEqual(counts["price"], {"0": 1, "3": 1})
+        self.assertEqual(counts["farmer"], {a: 1, b: 1})
+
+        _, pks, counts = self.all(price="1")
+        self.assertEqual(pks, {self.p2.pk})
+        self.assertEqual(counts["kinds"], {"normal": 1})
+
+        _, pks, counts = self.all(event="1")
+        self.assertEqual(pks, {self.p1.pk})
+        self.assertEqual(counts["event"], {"1": 1})
+        self.assertEqual(counts["farmer"], {a: 1})
+
+        # "007" 형태도 같은 농가로
+        response, pks, counts = self.all(farmer=f"00{self.a.pk}")
+        self.assertEqual(pks, {self.p1.pk, self.p3.pk})
+        self.assertEqual(counts["kinds"], {"ugly": 1, "normal": 1})
+        selected = [item for item in response.context["facets"]["farmer"] if item["selected"]]
+        self.assertEqual([item["value"] for item in selected], [a])
+
+    def test_invalid_filters_are_ignored(self):
+        _, pks, _ = self.all(kinds="bogus", price="9", event="0", farmer="a")
+        self.assertEqual(len(pks), 4)
+
+    def test_store_list_category(self):
+        a, b = str(self.a.pk), str(self.b.pk)
+        # 대분류는 하위 카테고리 상품 포함
+        _, pks, counts = self.category("fruit")
+        self.assertEqual(pks, {self.p1.pk, self.p2.pk, self.p3.pk})
+        self.assertEqual(counts["kinds"], {"ugly": 1, "normal": 2})
+        self.assertEqual(counts["farmer"], {a: 2, b: 1})
+
+        _, pks, counts = self.category("fruit", kinds="normal")
+        self.assertEqual(pks, {self.p2.pk, self.p3.pk})
+        self.assertEqual(counts["farmer"], {a: 1, b: 1})
+        self.assertEqual(counts["price"], {"1": 1, "2": 1})
+
+        _, pks, counts = self.category("apple", farmer=b)
+        self.assertEqual(pks, {self.p2.pk})
+        self.assertEqual(counts["farmer"], {a: 1, b: 1})
+
+        _, pks, _ = self.category("apple", event="1", price="0")
+        self.assertEqual(pks, {self.p1.pk})
+        _, pks, _ = self.category("vege", price="0")
+        self.assertEqual(pks, set())
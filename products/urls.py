@@ -6,6 +6,7 @@ app_name = "products"
 urlpatterns = [
     path("list/", views.store_list_all, name="store_list"),
     path("list/<slug:cat>/", views.store_list_cat, name="store_list_category"),
+    path("search/", views.product_search, name="product_search"),
     path("detail/<int:pk>/", views.product_detail, name="product_detail"),
     path("detail/qna_paginator/", views.question_paging, name="qna_paginator"),
     # path('enroll/', views.product_enroll, name="product_enroll"),
@@ -1,16 +1,23 @@
 from django.db.models.fields import NullBooleanField
+from django.db.models import Prefetch
 from django.shortcuts import render, redirect, reverse
-from django.http import request, JsonResponse
+from django.http import request, JsonResponse, Http404
 from django.core import serializers
 from django.core.paginator import Paginator
 from django.contrib.auth.decorators import login_required
-from .models import Product, Category, Question, Answer
+from .models import Product, Question, Answer
 from .forms import Question_Form, Answer_Form
 from comments.forms import ProductRecommentForm
+from comments.models import Product_Comment_Image, Product_Recomment
 from django.utils import timezone, dateformat
 from math import ceil
 from django.core.exceptions import ObjectDoesNotExist
 from django import template
+from core.paginator import CursorPaginator, InvalidCursor
+from core.images import thumbnail_url
+from .search import search_products
+from .categories import get_tree, get_product_counts
+from . import facets
 from datetime import date
 import locale
 import json
@@ -23,102 +30,135 @@ class FailedJsonResponse(JsonResponse):
         data.status_code = 400
 
 
+# 상품 목록 정렬 기준 (keyset pagination의 key로 사용)
+PRODUCT_LIST_ORDERING = {
+    "최신순": "-create_at",
+    "인기순": "sales_rate",
+    "마감임박순": "stock",
+}
+PRODUCT_LIST_PAGE_SIZE = 15
+PRODUCT_SEARCH_PAGE_SIZE = 20
+
+
+def paginate_store_list(request, products, count_cache_key):
+    """상품 목록 cursor pagination - OFFSET 없이 (정렬 필드, pk) 기준으로 페이지 조회"""
+
+    sort = request.GET.get("sort", "최신순")
+    if sort not in PRODUCT_LIST_ORDERING:
+        sort = "최신순"
+    # page는 화면 표시용 번호 (조회는 cursor 기준)
+    try:
+        page = max(int(request.GET.get("page", 1)), 1)
+    except ValueError:
+        page = 1
+    cursor = request.GET.get("cursor", None)
+    previous = request.GET.get("direction") == "prev"
+
+    paginator = CursorPaginator(
+        products,
+        PRODUCT_LIST_ORDERING[sort],
+        PRODUCT_LIST_PAGE_SIZE,
+        count_cache_key=count_cache_key,
+    )
+    try:
+        products = paginator.page(cursor, previous=previous)
+    except InvalidCursor:
+        page = 1
+        products = paginator.page()
+    if not cursor:
+        page = 1
+
+    return {
+        "products": products,
+        "sort": sort,
+        "page": page,
+        "page_total": paginator.num_pages,
+    }
+
+
+def filter_store_list(request, products, cache_name):
+    """상품 목록 facet 필터 적용 + facet별 상품 수 + pagination"""
+
+    filters = facets.get_filters(request)
+    query = facets.filter_query(filters)
+    ctx = {
+        "facets": facets.get_facets(products, cache_name, filters),
+        "filter_query": query,
+    }
+    products = facets.apply_filters(products, filters)
+    ctx.update(paginate_store_list(request, products, f"store_list_count:{cache_name}:{query}"))
+    return ctx
+
+
+def category_sidebar(nodes):
+    """사이드바 카테고리 목록 - 카테고리별 판매 중 상품 수 포함"""
+    counts = get_product_counts()
+    return [
+        {"name": node.name, "slug": node.slug, "count": counts.get(node.pk, 0)} for node in nodes
+    ]
+
+
 def store_list_all(request):
     cat_name = "all"
-    page = int(request.GET.get("page", 1))
-    sort = request.GET.get("sort", "최신순")
-    page_size = 15
-    limit = page_size * page
-    offset = limit - page_size
-    products_count = Product.objects.filter(open=True).count()
-    products = Product.objects.filter(open=True).order_by("-create_at")
-    if sort == "인기순":
-        for product in products:
-            product.calculate_sale_rate()
-        products = products.order_by("sales_rate")
-    elif sort == "마감임박순":
-        products = products.order_by("stock")
-    products = products[offset:limit]
-    categories = Category.objects.filter(parent=None).order_by("name")
-    page_total = ceil(products_count / page_size)
+    products = Product.objects.filter(open=True)
     ctx = {
         "cat_name": cat_name,
-        "products": products,
-        "categories": categories,
-        "page": page,
-        "page_total": page_total,
-        "page_range": range(1, page_total),
+        "categories": category_sidebar(get_tree().roots),
     }
+    ctx.update(filter_store_list(request, products, "all"))
     return render(request, "products/products_list.html", ctx)
 
 
 def store_list_cat(request, cat):
-    big_cat = ["fruit", "vege", "others"]
-    cat_name = str(cat)
-    products = []
-    page = int(request.GET.get("page", 1))
-    sort = request.GET.get("sort", "최신순")
-    page_size = 15
-    limit = page_size * page
-    offset = limit - page_size
-    if cat_name in big_cat:
-        big_category = Category.objects.get(slug=cat)
-        print(big_category)
-        categories = big_category.children.all().order_by("name")
-        try:
-            products = Product.objects.filter(category__parent__slug=cat, open=True).order_by(
-                "create_at"
-            )
-        except ObjectDoesNotExist:
-            ctx = {
-                "cat_name": cat_name,
-                "big_category": big_category,
-            }
-            return render(request, "products/products_list.html", ctx)
-    else:
-        big_cat_name = {"과일": "fruit", "야채": "vege", "기타": "others"}
-        categories = Category.objects.get(slug=cat)
-        print(categories)
-        cat_name = big_cat_name[categories.parent.name]
-        print(cat_name)
-        try:
-            products = categories.products.filter(open=True).order_by("-create_at")
-            categories = categories.parent.children.all().order_by("name")
-        except ObjectDoesNotExist:
-            ctx = {
-                "cat_name": cat_name,
-                "cateogries": categories,
-            }
-            return render(request, "products/products_list.html", ctx)
-
-    print(categories)
-    print(products)
-    if sort == "인기순":
-        for product in products:
-            product.calculate_sale_rate()
-        products = products.order_by("sales_rate")
-    elif sort == "마감임박순":
-        products = products.order_by("stock")
-    print(products)
-    print(page)
-    products_count = products.count()
-    products = products[offset:limit]
-    if products_count == 0:
-        page_total = 1
-    else:
-        page_total = ceil(products_count / page_size)
-
+    tree = get_tree()
+    category = tree.get_by_slug(cat)
+    if category is None:
+        raise Http404("존재하지 않는 카테고리입니다")
+
+    # 대분류(root)는 하위 카테고리, 소분류는 같은 대분류의 카테고리를 사이드바에 표시
+    root = tree.root(category.pk)
+    products = Product.objects.filter(category__in=tree.descendants(category.pk), open=True)
     ctx = {
-        "products": products,
-        "cat_name": cat_name,
-        "categories": categories,
-        "page": page,
-        "page_total": page_total,
-        "page_range": range(1, page_total + 1),
+        "cat_name": root.slug,
+        "categories": category_sidebar(tree.children(root.pk)),
     }
+    ctx.update(filter_store_list(request, products, cat))
     return render(request, "products/products_list.html", ctx)
 
 
+def product_search(request):
+    """상품 검색 - n-gram 역색인 BM25 점수 순 (JSON)"""
+
+    q = request.GET.get("q", "").strip()
+    try:
+        page = max(int(request.GET.get("page", 1)), 1)
+    except ValueError:
+        page = 1
+
+    offset = (page - 1) * PRODUCT_SEARCH_PAGE_SIZE
+    results, total = search_products(q, offset, PRODUCT_SEARCH_PAGE_SIZE)
+    data = {
+        "q": q,
+        "page": page,
+        "total": total,
+        "has_next": offset + PRODUCT_SEARCH_PAGE_SIZE < total,
+        "products": [
+            {
+                "pk": product.pk,
+                "title": product.title,
+                "sub_title": product.sub_title,
+                "sell_price": product.sell_price,
+                "farm_name": product.farmer.farm_name,
+                "image": thumbnail_url(product.main_image, 320),
+                "url": reverse("products:product_detail", args=[product.pk]),
+                "score": round(score, 4),
+            }
+            for product, score in results
+        ],
+    }
+    return JsonResponse(data)
+
+
 register = template.Library()
 
 
@@ -134,27 +174,59 @@ def _range(_min, args=None):
     return range(*args)
 
 
+def product_comments_queryset(product):
+    """
+    상품 리뷰 목록 - 작성자 / 리뷰 사진 / 대댓글(작성자)을 함께 조회
+    (리뷰 수와 관계없이 페이지당 query 수 일정)
+    """
+    return (
+        product.product_comments.select_related("consumer__user")
+        .prefetch_related(
+            Prefetch(
+                "product_comment_images", queryset=Product_Comment_Image.objects.order_by("pk")
+            ),
+            Prefetch(
+                "product_recomments",
+                queryset=(
+                    Product_Recomment.objects.select_related("author")
+                    .with_counts()
+                    .order_by("create_at")
+                ),
+            ),
+        )
+        .order_by("-create_at")
+    )
+
+
+def product_questions_queryset(product):
+    """상품 문의 목록 - 작성자 / 답변을 함께 조회"""
+    return (
+        product.questions.select_related("consumer__user")
+        .prefetch_related(Prefetch("answer", queryset=Answer.objects.select_related("farmer")))
+        .order_by("-create_at")
+    )
+
+
 def product_detail(request, pk):
     try:
         product_pk = pk
-        product = Product.objects.get(pk=pk)
-        product.calculate_total_rating_avg()
+        product = Product.objects.select_related("farmer__user", "related_product").get(pk=pk)
         kinds = product.kinds
         farmer = product.farmer
 
         # 상품 리뷰
-        comments = product.product_comments.all().order_by("-create_at")
-        total_comments = comments.count()
+        comments = product_comments_queryset(product)
         page = request.GET.get("page")
         paginator = Paginator(comments, 5)
         comments = paginator.get_page(page)
+        total_comments = paginator.count
 
-        # 상품 문의
-        questions = product.questions.all().order_by("-create_at")
-        total_questions = questions.count()
-        page2 = request.GET.get("page")
+        # 상품 문의 - 리뷰와 다른 page parameter 사용 (question_ajax와 동일)
+        questions = product_questions_queryset(product)
+        page2 = request.GET.get("page2")
         paginator2 = Paginator(questions, 5)
         questions = paginator2.get_page(page2)
+        total_questions = paginator2.count
 
         total_score = product.calculate_total_rating_avg()
         total_percent = format(total_score / 5 * 100, ".1f")
@@ -163,35 +235,10 @@ def product_detail(request, pk):
         # 연관 일반 작물
         related_product = product.related_product
 
-        # freshness
-        if product.reviews != 0:
-            freshness_per = [
-                int(100 * product.freshness_1 / product.reviews),
-                int(100 * product.freshness_3 / product.reviews),
-                int(100 * product.freshness_5 / product.reviews),
-            ]
-        else:
-            freshness_per = [0, 0, 0]
-
-        # flavor
-        if product.reviews != 0:
-            flavor_per = [
-                100 * product.flavor_1 / product.reviews,
-                100 * product.flavor_3 / product.reviews,
-                100 * product.flavor_5 / product.reviews,
-            ]
-        else:
-            flavor_per = [0, 0, 0]
-
-        # cost_performance
-        if product.reviews != 0:
-            cost_performance_per = [
-                100 * product.cost_performance_1 / product.reviews,
-                100 * product.cost_performance_3 / product.reviews,
-                100 * product.cost_performance_5 / product.reviews,
-            ]
-        else:
-            cost_performance_per = [0, 0, 0]
+        # 항목별 점수 비율 - 조회 전용 (상세 페이지에서는 DB write 없음)
+        freshness_per = product.get_rating_percentages("freshness")
+        flavor_per = product.get_rating_percentages("flavor")
+        cost_performance_per = product.get_rating_percentages("cost_performance")
 
         
         #상세 정보
@@ -250,11 +297,11 @@ def product_detail(request, pk):
 def comment_ajax(request, pk):
     """상품 리뷰 Pagination"""
     product = Product.objects.get(pk=pk)
-    comments = product.product_comments.all().order_by("-create_at")
-    total_comments = comments.count()
+    comments = product_comments_queryset(product)
     page = request.GET.get("page")
     paginator = Paginator(comments, 5)
     comments = paginator.get_page(page)
+    total_comments = paginator.count
     ctx = {
         "product": product,
         "comments": comments,
@@ -266,11 +313,11 @@ def comment_ajax(request, pk):
 def question_ajax(request, pk):
     """상품 문의 Pagination"""
     product = Product.objects.get(pk=pk)
-    questions = product.questions.all().order_by("-create_at")
-    total_questions = questions.count()
+    questions = product_questions_queryset(product)
     page = request.GET.get("page2")
     paginator2 = Paginator(questions, 5)
     questions = paginator2.get_page(page)
+    total_questions = paginator2.count
     ctx = {
         "product": product,
         "questions": questions,
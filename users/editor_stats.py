@@ -0,0 +1,39 @@
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from editor_reviews.models import Editor_Review
+from comments.models import Editor_Review_Comment
+
+"""
+에디터 통계 - 리뷰 수 / 총 조회수를 subquery annotate로 한 번에 조회
+annotate된 Editor는 review_count(), review_hit_count()에서 추가 query 없음
+새 댓글 수는 Editor.unread_comment_count()의 cache를 사용 (annotate하지 않음)
+"""
+
+
+def _aggregate_subquery(queryset, group_by, aggregate):
+    return Coalesce(
+        Subquery(
+            queryset.order_by().values(group_by).annotate(value=aggregate).values("value"),
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    )
+
+
+def with_editor_stats(queryset):
+    """Editor queryset에 num_reviews, total_hits annotate"""
+    reviews = Editor_Review.objects.filter(author=OuterRef("pk"))
+
+    return queryset.annotate(
+        num_reviews=_aggregate_subquery(reviews, "author", Count("pk")),
+        total_hits=_aggregate_subquery(reviews, "author", Sum("hits")),
+    )
+
+
+def get_comment_feed(editor):
+    """에디터의 모든 리뷰에 달린 댓글 - 새 댓글 먼저, 최신순 (JOIN 한 번)"""
+    return (
+        Editor_Review_Comment.objects.filter(editor_review__author=editor)
+        .select_related("author", "editor_review")
+        .order_by("is_read", "-create_at")
+    )
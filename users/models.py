@@ -1,8 +1,10 @@
 from addresses.models import Address
 from django.db import models
+from django.db.models import Sum
 from django.contrib.auth.models import AbstractUser
 from django.core.exceptions import ObjectDoesNotExist
 from django.core.validators import RegexValidator
+from django.core.cache import cache
 from django.utils import timezone
 from editor_reviews.models import Editor_Review
 from core.models import CompressedImageField
@@ -106,39 +108,38 @@ class Editor(models.Model):
         on_delete=models.CASCADE,
     )
 
+    # 통계 - users.editor_stats.with_editor_stats로 annotate된 경우 추가 query 없음
     def review_count(self):
+        if hasattr(self, "num_reviews"):
+            return self.num_reviews
         return Editor_Review.objects.filter(author=self).count()
 
     def review_hit_count(self):
-        reviews = Editor_Review.objects.filter(author=self)
-        count = 0
+        if hasattr(self, "total_hits"):
+            return self.total_hits
+        hits = Editor_Review.objects.filter(author=self).aggregate(hits=Sum("hits"))["hits"]
+        return hits or 0
 
-        for review in reviews:
-            count += review.hits
-
-        return count
+    # 새 댓글 수 (cache) - 댓글 작성 / 삭제 / 읽음 처리 시 clear_unread_comment_count로 무효화
+    UNREAD_COMMENT_CACHE_KEY = "editor_unread_comments:%s"
+    UNREAD_COMMENT_CACHE_TIMEOUT = 60 * 10
 
     def unread_comment_count(self):
-        count = 0
-
-        try:
-            reviews = Editor_Review.objects.filter(author=self)
+        key = self.UNREAD_COMMENT_CACHE_KEY % self.pk
+        count = cache.get(key)
 
-            for review in reviews:
-                try:
-                    unread_comments = comments.models.Editor_Review_Comment.objects.filter(
-                        editor_review=review, is_read=False
-                    ).count()
-
-                    count += unread_comments
-                except ObjectDoesNotExist:
-                    pass
-
-        except ObjectDoesNotExist:
-            pass
+        if count is None:
+            count = comments.models.Editor_Review_Comment.objects.filter(
+                editor_review__author=self, is_read=False
+            ).count()
+            cache.set(key, count, self.UNREAD_COMMENT_CACHE_TIMEOUT)
 
         return count
 
+    @classmethod
+    def clear_unread_comment_count(cls, editor_pk):
+        cache.delete(cls.UNREAD_COMMENT_CACHE_KEY % editor_pk)
+
     def __str__(self):
         return self.user.nickname
 
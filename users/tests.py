@@ -1,3 +1,218 @@
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from comments.models import Editor_Review_Comment
+from core import testing
+from editor_reviews.models import Editor_Review
+from orders.models import Order_Detail, Order_Group
+from .editor_stats import get_comment_feed, with_editor_stats
+from .models import Editor
+from .views import ORDER_LIST_PAGE_SIZE
+import datetime
 
 # Create your tests here.
+
+
+class EditorStatsTest(TestCase):
+    def setUp(self):
+        testing.clear_cache()
+        self.editor = testing.make_editor()
+        self.reader = testing.make_user()
+        self.reviews = [testing.make_editor_review(self.editor, hits=i) for i in range(1, 4)]
+        for review in self.reviews:
+            testing.make_editor_review_comment(review, self.reader)
+        testing.make_editor_review_comment(self.reviews[0], self.reader, is_read=True)
+
+    def stats(self):
+        return with_editor_stats(Editor.objects.filter(pk=self.editor.pk)).get()
+
+    def test_annotated_stats(self):
+        editor = self.stats()
+        with self.assertNumQueries(0):
+            self.assertEqual(editor.review_count(), 3)
+            self.assertEqual(editor.review_hit_count(), 6)
+
+        other = with_editor_stats(Editor.objects.filter(pk=testing.make_editor().pk)).get()
+        self.assertEqual((other.review_count(), other.review_hit_count()), (0, 0))
+
+    def test_unread_comment_count_is_cached(self):
+        editor = self.stats()
+        with self.assertNumQueries(1):
+            self.assertEqual(editor.unread_comment_count(), 3)
+        fresh = self.stats()
+        with self.assertNumQueries(0):
+            self.assertEqual(fresh.unread_comment_count(), 3)
+
+        # 댓글 작성 / 삭제 시 cache 무효화
+        comment = testing.make_editor_review_comment(self.reviews[1], self.reader)
+        self.assertEqual(editor.unread_comment_count(), 4)
+        comment.delete()
+        self.assertEqual(editor.unread_comment_count(), 3)
+
+    def test_author_view_marks_comments_read(self):
+        self.assertEqual(self.editor.unread_comment_count(), 3)
+        self.client.force_login(self.editor.user)
+        self.client.get(reverse("editors_pick:detail", args=[self.reviews[0].pk]))
+
+        self.assertFalse(
+            Editor_Review_Comment.objects.filter(
+                editor_review=self.reviews[0], is_read=False
+            ).exists()
+        )
+        self.assertEqual(self.editor.unread_comment_count(), 2)
+
+    def test_comment_feed(self):
+        feed = list(get_comment_feed(self.editor))
+        self.assertEqual(len(feed), 4)
+        # 새 댓글 먼저
+        self.assertEqual([comment.is_read for comment in feed], [False, False, False, True])
+
+
+class EditorMyPageTest(TestCase):
+    """에디터 마이페이지 - 리뷰 / 댓글 수와 관계없이 query 수 일정"""
+
+    def setUp(self):
+        testing.clear_cache()
+        self.editor = testing.make_editor()
+        self.reader = testing.make_user()
+        self.client.force_login(self.editor.user)
+        self.add_reviews(2)
+
+    def add_reviews(self, n):
+        for _ in range(n):
+            review = testing.make_editor_review(self.editor, hits=10)
+            for _ in range(3):
+                testing.make_editor_review_comment(review, self.reader)
+
+    def get(self, name):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse(name))
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_query_count_does_not_grow(self):
+        for name in ("users:editor_mypage", "users:editor_mypage_comments"):
+            testing.clear_cache()
+            _, few = self.get(name)
+            self.add_reviews(5)
+            testing.clear_cache()
+            _, many = self.get(name)
+            self.assertEqual(few, many, name)
+
+    def test_header_stats(self):
+        response, _ = self.get("users:editor_mypage")
+        editor = response.context["editor"]
+        self.assertEqual(editor.review_count(), Editor_Review.objects.count())
+        self.assertEqual(editor.review_hit_count(), 10 * Editor_Review.objects.count())
+        # 새 댓글 수는 첫 조회 때 cache에 저장됨
+        self.assertEqual(cache.get(Editor.UNREAD_COMMENT_CACHE_KEY % self.editor.pk), 6)
+        with self.assertNumQueries(0):
+            self.assertEqual(editor.unread_comment_count(), 6)
+
+
+class ConsumerMyPageOrdersTest(TestCase):
+    """소비자 마이페이지 주문 탭 - 상태별 개수 GROUP BY 한 번, 최신순 cursor pagination"""
+
+    STATUSES = ["preparing", "shipping", "delivery_complete", "cancel", "delivery_complete"]
+
+    def setUp(self):
+        testing.clear_cache()
+        self.consumer = testing.make_consumer()
+        self.client.force_login(self.consumer.user)
+        self.product = testing.make_product(
+            testing.make_farmer(), testing.make_category("과일", "fruit")
+        )
+        self.today = datetime.datetime(2021, 3, 31, 12, tzinfo=datetime.timezone.utc)
+        self.details = []
+        self.add_orders(12)
+        # 결제 전(wait) 주문은 목록에서 제외
+        testing.make_order(self.consumer, self.product, status="wait")
+
+    def add_orders(self, n):
+        for _ in range(n):
+            i = len(self.details)
+            group, detail = testing.make_order(
+                self.consumer, self.product, status=self.STATUSES[i % len(self.STATUSES)]
+            )
+            # i일 전 주문 - 오래된 주문일수록 먼저 생성된 것처럼
+            order_at = self.today - datetime.timedelta(days=i)
+            Order_Group.objects.filter(pk=group.pk).update(order_at=order_at)
+            Order_Detail.objects.filter(pk=detail.pk).update(create_at=order_at)
+            self.details.append(detail.pk)
+
+    def get(self, **params):
+        url = reverse("users:mypage", args=["orders"])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response, [query["sql"] for query in queries]
+
+    def pks(self, response):
+        return [detail.pk for detail in response.context["order_details"]]
+
+    def test_status_counts_in_one_query(self):
+        response, queries = self.get()
+        counts = Order_Detail.objects.filter(order_group__consumer=self.consumer)
+        self.assertEqual(
+            (
+                response.context["preparing_num"],
+                response.context["delivery_num"],
+                response.context["complete_num"],
+                response.context["cancel_num"],
+            ),
+            (
+                counts.filter(status="preparing").count(),
+                counts.filter(status="shipping").count(),
+                counts.filter(status="delivery_complete").count(),
+                counts.filter(status="cancel").count(),
+            ),
+        )
+        self.assertEqual(response.context["complete_num"], 4)
+        status_queries = [
+            sql for sql in queries if "GROUP BY" in sql and '"orders_order_detail"."status"' in sql
+        ]
+        self.assertEqual(len(status_queries), 1)
+
+    def test_cursor_pages(self):
+        size = ORDER_LIST_PAGE_SIZE
+        response, _ = self.get()
+        first = response.context["order_details"]
+        # 최신 주문(create_at) 먼저
+        self.assertEqual(self.pks(response), self.details[:size])
+        self.assertFalse(first.has_previous())
+        self.assertEqual(response.context["page_total"], 3)
+
+        response, _ = self.get(cursor=first.next_cursor, page=2)
+        second = response.context["order_details"]
+        self.assertEqual(self.pks(response), self.details[size : size * 2])
+        self.assertEqual(response.context["page"], 2)
+
+        response, _ = self.get(cursor=second.next_cursor, page=3)
+        self.assertEqual(self.pks(response), self.details[size * 2 :])
+        self.assertFalse(response.context["order_details"].has_next())
+
+        response, _ = self.get(cursor=second.previous_cursor, direction="prev", page=1)
+        self.assertEqual(self.pks(response), self.details[:size])
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        response, _ = self.get(cursor="invalid", page=3)
+        self.assertEqual(self.pks(response), self.details[:ORDER_LIST_PAGE_SIZE])
+        self.assertEqual(response.context["page"], 1)
+
+    def test_date_filter(self):
+        # 3 ~ 5일 전 주문
+        response, _ = self.get(s_date="2021-03-26", e_date="2021-03-28")
+        self.assertTrue(response.context["is_filtered"])
+        self.assertEqual(self.pks(response), self.details[3:6])
+        self.assertEqual(response.context["page_total"], 1)
+
+        response, _ = self.get(s_date="2020-01-01", e_date="2020-01-31")
+        self.assertEqual(self.pks(response), [])
+
+    def test_query_count_does_not_grow_with_orders(self):
+        _, few = self.get()
+        self.add_orders(30)
+        _, many = self.get()
+        self.assertEqual(len(few), len(many))
@@ -23,6 +23,7 @@ from django.contrib.auth.views import (
 )
 from django.urls import reverse_lazy
 from django.core.paginator import Paginator
+from core.paginator import CursorPaginator, InvalidCursor
 from django.db.models import Q
 from django.conf import settings
 from django.views.generic import DetailView
@@ -43,6 +44,7 @@ from config.settings import base
 from .models import Subscribe, Cart, Consumer, Wish, User, Editor, PhoneNumberAuth
 from editor_reviews.models import Editor_Review
 from comments.models import Editor_Review_Comment
+from .editor_stats import get_comment_feed, with_editor_stats
 from farmers.models import Farmer
 from products.models import Category, Product
 from addresses.models import Address
@@ -53,6 +55,9 @@ from addresses.forms import AddressForm
 
 from kakaomessages.views import send_kakao_message
 
+# 마이페이지 주문 목록 페이지 크기
+ORDER_LIST_PAGE_SIZE = 5
+
 # Exception 선언 SECTION
 class KakaoException(Exception):
     pass
@@ -589,26 +594,18 @@ def mypage(request, cat):
         print(questions)
         if questions.exists() is False:
             print("질문은 없다")
-        try:
-            groups = consumer.order_groups.all().exclude(status="waiting")
-            print(groups)
-            if groups.exists() is False:
-                print("여기안와?")
-                raise NoRelatedInstance
-            for group in groups:
-                details = group.order_details
-                preparing_num = details.filter(status="preparing").count()
-                print(preparing_num)
-                delivery_num = details.filter(status="shipping").count()
-                print(delivery_num)
-                complete_num = details.filter(status="complete").count()
-                print(complete_num)
-                cancel_num = details.filter(status="cancel").count()
-        except NoRelatedInstance:
-            preparing_num = 0
-            delivery_num = 0
-            complete_num = 0
-            cancel_num = 0
+        # 주문 상태별 개수 - status GROUP BY 한 번
+        status_counts = dict(
+            Order_Detail.objects.filter(order_group__consumer=consumer)
+            .values("status")
+            .annotate(count=Count("pk"))
+            .values_list("status", "count")
+            .order_by()
+        )
+        preparing_num = status_counts.get("preparing", 0)
+        delivery_num = status_counts.get("shipping", 0)
+        complete_num = status_counts.get("delivery_complete", 0)
+        cancel_num = status_counts.get("cancel", 0)
 
         # 구독 농가
         subs = consumer.subs.all().order_by("-create_at").all()
@@ -645,87 +642,66 @@ def mypage(request, cat):
         }
 
         if cat_name == "orders":
-            page = int(request.GET.get("page", 1))
             start_date = request.GET.get("s_date", None)
             end_date = request.GET.get("e_date", None)
-            page_size = 5
+            cursor = request.GET.get("cursor", None)
+            previous = request.GET.get("direction") == "prev"
+            # page는 화면 표시용 번호 (조회는 cursor 기준)
+            try:
+                page = max(int(request.GET.get("page", 1)), 1)
+            except ValueError:
+                page = 1
 
             if start_date == "None":
                 start_date = None
             if end_date == "None":
                 end_date = None
 
-            print("start_date의 정체")
-            print(start_date)
-            print("end_date의 정체")
-            print(end_date)
+            # 주문 상품 목록 - Order_Detail 한 번에 조회, 최신순 cursor pagination
+            order_details = (
+                Order_Detail.objects.filter(order_group__consumer=consumer)
+                .exclude(order_group__status="wait")
+                .select_related("order_group", "product__farmer")
+            )
+            is_filtered = start_date is not None or end_date is not None
 
-            if (start_date is None) and (end_date is None):
-                # 주문관리 페이지에 처음 들어온 경우
-                start_date = None
-                end_date = None
-                order_groups = groups.exclude(status="wait")
-            else:
+            if is_filtered:
                 # 날짜 필터링에서 조회 버튼을 누른 경우
-                if start_date == "":
+                if not start_date:
                     # filter start_date input에 아무런 value가 없을 경우
                     start_date = datetime.datetime.now(tz=get_current_timezone()).date()
                 else:
                     start_date = datetime.datetime.strptime(start_date, "%Y-%m-%d").date()
 
-                if end_date == "":
+                if not end_date:
                     # filter end_date input에 아무런 value가 없음 경우
                     end_date = datetime.datetime.now(tz=get_current_timezone()).date()
-                    t = datetime.time(23, 59, 59)
-                    converted_end_date = datetime.datetime.combine(end_date, t)
-
                 else:
-                    # end_date 23:59분까지 filter 해주기 위해서 시간까지 있는 converted_end_date로 변환
-                    # ctx로 넘겨줄 때는 end_date를 넘겨주어야 함
-                    converted_end_date = end_date + " 23:59:59"
-                    print("바꾼 날짜는")
-                    print(end_date)
-                    converted_end_date = datetime.datetime.strptime(
-                        converted_end_date, "%Y-%m-%d %H:%M:%S"
-                    )
-
-                order_groups = (
-                    groups.filter(order_at__lte=converted_end_date, order_at__gte=start_date)
-                    .exclude(status="wait")
-                    .order_by("-order_at")
-                )
+                    end_date = datetime.datetime.strptime(end_date, "%Y-%m-%d").date()
 
-            print(f"start_date : {start_date}")
-            print(f"end_date : {end_date}")
-
-            print(order_groups)
-            if order_groups.exists():
-                order_details = order_groups[0].order_details.all()
-                print(order_groups.count())
-                if order_groups.count() > 1:
-                    for group in order_groups[1:]:
-                        print(group.order_details.all())
-                        order_details = order_details | group.order_details.all()
-                order_details = order_details.order_by("-order_group__order_at")
-            else:
-                order_details = None
+                # end_date 23:59분까지 filter 해주기 위해서 시간까지 있는 converted_end_date로 변환
+                # ctx로 넘겨줄 때는 end_date를 넘겨주어야 함
+                converted_end_date = datetime.datetime.combine(end_date, datetime.time(23, 59, 59))
 
-            print(order_details)
-            if order_details is None:
-                order_details_count = 0
-                total_pages = 0
-                offset = 0
-            else:
-                order_details_count = order_details.count()
-                total_pages = ceil(order_details_count / page_size)
-                offset = page * page_size - page_size
-                order_details = order_details[offset : page * page_size]
+                order_details = order_details.filter(
+                    order_group__order_at__lte=converted_end_date,
+                    order_group__order_at__gte=start_date,
+                )
+
+            paginator = CursorPaginator(order_details, "-create_at", ORDER_LIST_PAGE_SIZE)
+            try:
+                order_details = paginator.page(cursor, previous=previous)
+            except InvalidCursor:
+                order_details = paginator.page()
+                cursor = None
+            if not cursor:
+                page = 1
 
-            print("진짜")
-            print(order_details)
             ctx_orders = {
-                "total_pages": range(1, total_pages + 1),
                 "order_details": order_details,
+                "page": page,
+                "page_total": paginator.num_pages,
+                "is_filtered": is_filtered,
                 "start_date": str(start_date),
                 "end_date": str(end_date),
             }
@@ -940,7 +916,7 @@ class EditorMyPage(ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["editor"] = self.request.user.editor
+        context["editor"] = with_editor_stats(Editor.objects.filter(user=self.request.user)).get()
         return context
 
 
@@ -950,15 +926,10 @@ class EditorMyPage_Comments(ListView):
     context_object_name = "comments"
     template_name = "users/mypage/editor/editor_mypage_comments.html"
 
-    def get_queryset(self):
-        reviews = Editor_Review.objects.filter(author=self.request.user.editor)
-
-        comments = Editor_Review_Comment.objects.filter(editor_review=reviews.first())
+    paginate_by = 20
 
-        for review in reviews:
-            comments = comments.union(Editor_Review_Comment.objects.filter(editor_review=review))
-
-        return comments.order_by("is_read")
+    def get_queryset(self):
+        return get_comment_feed(self.request.user.editor)
 
     def render_to_response(self, context, **response_kwargs):
         if not Editor.objects.filter(user=self.request.user).exists():
@@ -968,7 +939,7 @@ class EditorMyPage_Comments(ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["editor"] = self.request.user.editor
+        context["editor"] = with_editor_stats(Editor.objects.filter(user=self.request.user)).get()
 
         return context
 
@@ -986,7 +957,7 @@ class EditorMypage_Info(TemplateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["editor"] = Editor.objects.get(user=self.request.user)
+        context["editor"] = with_editor_stats(Editor.objects.filter(user=self.request.user)).get()
         return context
 
 